@@ -0,0 +1,319 @@
+"""
+Chart benchmarks: time ChartMaker.build for every chart type and mode, the annotation
+helpers and save_fig, on synthetic frames of each --sizes and on the files in tests/data.
+Every case records the median wall time, the tracemalloc peak of one extra run, the memory
+its result still holds afterwards (retained) and the size of what it produced (figure
+JSON, or the file save_fig wrote). The *_loaded cases load the frame inside the run, and
+their *_lean variants build with options={'lean': True}, which doesn't keep it.
+
+    python benchmarks/bench_charts.py                          # 1k,10k,100k rows
+    python benchmarks/bench_charts.py --sizes 1k,100k,1m,10m --cases line,pie
+    python benchmarks/bench_charts.py --compare benchmarks/results/<commit>.json
+
+Results go to benchmarks/results/<commit>.json (see --json), one file per commit, so runs
+of two commits can be compared with --compare.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from chartengineer import ChartMaker
+from chartengineer.loader import read_csv
+
+DATA_DIR = os.path.join(ROOT, "tests", "data")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+N_GROUPS = 8
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 10 ** 3, "m": 10 ** 6}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+# ---------------------------------------------------------------- data
+
+def synthetic(rows, seed=0):
+    """Wide (date index, 3 columns), long (date, category, value) and grid (x, y, z) frames of about rows rows."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2015-01-01", periods=rows, freq="min", name="date")
+    wide = pd.DataFrame({
+        "tvl": rng.random(rows).cumsum(),
+        "volume": rng.random(rows) * 1e6,
+        "fees": rng.random(rows) * 1e3,
+    }, index=index)
+
+    per_group = max(rows // N_GROUPS, 1)
+    long = pd.DataFrame({
+        "category": np.repeat([f"chain_{i}" for i in range(N_GROUPS)], per_group),
+        "value": rng.random(per_group * N_GROUPS) * 1e6,
+    }, index=np.tile(index[:per_group], N_GROUPS))
+    long.index.name = "date"
+    long = long.sort_index(kind="stable")
+
+    grid = pd.DataFrame({
+        "day": rng.integers(0, 365, rows),
+        "hour": rng.integers(0, 24, rows),
+        "volume": rng.random(rows),
+    })
+    return {"wide": wide, "long": long, "grid": grid}
+
+
+def bundled():
+    """The frames in tests/data used by the data: cases."""
+    return {
+        "dex_stats": read_csv(os.path.join(DATA_DIR, "dex_stats.csv")),
+        "ray": read_csv(os.path.join(DATA_DIR, "$RAY_Buyback_2024_09_25.csv")),
+        "stargate_1": read_csv(os.path.join(DATA_DIR, "stargate_1.csv")),
+        "stargate_2": read_csv(os.path.join(DATA_DIR, "stargate_2.csv"), date_col=False),
+    }
+
+
+# ---------------------------------------------------------------- cases
+
+def _built(df, **kwargs):
+    cm = ChartMaker()
+    cm.build(df, kwargs.pop("title", "bench"), **kwargs)
+    return cm
+
+
+def _build(frame, **kwargs):
+    # (prepare, run): building is the timed part
+    return lambda d: d[frame], lambda df: _built(df, **kwargs)
+
+
+def _build_loaded(frame, **kwargs):
+    # build gets a function that loads its own copy of the frame, as a service would, so the
+    # frame is allocated inside the measured run and shows up in retained memory unless lean
+    return lambda d: (lambda: d[frame].copy()), lambda load: _built(load, **kwargs)
+
+
+def _after_build(frame, action, **kwargs):
+    # the chart is built untimed, then action(cm) is timed
+    def run(cm):
+        action(cm)
+        return cm
+    return lambda d: _built(d[frame], **kwargs), run
+
+
+def _save(filetype, html_options=None, **kwargs):
+    def run(state):
+        cm, directory = state
+        return cm.save_fig(directory, filetype=filetype, html_options=html_options)
+    return lambda d: (_built(d["wide"], **kwargs), d["tmp"]), run
+
+
+def _every(index, n):
+    return list(index[::max(len(index) // n, 1)][:n])
+
+
+WIDE = dict(axes_data={"y1": ["tvl", "volume"], "y2": ["fees"]})
+GROUPED = dict(groupby_col="category", num_col="value")
+
+# name: (prepare(data) -> state, run(state) -> ChartMaker or bytes written, max rows or None)
+CASES = {
+    "line": (*_build("wide", chart_type={"y1": "line", "y2": "line"}, **WIDE), None),
+    "bar": (*_build("wide", chart_type={"y1": "bar", "y2": "line"}, **WIDE), None),
+    "area": (*_build("wide", chart_type={"y1": "area", "y2": "line"}, **WIDE), None),
+    "line_grouped": (*_build("long", chart_type={"y1": "line"}, **GROUPED), None),
+    "line_loaded": (*_build_loaded("wide", chart_type={"y1": "line", "y2": "line"}, **WIDE), None),
+    "line_loaded_lean": (*_build_loaded("wide", chart_type={"y1": "line", "y2": "line"}, options={"lean": True},
+                                        **WIDE), None),
+    "line_grouped_loaded": (*_build_loaded("long", chart_type={"y1": "line"}, **GROUPED), None),
+    "line_grouped_loaded_lean": (*_build_loaded("long", chart_type={"y1": "line"}, options={"lean": True},
+                                                **GROUPED), None),
+    "bar_grouped": (*_build("long", chart_type={"y1": "bar"}, **GROUPED), None),
+    "area_grouped": (*_build("long", chart_type={"y1": "area"}, **GROUPED), None),
+    "pie": (*_build("long", chart_type="pie", **GROUPED), None),
+    "heatmap": (*_build("grid", chart_type="heatmap", axes_data={"x": "day", "y1": "hour"}, num_col="volume"), None),
+    "line_downsampled": (*_build("wide", options={"max_points": 5000}, **WIDE), None),
+    "show_text": (*_build("wide", options={"show_text": True}, **WIDE), 10 ** 6),
+    "normalize": (*_build("wide", chart_type={"y1": "area", "y2": "area"}, options={"normalize": True},
+                          axes_data={"y1": ["tvl", "volume", "fees"]}), None),
+    "normalize_grouped": (*_build("long", chart_type={"y1": "area"}, options={"normalize": True}, **GROUPED), None),
+    "add_annotations": (*_after_build("wide", lambda cm: cm.add_annotations(), options={"annotations": True},
+                                      **WIDE), None),
+    "add_dashed_line": (*_after_build("wide", lambda cm: cm.add_dashed_line(cm.df.index[len(cm.df) // 2], "event"),
+                                      **WIDE), None),
+    "add_dashed_lines_100": (*_after_build("wide", lambda cm: cm.add_dashed_lines(_every(cm.df.index, 100)), **WIDE),
+                             None),
+    "save_png": (*_save("png", **WIDE), 10 ** 6),
+    "save_svg": (*_save("svg", **WIDE), 10 ** 6),
+    "save_html": (*_save("html", **WIDE), None),
+    "save_html_compact": (*_save("html", html_options={}, **WIDE), None),
+}
+
+DATA_CASES = {
+    "data:dex_stats_grouped": (lambda d: d["dex_stats"], lambda df: _built(df, chart_type={"y1": "line"},
+                                                                          groupby_col="BLOCKCHAIN", num_col="VOLUME")),
+    "data:dex_stats_pie": (lambda d: d["dex_stats"], lambda df: _built(df, chart_type="pie",
+                                                                      groupby_col="BLOCKCHAIN", num_col="VOLUME")),
+    "data:ray_line": (lambda d: d["ray"], lambda df: _built(df, axes_data={"y1": ["ray_bought"],
+                                                                           "y2": ["cumulative_usdc_spent"]})),
+    "data:stargate_1_bar": (lambda d: d["stargate_1"], lambda df: _built(
+        df.set_index("CHAIN"), chart_type={"y1": "bar"}, axes_data={"y1": ["TOTAL_VOLUME_BRIDGED"]})),
+    "data:stargate_2_heatmap": (lambda d: d["stargate_2"], lambda df: _built(
+        df, chart_type="heatmap", axes_data={"x": "DIFFERENCE", "y1": "NEW_USER"}, num_col="RETENTION_RATE")),
+}
+
+
+# ---------------------------------------------------------------- measuring
+
+def output_bytes(result):
+    if isinstance(result, int):
+        return result  # save_fig returns the bytes it wrote
+    return len(result.to_bytes("json"))
+
+
+def measure(prepare, run, data, repeat):
+    """Median/min wall time over repeat runs, tracemalloc peak and retained memory of one more run, output size."""
+    times = []
+    quiet = io.StringIO()
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(quiet):
+            state = prepare(data)
+            start = time.perf_counter()
+            result = run(state)
+            times.append(time.perf_counter() - start)
+        quiet.seek(0)
+        quiet.truncate()
+
+    with contextlib.redirect_stdout(quiet):
+        state = prepare(data)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            kept = run(state)
+            _, peak = tracemalloc.get_traced_memory()
+            gc.collect()
+            retained, _ = tracemalloc.get_traced_memory()  # still allocated while the result is alive
+        finally:
+            tracemalloc.stop()
+        del kept
+
+    return {
+        "wall_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_mb": peak / 1024 ** 2,
+        "retained_mb": retained / 1024 ** 2,
+        "output_bytes": output_bytes(result),
+    }
+
+
+def run_cases(sizes, cases=None, repeat=3, include_data=True, no_limit=False):
+    results = []
+
+    def record(name, rows, prepare, run, data):
+        try:
+            row = {"case": name, "rows": rows, **measure(prepare, run, data, repeat)}
+            print(f"{name:26} {rows:>10,}  {row['wall_s'] * 1000:10.1f} ms  peak {row['peak_mb']:8.1f} MB"
+                  f"  retained {row['retained_mb']:8.1f} MB  {row['output_bytes'] / 1024:10.1f} KB")
+        except Exception as e:  # e.g. kaleido without a browser; keep going with the other cases
+            row = {"case": name, "rows": rows, "error": f"{type(e).__name__}: {e}"}
+            print(f"{name:26} {rows:>10,}  failed: {row['error'][:80]}")
+        results.append(row)
+
+    selected = {k: v for k, v in CASES.items() if not cases or k in cases}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            data = {**synthetic(rows), "tmp": tmp}
+            for name, (prepare, run, limit) in selected.items():
+                if limit and rows > limit and not no_limit:
+                    print(f"{name:26} {rows:>10,}  skipped (over {limit:,} rows, see --no-limit)")
+                    continue
+                record(name, rows, prepare, run, data)
+            del data
+
+    if include_data:
+        data = bundled()
+        for name, (prepare, run) in DATA_CASES.items():
+            if not cases or name in cases or "data" in cases:
+                record(name, len(prepare(data)), prepare, run, data)
+    return results
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=ROOT, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                    text=True, cwd=ROOT, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def environment():
+    import plotly
+    return {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "plotly": plotly.__version__, "machine": platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def compare(results, baseline_path):
+    """Prints each case's wall time and peak memory relative to a baseline results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["case"], r["rows"]): r for r in baseline["results"] if "error" not in r}
+    print(f"\ncompared with {baseline.get('commit')} (ratio < 1 is faster / smaller)")
+    for row in results:
+        old = before.get((row["case"], row["rows"]))
+        if old is None or "error" in row:
+            continue
+        time_ratio = row["wall_s"] / old["wall_s"] if old["wall_s"] else float("nan")
+        mem_ratio = row["peak_mb"] / old["peak_mb"] if old["peak_mb"] else float("nan")
+        retained_ratio = (row["retained_mb"] / old["retained_mb"]
+                          if old.get("retained_mb") else float("nan"))
+        print(f"{row['case']:26} {row['rows']:>10,}  time x{time_ratio:5.2f}  peak x{mem_ratio:5.2f}"
+              f"  retained x{retained_ratio:5.2f}"
+              f"  output {row['output_bytes'] - old['output_bytes']:+,} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,10k,100k", help="comma separated row counts, e.g. 1k,1m,10m")
+    parser.add_argument("--cases", help=f"comma separated subset of: {', '.join(CASES)}, data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-data", action="store_true", help="skip the tests/data cases")
+    parser.add_argument("--no-limit", action="store_true", help="run the cases capped at 1M rows at every size")
+    parser.add_argument("--json", help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="results file of another commit to compare against")
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    cases = set(args.cases.split(",")) if args.cases else None
+    results = run_cases(sizes, cases, repeat=args.repeat, include_data=not args.no_data, no_limit=args.no_limit)
+
+    commit, dirty = git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    path = args.json or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {path}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,68 @@
+"""
+Cold-start benchmark: time `import chartengineer` and the first ChartMaker() in fresh
+interpreters, and list the slowest modules from `python -X importtime`.
+
+    python benchmarks/bench_import.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import time
+t0 = time.perf_counter()
+import chartengineer
+t1 = time.perf_counter()
+chartengineer.ChartMaker()
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def _run(args, env):
+    return subprocess.run([sys.executable] + args, capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+
+
+def import_times(runs=5):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    imports, inits = [], []
+    for _ in range(runs):
+        import_s, init_s = map(float, _run(["-c", SNIPPET], env).stdout.split())
+        imports.append(import_s)
+        inits.append(init_s)
+
+    # importtime lines look like: "import time:   self |  cumulative | module"
+    slowest = []
+    for line in _run(["-X", "importtime", "-c", "import chartengineer"], env).stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            slowest.append((int(parts[1]), parts[2].strip()))
+    slowest = sorted(slowest, reverse=True)[:15]
+
+    return {
+        "runs": runs,
+        "import_s": statistics.median(imports),
+        "first_chartmaker_s": statistics.median(inits),
+        "slowest_modules_us": [{"module": name, "cumulative_us": us} for us, name in slowest],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = import_times(args.runs)
+    print(f"import chartengineer: {results['import_s'] * 1000:.1f} ms (median of {args.runs})")
+    print(f"first ChartMaker():   {results['first_chartmaker_s'] * 1000:.2f} ms")
+    for row in results["slowest_modules_us"]:
+        print(f"  {row['cumulative_us'] / 1000:8.1f} ms  {row['module']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
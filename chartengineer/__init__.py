@@ -1 +1,8 @@
-from .core import (ChartMaker) 
\ No newline at end of file
+from .core import (ChartMaker)
+from .export import (export_figures, write_html, write_html_bundle)
+from .rawfig import (DictFigure)
+from .cache import (ChartCache, MemoryCache, DiskCache)
+from .loader import (load_csv, read_csv, infer_schema)
+from .profiling import (Profiler, profile)
+from .spec import (ChartSpec, render)
+from .aio import (configure_async, render_async)
@@ -0,0 +1,104 @@
+import contextvars
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# Work kinds: 'build' is pandas/plotly work in Python, 'render' is kaleido (which drives a
+# headless Chrome per render) and HTML/JSON serialization.
+_KINDS = ['build', 'render']
+
+_config = {
+    'build': {'executor': None, 'limit': os.cpu_count() or 1},
+    'render': {'executor': None, 'limit': min(4, os.cpu_count() or 1)},
+}
+_owned = {}  # executors created here, per kind
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> {kind: asyncio.Semaphore}
+_lock = threading.Lock()
+
+
+def configure_async(build_executor=None, render_executor=None, max_builds=None, max_renders=None):
+    """
+    Sets where build_async and save_fig_async/to_bytes_async run their work and how many of
+    each may run at once. Executors must be thread-based (the work is ChartMaker methods in
+    this process; use export_figures for process pools); by default each kind gets its own
+    thread pool sized to its limit. max_builds defaults to the number of CPUs,
+    max_renders to min(4, CPUs). Calls past a limit wait their turn (the wait counts toward
+    their timeout), so a burst of requests can't start an unbounded number of renderers.
+    Only the arguments given are changed.
+    """
+    with _lock:
+        for kind, executor, limit in [('build', build_executor, max_builds), ('render', render_executor, max_renders)]:
+            if executor is not None:
+                _config[kind]['executor'] = executor
+            if limit is not None:
+                if limit < 1:
+                    raise ValueError(f'max_{kind}s must be at least 1, got {limit}.')
+                _config[kind]['limit'] = limit
+                old = _owned.pop(kind, None)
+                if old is not None:
+                    old.shutdown(wait=False)
+        _semaphores.clear()
+
+
+def _executor(kind):
+    with _lock:
+        executor = _config[kind]['executor'] or _owned.get(kind)
+        if executor is None:
+            executor = _owned[kind] = ThreadPoolExecutor(max_workers=_config[kind]['limit'],
+                                                         thread_name_prefix=f'chartengineer-{kind}')
+        return executor
+
+
+def _semaphore(loop, kind):
+    import asyncio
+    with _lock:
+        semaphores = _semaphores.get(loop)
+        if semaphores is None:
+            semaphores = _semaphores[loop] = {k: asyncio.Semaphore(_config[k]['limit']) for k in _KINDS}
+        return semaphores[kind]
+
+
+def _release(loop, semaphore):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        pass  # the loop is closed
+
+
+async def _offload(func, args, kwargs, kind, executor):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphore(loop, kind)
+    await semaphore.acquire()
+    try:
+        # The copied context carries an active profile() into the worker thread
+        context = contextvars.copy_context()
+        future = (executor or _executor(kind)).submit(context.run, func, *args, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    # Released when the work actually ends, not when the awaiting task is cancelled, so
+    # cancelled calls whose work already started still count toward the limit
+    future.add_done_callback(lambda _: _release(loop, semaphore))
+    return await asyncio.wrap_future(future, loop=loop)
+
+
+async def offload(func, *args, kind='render', executor=None, timeout=None, **kwargs):
+    """
+    Runs func(*args, **kwargs) on the executor for kind ('build' or 'render'), within its
+    concurrency limit, and returns the result. timeout (seconds) raises TimeoutError. On
+    timeout or cancellation, work that hasn't started is dropped. Work that has started
+    runs to completion in the background, because threads can't be interrupted.
+    """
+    if kind not in _KINDS:
+        raise ValueError(f"kind must be one of {_KINDS}, got '{kind}'.")
+    import asyncio  # imported here so importing chartengineer doesn't pay for asyncio
+    return await asyncio.wait_for(_offload(func, args, kwargs, kind, executor), timeout)
+
+
+async def render_async(spec, cache=None, profiler=None, timeout=None, executor=None):
+    """render(spec) on the build executor; see ChartSpec."""
+    from chartengineer.spec import render
+    return await offload(render, spec, cache=cache, profiler=profiler, kind='build', executor=executor,
+                         timeout=timeout)
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from plotly.utils import PlotlyJSONEncoder
+
+
+class MemoryCache:
+    """In-memory LRU store of bytes values, evicting the least recently used once over max_bytes."""
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return  # never fits, don't flush everything else for it
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._items), "bytes": self.size}
+
+
+class DiskCache:
+    """
+    On-disk store of bytes values, one file per key under directory. Reads refresh a file's
+    mtime, and the oldest files are removed once the directory is over max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)  # atomic, readers never see a partial file
+            self.size += len(value) - old_size
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.endswith('.tmp')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        self.size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self.size -= size
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.is_file():
+                    os.remove(entry.path)
+            self.size = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self.size}
+
+
+class ChartCache:
+    """
+    Two-level cache for ChartMaker.
+
+    figures: hash of input data + merged options + chart_type (and the other build arguments)
+             -> the built figure and the series it plotted
+    images:  hash of the figure JSON + filetype -> rendered bytes
+
+    Pass directory to keep both levels on disk (under directory/figures and directory/images),
+    otherwise they are in-memory LRUs. Either level can also be given any object with
+    get(key) / set(key, bytes) methods.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 ** 2, figures=None, images=None):
+        if directory is not None:
+            figures = figures or DiskCache(os.path.join(directory, 'figures'), max_bytes=max_bytes)
+            images = images or DiskCache(os.path.join(directory, 'images'), max_bytes=max_bytes)
+        self.figures = figures or MemoryCache(max_bytes=max_bytes)
+        self.images = images or MemoryCache(max_bytes=max_bytes)
+
+    @staticmethod
+    def figure_key(df, **params):
+        """Stable hash of a DataFrame and build parameters, or None if the data can't be hashed."""
+        h = hashlib.sha256()
+        try:
+            h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        except TypeError:
+            return None  # e.g. unhashable cell values, skip caching
+        h.update(json.dumps([[str(c) for c in df.columns], [str(t) for t in df.dtypes], str(df.index.name)]).encode())
+        h.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def image_key(fig, filetype):
+        fig_dict = fig if isinstance(fig, dict) else fig.to_plotly_json()
+        h = hashlib.sha256(json.dumps(fig_dict, sort_keys=True, cls=PlotlyJSONEncoder).encode())
+        h.update(filetype.encode())
+        return h.hexdigest()
+
+    def stats(self):
+        return {"figures": self.figures.stats(), "images": self.images.stats()}
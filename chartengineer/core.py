@@ -1,15 +1,24 @@
-from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 from plotly.graph_objects import Scatter, Bar
-import plotly.offline as pyo
 import plotly.io as pio
+from plotly.io.json import to_json_plotly
 import copy
+import functools
+import json
+import weakref
 
 from pandas.api.types import is_datetime64_any_dtype
 import pandas as pd
+import numpy as np
 import os
 
-from chartengineer.utils import (colors, clean_values,to_percentage,normalize_to_percent)
+from chartengineer.rawfig import (DictFigure, make_trace, trace_prop, trace_values, extend_layout)
+from chartengineer.options import (freeze_options, resolve_options)
+from chartengineer.frames import (frame_kind, referenced_columns, to_frame)
+from chartengineer.profiling import (NULL_SPAN, current_profiler)
+from chartengineer.spec import (ChartSpec, data_source, thaw, weak_source)
+from chartengineer.aio import (offload)
+from chartengineer.utils import (colors, clean_values,format_values,partition_groups,downsample,compact_points,extend_buffer,pivot_heatmap,plan_ticks,infer_spacing,series_stats,merge_stats,lookup_table,lookup_values,to_percentage,normalize_to_percent)
 
 trace_map = {
     "line": Scatter,
@@ -24,84 +33,329 @@ def validate_textposition(kind, textposition):
         return textposition if textposition in valid_bar_pos else "auto"
     return textposition
 
+def resolve_trace_class(kind, n_points, backend="svg", webgl_threshold=10000, default=Scatter):
+    """
+    Picks the trace class for a series. With backend "webgl" (or "auto" once a series has
+    at least webgl_threshold points) line traces render with Scattergl. Area traces stay on
+    Scatter because WebGL traces don't support stackgroup.
+    """
+    if backend not in ["svg", "webgl", "auto"]:
+        raise ValueError(f"render_backend must be 'svg', 'webgl' or 'auto', got '{backend}'.")
+
+    trace_class = trace_map.get(kind, default)
+    if trace_class is not Scatter or kind == "area" or backend == "svg":
+        return trace_class
+    if backend == "webgl" or n_points >= webgl_threshold:
+        return go.Scattergl
+    return trace_class
+
+def _timed(name, count=None):
+    # Runs the method in a profiler span; its result (or len(result) for bytes) is recorded as span count `count`
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._span(name) as span:
+                result = method(self, *args, **kwargs)
+                if count and result is not None:
+                    span.count(**{count: len(result) if isinstance(result, bytes) else result})
+                return result
+        return wrapper
+    return decorator
+
+DEFAULT_OPTIONS = {
+    "font_color": "black",
+    "font_family": "Cardo",
+    "orientation": "v",
+    "legend_orientation": "v",
+    "legend_background": dict(bgcolor="rgba(0,0,0,0)",bordercolor="rgba(0,0,0,0)",
+                              borderwidth=1,itemsizing='constant',buffer=5,
+                              traceorder='normal'),
+    'legend_placement': dict(x=0.01,y=1.1),
+    "connectgap": True,
+    "barmode": "stack",
+    "bgcolor": "rgba(0,0,0,0)",
+    "autosize": True,
+    "margin": dict(l=10, r=10, t=10, b=10),
+    "dimensions": dict(width=730, height=400),
+    "font_size": dict(axes=16,legend=12,textfont=12),
+    "axes_titles": dict(x=None,y1=None,y2=None),
+    "decimals": True,
+    "decimal_places": 1,
+    "show_text": False,
+    "dt_format": '%b. %d, %Y',
+    "auto_title": False,
+    "auto_color": True,
+    "normalize": False,
+    "line_width": 4,
+    "marker_size": 10,
+    "cumulative_sort": True,
+    "hole_size": 0.6,
+    "annotations": False,
+    "max_annotation": False,
+    'tickprefix': dict(y1=None, y2=None),
+    'ticksuffix': dict(y1=None,y2=None),
+    'save_directory': None,
+    'space_buffer': 5,
+    'descending': True,
+    'datetime_format': '%b. %d, %Y',
+    'tickformat': dict(x=None,y1=None,y2=None),
+    'normalize': False,
+    'normalize_dtype': None,
+    'text_freq': 1,
+    'max_points': None,
+    'downsample_method': 'lttb',
+    'render_backend': 'svg',
+    'webgl_threshold': 10000,
+    'top_n': None,
+    'min_share': None,
+    'other_label': 'Other',
+    'heatmap_agg': 'last',
+    'heatmap_max_bins': None,
+    'max_ticks': None,
+    'raw': False,
+    'raw_validate': False,
+    'html_options': None,
+    'index_col': None,
+    'lean': False,
+    'textposition':'top center',
+    "orientation":'v'
+}
+
+# Options build and the annotation methods read that have no entry in DEFAULT_OPTIONS
+OPTIONAL_OPTIONS = {
+    "colors", "show_legend", "mode", "xanchor", "yanchor", "textinfo", "texttemplate",
+    "text_font_color", "annotation_font_size", "file_type", "heatmap_color",
+    "dashed_line_color", "dashed_line_width", "line_factor", "dashed_line_factor",
+}
+
+_DEFAULT_COLORS = colors()
+
+# Series entries holding data, which the figure cache leaves out, and the append() context it keeps
+_SERIES_DATA = {"col", "stats", "tail", "lookup", "reload", "points"}
+_CACHED_CTX = {"series_start", "groupby_col", "num_col", "orientation", "along_index"}
+# Up to this many distinct dates, append() re-plans ticks from the dates themselves
+_TICK_DATES = 1024
+
 class ChartMaker:
-    def __init__(self, default_options=None, shuffle_colors=False):
+    def __init__(self, default_options=None, shuffle_colors=False, cache=None, profiler=None):
         self.colors = colors(shuffle_colors)
+        self.cache = cache
+        self.profiler = profiler
         self.color_index = 0
         self.fig = None
         self.merged_opts = None
         self.title = None
         self.series = []  
         self.df = None
-        self.default_options = default_options or {
-            "font_color": "black",
-            "font_family": "Cardo",
-            "orientation": "v",
-            "legend_orientation": "v",
-            "legend_background": dict(bgcolor="rgba(0,0,0,0)",bordercolor="rgba(0,0,0,0)",
-                                    borderwidth=1,itemsizing='constant',buffer=5,
-                                      traceorder='normal'),
-            'legend_placement': dict(x=0.01,y=1.1),
-            "connectgap": True,
-            "barmode": "stack",
-            "bgcolor": "rgba(0,0,0,0)",
-            "autosize": True,
-            "margin": dict(l=10, r=10, t=10, b=10),
-            "dimensions": dict(width=730, height=400),
-            "font_size": dict(axes=16,legend=12,textfont=12),
-            "axes_titles": dict(x=None,y1=None,y2=None),
-            "decimals": True,
-            "decimal_places": 1,
-            "show_text": False,
-            "dt_format": '%b. %d, %Y',
-            "auto_title": False,
-            "auto_color": True,
-            "normalize": False,
-            "line_width": 4,
-            "marker_size": 10,
-            "cumulative_sort": True,
-            "hole_size": 0.6,
-            "annotations": False,
-            "max_annotation": False,
-            'tickprefix': dict(y1=None, y2=None),
-            'ticksuffix': dict(y1=None,y2=None),
-            'save_directory': None,
-            'space_buffer': 5,
-            'descending': True,
-            'datetime_format': '%b. %d, %Y',
-            'tickformat': dict(x=None,y1=None,y2=None),
-            'normalize': False,
-            'text_freq': 1,
-            'textposition':'top center',
-            "orientation":'v'
-        }
-        
+        self.dropped_points = {}
+        self._append_ctx = None
+        self._datetime_index = False
+        self._reloaders = []
+        self._last_build = None
+        self._spec = None
+        self.default_options = default_options or copy.deepcopy(DEFAULT_OPTIONS)
+
+    @property
+    def df(self):
+        # append() adds its rows as chunks rather than concatenating the whole frame each time;
+        # they're joined here, once, when the frame is read
+        chunks = self._df_chunks
+        if len(chunks) > 1:
+            self._df_chunks = chunks = [pd.concat(chunks)]
+        return chunks[0] if chunks else None
+
+    @df.setter
+    def df(self, value):
+        self._df_chunks = [] if value is None else [value]
+
+    @property
+    def default_options(self):
+        return self._default_options
+
+    @default_options.setter
+    def default_options(self, value):
+        # Frozen lazily by _defaults so build only has to hash its own overrides
+        self._default_options = value
+        self._defaults_key = None
+        self._defaults_snapshot = None
+
+    def _defaults(self):
+        # The defaults dict may have been changed in place since it was frozen; comparing
+        # with a copy is far cheaper than freezing it again on every build
+        try:
+            changed = self._default_options != self._defaults_snapshot
+        except (TypeError, ValueError):
+            changed = True  # values without a plain == (arrays), compare as changed
+        if changed or self._defaults_key is None:
+            value = self._default_options
+            self._known_options = frozenset(DEFAULT_OPTIONS) | OPTIONAL_OPTIONS | frozenset(value)
+            self._defaults_snapshot = copy.deepcopy(value)
+            try:
+                self._defaults_key = freeze_options(value)
+            except TypeError:
+                self._defaults_key = None  # unhashable default values, options get compiled on every build
+        return self._defaults_key
+
+    def _span(self, name, **counts):
+        # Timed phase for the profiler passed in or activated with profiling.profile(); a no-op otherwise
+        profiler = self.profiler or current_profiler()
+        return NULL_SPAN if profiler is None else profiler.span(name, **counts)
+
     def get_next_color(self):
         color = self.colors[self.color_index]
         self.color_index = (self.color_index + 1) % len(self.colors)
         return color
 
-    def return_df(self):
-        return self.df.copy()
+    def return_df(self, copy=True):
+        """
+        The data of the build(s) so far. copy=False returns a shallow, copy-on-write view instead of
+        a deep copy. After a lean build (options={'lean': True}) the frame isn't kept, so it's loaded
+        again: by calling the function build was given as df, or from the object build was given if
+        the caller still holds it (a ValueError otherwise).
+        """
+        if self.df is None and self._reloaders:
+            frames = [reload() for reload in self._reloaders]
+            return frames[0] if len(frames) == 1 else pd.concat(frames).drop_duplicates()
+        return self.df.copy(deep=copy)
+
+    def _load_frame(self, df, chart_type, axes_data, groupby_col, num_col, merged_opts):
+        # The frame build plots: Arrow/Polars inputs converted, then normalized if asked
+        if frame_kind(df) is not None:
+            # Arrow/Polars input: bring over only the columns this chart reads, as views where possible
+            with self._span('convert'):
+                charts_x = not (isinstance(chart_type, str) and chart_type.lower() in ['pie', 'heatmap'])
+                index_col = merged_opts.get('index_col')
+                columns = referenced_columns(axes_data, groupby_col, num_col, index_col) or None
+                df = to_frame(df, columns, index_col=index_col, x_col=axes_data.get('x') if charts_x else None)
+
+        if merged_opts.get('normalize') == True:
+            print(f'normalizing to % ...')
+            with self._span('normalize'):
+                df = normalize_to_percent(df=df,num_col=num_col,dtype=merged_opts.get('normalize_dtype'))
+        return df
+
+    def _lean_reloader(self, source, original, df, chart_type, axes_data, groupby_col, num_col, merged_opts):
+        # What return_df calls after a lean build instead of keeping df around: the frame is
+        # loaded again from the function build was given, or from the caller's own object
+        # (before conversion and normalize, whose results nothing else holds on to)
+        axes_data = dict(axes_data)  # build fills in axes_data['x'] later
+        if source is not None:
+            return lambda: self._load_frame(source(), chart_type, axes_data, groupby_col, num_col, merged_opts)
+
+        try:
+            ref, convert = weakref.ref(original), True
+        except TypeError:
+            ref, convert = weakref.ref(df), False  # not weak-referenceable, keep the converted frame's
+
+        def reload():
+            frame = ref()
+            if frame is None:
+                raise ValueError("The data of this lean build has been released; pass build a function that "
+                                 "loads it (e.g. df=lambda: load_csv(path)) so return_df can reload it.")
+            if convert:
+                frame = self._load_frame(frame, chart_type, axes_data, groupby_col, num_col, merged_opts)
+            return frame.copy(deep=False)
+        return reload
+
+    @staticmethod
+    def _lean_column(reload, label, groupby_col, num_col):
+        # A lean build's column for label, loaded again (see _series_col)
+        df = reload()
+        if groupby_col and num_col:
+            positions = partition_groups(df, groupby_col, num_col)['positions'].get(label)
+            return df[num_col].iloc[positions] if positions is not None else None
+        return df[label] if label in df.columns else None
 
-    def save_fig(self, save_directory=None, filetype='png'):
-        """Save the figure to the specified directory with the given filetype."""
+    def _file_path(self, save_directory=None, filetype='png'):
         # Construct the full file path using os.path.join
+        return os.path.join(save_directory or self.save_directory, f'{self.title}.{filetype}')
+
+    @_timed('to_bytes', count='bytes')
+    def to_bytes(self, filetype='png'):
+        """
+        Render the figure to bytes without touching disk, reusing cached renders when a cache is set.
+        filetype: an image format, 'html' or 'json'.
+        """
+        key = self.cache.image_key(self.fig, filetype) if self.cache is not None else None
+        data = self.cache.images.get(key) if key else None
+        if data is None:
+            # raw figures are plain dicts; they're only validated when raw_validate is set
+            validate = not isinstance(self.fig, DictFigure)
+            with self._span('render'):
+                if filetype == 'json':
+                    data = pio.to_json(self.fig, validate=validate).encode('utf-8')
+                elif filetype != 'html':
+                    data = pio.to_image(self.fig, format=filetype, validate=validate)
+                else:
+                    data = pio.to_html(self.fig, validate=validate).encode('utf-8')
+            if key:
+                self.cache.images.set(key, data)
+        return data
+
+    @_timed('save_fig', count='bytes')
+    def save_fig(self, save_directory=None, filetype='png', html_options=None):
+        """
+        Save the figure to the specified directory with the given filetype. Returns the bytes written.
+        html_options: write html with export.write_html (shared plotly.js, binary arrays, minify),
+        e.g. {} for its defaults or {'include_plotlyjs': 'cdn', 'minify': True}; falls back to the
+        html_options option. Without either, html is written by plotly with plotly.js inlined.
+        """
         if save_directory:
             self.save_directory = save_directory
 
-        file_path = os.path.join(self.save_directory, f'{self.title}.{filetype}')
+        file_path = self._file_path(filetype=filetype)
 
         print(f'Saving figure to: {file_path}')
 
-        if filetype != 'html':
+        if html_options is None and self.merged_opts is not None:
+            html_options = self.merged_opts.get('html_options')
+
+        if filetype == 'html' and html_options is not None:
+            from chartengineer.export import write_html
+            with self._span('render'):
+                return write_html(self.fig, file_path, **html_options)
+        elif self.cache is not None:
+            # Rendered bytes are cached by figure content, so unchanged charts skip kaleido
+            data = self.to_bytes(filetype)
+            with open(file_path, 'wb') as f:
+                f.write(data)
+        elif filetype != 'html':
             # Save as image using Kaleido engine
-            self.fig.write_image(file_path, engine="kaleido")
+            with self._span('render'):
+                self.fig.write_image(file_path, engine="kaleido")
         else:
             # Save as HTML
-            self.fig.write_html(file_path)
-        
+            with self._span('render'):
+                self.fig.write_html(file_path)
+        return os.path.getsize(file_path)
+
+    async def build_async(self, *args, timeout=None, executor=None, **kwargs):
+        """
+        build(...) on the build executor (see configure_async), leaving the event loop free.
+        The build runs on a copy of this ChartMaker that replaces its state once it finishes,
+        so a build that times out or is cancelled leaves the ChartMaker as it was.
+        """
+        work = copy.copy(self)
+        work.series = list(self.series)
+        work.dropped_points = dict(self.dropped_points)
+        work._df_chunks = list(self._df_chunks)
+        work._reloaders = list(self._reloaders)
+        await offload(work.build, *args, kind='build', executor=executor, timeout=timeout, **kwargs)
+        self.__dict__.update(work.__dict__)
+
+    async def save_fig_async(self, save_directory=None, filetype='png', html_options=None, timeout=None,
+                             executor=None):
+        """save_fig(...) on the render executor; returns the bytes written."""
+        return await offload(self.save_fig, save_directory, filetype, html_options, kind='render',
+                             executor=executor, timeout=timeout)
+
+    async def to_bytes_async(self, filetype='png', timeout=None, executor=None):
+        """to_bytes(filetype) on the render executor: the rendered image, html or json, without touching disk."""
+        return await offload(self.to_bytes, filetype, kind='render', executor=executor, timeout=timeout)
+
     def show_fig(self,browser=False):
+        import plotly.offline as pyo  # only needed for interactive use
+
         if browser==False:
             pyo.iplot(self.fig)
         else: 
@@ -112,23 +366,33 @@ class ChartMaker:
         self.series = []
         self.df = None
         self.color_index = 0
+        self.dropped_points = {}
+        self._append_ctx = None
+        self._datetime_index = False
+        self._reloaders = []
+        self._last_build = None
+        self._spec = None
 
     def return_fig(self):
         return self.fig
     
-    def _prepare_grouped_series(self, df, groupby_col, num_col, descending=True, cumulative_sort=True):
+    def _prepare_grouped_series(self, df, groupby_col, num_col, descending=True, cumulative_sort=True, partition=None):
         """
         Groups and sorts data for multi-line plots.
         Supports cumulative or latest value sorting.
+        Reuses partition (from partition_groups) when given instead of grouping again.
         Returns: list of sorted categories, color map
         """
+        if partition is None:
+            partition = partition_groups(df, groupby_col, num_col)
+
         # Decide aggregation method based on cumulative_sort flag
         if cumulative_sort:
             # Sort by cumulative (sum) of the values
-            sort_agg = df.groupby(groupby_col)[num_col].sum().sort_values(ascending=not descending)
+            sort_agg = partition['sum'].sort_values(ascending=not descending)
         else:
             # Sort by latest (last known) value
-            sort_agg = df.groupby(groupby_col)[num_col].last().sort_values(ascending=not descending)
+            sort_agg = partition['last'].sort_values(ascending=not descending)
 
         sort_list = sort_agg.index.tolist()
 
@@ -138,31 +402,222 @@ class ChartMaker:
 
         return sort_list, color_map
     
-    def build(self, df, title, axes_data=None, chart_type={"y1": "line", "y2": "line"}, options=None,
-            groupby_col=None, num_col=None):
-        options = options or {}
-        axes_data = axes_data or {}
+    @staticmethod
+    def _max_points(kind, axis, label, merged_opts):
+        # max_points can be an int or a dict keyed by axis ('y1'/'y2') or by column/group name
+        max_points = merged_opts.get('max_points')
+        if kind not in ['line', 'area', 'scatter'] or not max_points:
+            return None
+        if isinstance(max_points, dict):
+            max_points = max_points.get(label, max_points.get(axis))
+        return max_points
+
+    def _points_to_keep(self, x, y, kind, axis, label, merged_opts):
+        """
+        Row positions to plot for a line/area trace when max_points is set (None keeps every point).
+        Records how many points were dropped in self.dropped_points.
+        """
+        max_points = self._max_points(kind, axis, label, merged_opts)
+        if not max_points:
+            return None
+
+        with self._span('downsample', points=len(y)):
+            keep = downsample(x, y, max_points, method=merged_opts.get('downsample_method', 'lttb'))
+        if keep is not None:
+            self.dropped_points[label] = len(y) - len(keep)
+        return keep
+
+    @classmethod
+    def from_spec(cls, spec, cache=None, profiler=None):
+        """
+        A new ChartMaker with spec drawn: built, then given its add_title, add_annotations and
+        add_dashed_lines calls in order. render(spec) uses this on a fresh instance per call.
+        """
+        cm = cls(default_options=thaw(spec.default_options), cache=cache, profiler=profiler)
+        if spec.colors is not None:
+            cm.colors = list(spec.colors)
+        cm.color_index = spec.color_offset % len(cm.colors)
+        cm.build(spec.data, spec.title, axes_data=thaw(spec.axes_data), chart_type=thaw(spec.chart_type),
+                 options=thaw(spec.options), groupby_col=spec.groupby_col, num_col=spec.num_col)
+        for name, kwargs in spec.calls:
+            getattr(cm, name)(**thaw(kwargs))
+        return cm
+
+    def to_spec(self):
+        """
+        The ChartSpec of the last build, including the add_title, add_annotations and
+        add_dashed_line(s) calls made since. render(cm.to_spec()) draws the same figure.
+        An in-memory frame is kept as the frame build plotted (already converted and normalized);
+        after a lean build, the spec only refers weakly to the frame build was given.
+        """
+        last = self._last_build
+        if last is None:
+            return None
+        if self._spec is None:
+            options = last["options"]
+            if last["normalized"]:
+                options = {**options, 'normalize': False}  # the plotted frame is normalized already
+            self._spec = ChartSpec(
+                last["data"], last["title"], chart_type=last["chart_type"], axes_data=last["axes_data"],
+                options=options, groupby_col=last["groupby_col"], num_col=last["num_col"], calls=last["calls"],
+                default_options=last["default_options"],
+                colors=None if last["colors"] == _DEFAULT_COLORS else last["colors"], color_offset=last["color_offset"],
+            )
+        return self._spec
 
-        merged_opts = copy.deepcopy(self.default_options)
+    def _record_call(self, name, **kwargs):
+        # Noted for to_spec, which builds the spec only when it's asked for
+        if self._last_build is not None:
+            self._last_build["calls"].append((name, kwargs))
+            self._spec = None
 
-        for key, val in (options or {}).items():
-            # if both default and override are dicts, update the nested dict
-            if key in merged_opts and isinstance(merged_opts[key], dict) and isinstance(val, dict):
-                merged_opts[key].update(val)
-            else:
-                merged_opts[key] = val
+    def build(self, df, title, axes_data=None, chart_type={"y1": "line", "y2": "line"}, options=None,
+            groupby_col=None, num_col=None):
+        """
+        Draws a chart from df; see the README for the arguments. df may also be a CSV path or a
+        function returning the data. The arguments are recorded for to_spec.
+        """
+        with self._span('build') as span:
+            rows = self._build(df, title, axes_data, chart_type, options, groupby_col, num_col)
+            span.count(rows=rows, traces=len(self.fig.data), points=sum(series['stats']['n'] for series in self.series))
 
-        if merged_opts.get('normalize') == True:
-            print(f'normalizing to % ...')
-            df = normalize_to_percent(df=df,num_col=num_col)
+    def _build(self, df, title, axes_data, chart_type, options, groupby_col, num_col):
+        options = options or {}
+        axes_data = dict(axes_data or {})  # filled in below, leave the caller's dict alone
+        color_offset = self.color_index
+
+        defaults_key = self._defaults()
+        # Compiled once per (defaults, options) pair; rejects unknown option keys
+        with self._span('options'):
+            merged_opts = resolve_options(self.default_options, options, known=self._known_options,
+                                          defaults_key=defaults_key)
+
+        # df may be a function returning the data (or a CSV path), which lean builds call again in return_df
+        data = df
+        df = data_source(df)
+        source = df if callable(df) else None
+        if source is not None:
+            df = source()
+        original = df
+        df = self._load_frame(df, chart_type, axes_data, groupby_col, num_col, merged_opts)
+
+        cache_key = None
+        if self.cache is not None:
+            with self._span('cache_key'):
+                cache_key = self.cache.figure_key(
+                    df, title=title, axes_data=axes_data, chart_type=chart_type, options=merged_opts.to_dict(),
+                    groupby_col=groupby_col, num_col=num_col, colors=self.colors, color_index=self.color_index
+                )
 
-        self.df = df if self.df is None else pd.concat([self.df, df]).drop_duplicates()
+        lean = merged_opts.get('lean')
+        if lean:
+            # Keep only a way to get the data back; series keep their stats but not their columns
+            reload = self._lean_reloader(source, original, df, chart_type, axes_data, groupby_col, num_col, merged_opts)
+            self._reloaders.append(reload)
+        else:
+            self.df = df if self.df is None else pd.concat([self.df, df]).drop_duplicates()
+        # to_spec keeps a frame input as the plotted frame (already held as self.df), not as the
+        # caller's object; a lean build keeps no data, and neither may its spec
+        plotted = source is None and not lean
+        self._last_build = dict(
+            data=data if source is not None else weak_source(original) if lean else df,
+            normalized=plotted and merged_opts.get('normalize') == True,
+            title=title, chart_type=dict(chart_type) if isinstance(chart_type, dict) else chart_type,
+            axes_data=dict(axes_data), options=dict(options), groupby_col=groupby_col, num_col=num_col, calls=[],
+            default_options=self._defaults_snapshot, colors=self.colors, color_offset=color_offset,
+        )
+        self._spec = None
+        self._datetime_index = is_datetime64_any_dtype(df.index)
         self.merged_opts = merged_opts
 
-        orientation = merged_opts.get("orientation", "v")
-
         self.title = title
         self.save_directory = merged_opts.get('save_directory', None)
+
+        # Each build draws a new figure, so annotations, lookups and append only see its series
+        self.series = []
+        self.dropped_points = {}
+        cached = self.cache.figures.get(cache_key) if cache_key else None
+        restored = False
+        if cached is not None:
+            with self._span('cache_restore'):
+                restored = self._restore_figure(cached, df, groupby_col, num_col)
+        if not restored:
+            with self._span('figure'):
+                self._build_figure(df, title, axes_data, chart_type, merged_opts, groupby_col, num_col)
+        if lean:
+            for series in self.series:
+                series["col"] = None
+                if self.dropped_points.get(series["label"]):
+                    # the trace lacks the dropped points, so lookups load the column again
+                    series["reload"] = functools.partial(self._lean_column, reload, series["label"], groupby_col, num_col)
+            if isinstance(self.fig, DictFigure):
+                self.fig.own_arrays()  # raw traces may still be views of df
+        if restored:
+            return len(df)
+        if merged_opts.get('raw') and merged_opts.get('raw_validate'):
+            with self._span('validate'):
+                self.fig.validate()  # debug check: build a go.Figure once to catch invalid properties
+
+        if cache_key:
+            with self._span('cache_store'):
+                self.cache.figures.set(cache_key, self._figure_state())
+        return len(df)
+
+    def _figure_state(self):
+        # What the figure cache keeps of a build, as JSON: the figure, and the series it plotted
+        # without their data, which _restore_figure takes from the frame again
+        ctx = self._append_ctx
+        if ctx is not None:
+            ctx = {key: value for key, value in ctx.items() if key in _CACHED_CTX}
+        return to_json_plotly({
+            'fig': self.fig.to_plotly_json(),
+            'raw': isinstance(self.fig, DictFigure),
+            'series': [{key: value for key, value in series.items() if key not in _SERIES_DATA}
+                       for series in self.series],
+            'color_index': self.color_index,
+            'dropped_points': [[label, dropped] for label, dropped in self.dropped_points.items()],
+            'append_ctx': ctx,
+        }).encode('utf-8')
+
+    def _restore_figure(self, cached, df, groupby_col, num_col):
+        """Sets up the figure and series of a cached build of df; False if the entry can't be read."""
+        try:
+            state = json.loads(cached)
+        except ValueError:
+            return False  # e.g. written by an older version
+        if self._datetime_index:
+            # JSON holds dates as ISO strings; plotted dates go back to datetime64 so append can extend them
+            key = 'y' if self.merged_opts.orientation == 'h' else 'x'
+            for trace in [state['fig']['data'][series["trace"]] for series in state['series']]:
+                if isinstance(trace.get(key), list):
+                    trace[key] = pd.to_datetime(trace[key], format='ISO8601').to_numpy()
+        if state['raw']:
+            fig = DictFigure.from_dict(state['fig'])
+        else:
+            # The stored figure was validated when it was first built, so skip re-validating it
+            fig = go.Figure(state['fig'], _validate=False)
+            fig._validate = True
+
+        self.fig = fig
+        partition = partition_groups(df, groupby_col, num_col) if groupby_col and num_col and state['series'] else None
+        for series in state['series']:
+            if partition is not None:
+                positions = partition['positions'].get(series["label"])
+                series["col"] = df[num_col].iloc[positions] if positions is not None else None
+            else:
+                series["col"] = df[series["label"]] if series["label"] in df.columns else None
+            series["stats"] = series_stats(self._series_col(series))
+            self.series.append(series)
+        self.color_index = state['color_index']
+        self.dropped_points.update({label: dropped for label, dropped in state['dropped_points']})
+        ctx = state['append_ctx']
+        if ctx is not None:
+            ctx["ticks"] = self._tick_state(df.index) if self._datetime_index else None
+        self._append_ctx = ctx
+        return True
+
+    def _build_figure(self, df, title, axes_data, chart_type, merged_opts, groupby_col, num_col):
+        orientation = merged_opts.orientation
         plotted_cols = []
 
         space_buffer = " " * merged_opts.get('space_buffer')
@@ -224,25 +679,28 @@ class ChartMaker:
                 percent=False
             else:
                 percent=True
-            df, total = to_percentage(df, sum_col, index_col, percent=percent)
-            padded_labels = [f"{label}    " for label in df.index]
-
-            fig = go.Figure(data=[
-                go.Pie(
-                    labels=padded_labels,
-                    values=df[sum_col],
-                    hole=hole_size,
-                    textinfo=textinfo,
-                    showlegend=show_legend,
-                    texttemplate=texttemplate,
-                    marker=dict(colors=colors, line=dict(color='white', width=line_width)),
-                    textfont=dict(
-                        family=font_family,
-                        size=text_font_size,
-                        color=text_font_color
-                    ),
-                )
-            ])
+            with self._span('aggregate'):
+                df, total = to_percentage(df, sum_col, index_col, percent=percent, top_n=merged_opts.get("top_n"),
+                                          min_share=merged_opts.get("min_share"), other_label=merged_opts.get("other_label", "Other"))
+            padded_labels = (df.index.astype(str) + "    ").tolist()
+
+            raw = merged_opts.get('raw', False)
+            pie = make_trace(
+                go.Pie, raw,
+                labels=padded_labels,
+                values=df[sum_col],
+                hole=hole_size,
+                textinfo=textinfo,
+                showlegend=show_legend,
+                texttemplate=texttemplate,
+                marker=dict(colors=colors, line=dict(color='white', width=line_width)),
+                textfont=dict(
+                    family=font_family,
+                    size=text_font_size,
+                    color=text_font_color
+                ),
+            )
+            fig = DictFigure([pie]) if raw else go.Figure(data=[pie])
 
             annote = None
             if annotation:
@@ -276,6 +734,7 @@ class ChartMaker:
             )
 
             self.fig = fig
+            self._append_ctx = None
             return  # Skip the rest for pie charts
 
         # === HEATMAP CHART HANDLING ===
@@ -297,11 +756,21 @@ class ChartMaker:
             tick_suffix = merged_opts.get("ticksuffix", {}).get("y1", "")
             bg_color = merged_opts.get("bgcolor", "#ffffff")
 
+            # Grid the long data here so the figure carries one z matrix instead of three raw columns
+            with self._span('pivot'):
+                z, x_vals, y_vals = pivot_heatmap(
+                    df[x_col], df[y_col], df[z_col],
+                    agg=merged_opts.get("heatmap_agg", "last"),
+                    max_bins=merged_opts.get("heatmap_max_bins"),
+                )
+
             colorscale = [[0, "white"], [1, color_base]]
-            fig = go.Figure(data=go.Heatmap(
-                z=df[z_col],
-                x=df[x_col],
-                y=df[y_col],
+            raw = merged_opts.get('raw', False)
+            heatmap = make_trace(
+                go.Heatmap, raw,
+                z=z,
+                x=x_vals,
+                y=y_vals,
                 colorscale=colorscale,
                 colorbar=dict(
                     title=dict(
@@ -310,7 +779,8 @@ class ChartMaker:
                     ),
                     tickfont=dict(size=legend_font_size, color=tick_color)
                 )
-            ))
+            )
+            fig = DictFigure([heatmap]) if raw else go.Figure(data=heatmap)
 
             fig.update_layout(
                 title=title,
@@ -327,34 +797,58 @@ class ChartMaker:
             fig.update_xaxes(ticksuffix=tick_suffix)
 
             self.fig = fig
+            self._append_ctx = None
             return  # skip rest
 
         # === STANDARD CHART HANDLING (line, bar, etc.) ===
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.update_layout(xaxis2=dict(overlaying='x', side='top'))
+        series_start = len(self.series)
+        raw = merged_opts.get('raw', False)
+        with self._span('subplots'):
+            if raw:
+                # plain dict figure, no graph_objects validation
+                fig = DictFigure.secondary_y()
+            else:
+                from plotly.subplots import make_subplots  # imported on first use to keep `import chartengineer` fast
+                fig = make_subplots(specs=[[{"secondary_y": True}]])
+            fig.update_layout(xaxis2=dict(overlaying='x', side='top'))
 
         if axes_data.get('x') is None and is_datetime64_any_dtype(df.index):
             axes_data['x'] = df.index.name if df.index.name else df.index
 
+        partition = None
         if groupby_col and num_col:
             print(f'groupby_col and num_col passed...')
-            sort_list, color_map = self._prepare_grouped_series(
-                df, groupby_col, num_col,
-                descending=merged_opts.get('descending', True),
-                cumulative_sort=merged_opts.get('cumulative_sort', True)
-            )
+            # One pass over the frame gives every group's rows and its sum/last/max
+            with self._span('group'):
+                partition = partition_groups(df, groupby_col, num_col)
+                sort_list, color_map = self._prepare_grouped_series(
+                    df, groupby_col, num_col,
+                    descending=merged_opts.get('descending', True),
+                    cumulative_sort=merged_opts.get('cumulative_sort', True),
+                    partition=partition
+                )
 
             axis = 'y1'  # for now assume only y1 for grouped logic
             kind = chart_type.get(axis, 'bar').lower()
-            trace_class = trace_map.get(kind, go.Bar)
             secondary = False  # override if needed later
 
-            for i in sort_list:
-                i_df = df[df[groupby_col] == i]
+            number_format = merged_opts.number_format(axis)
+
+            group_dfs = [df.iloc[partition['positions'][i]] for i in sort_list]
+            last_vals = [i_df[num_col].values[-1] for i_df in group_dfs]
+            # Format every group's last value in one batch for the legend (and bar labels)
+            with self._span('labels'):
+                last_texts = format_values(last_vals, **number_format)
+
+            for i, i_df, last_val, last_text in zip(sort_list, group_dfs, last_vals, last_texts):
                 color = color_map.get(i)
-                last_val = i_df[num_col].values[-1]
+                full_col = i_df[num_col]
 
-                name = f'{i} ({merged_opts.get("tickprefix").get(axis) or ""}{clean_values(last_val, decimals=merged_opts["decimals"], decimal_places=merged_opts["decimal_places"])}{merged_opts.get("ticksuffix").get(axis) or ""})'
+                keep = self._points_to_keep(i_df.index, full_col, kind, axis, i, merged_opts)
+                if keep is not None:
+                    i_df = i_df.iloc[keep]
+
+                name = f'{i} ({last_text})'
 
                 trace_args = {
                     "name": name,
@@ -362,24 +856,15 @@ class ChartMaker:
                 }
 
                 # Add text labels if enabled
-                if merged_opts.get("show_text", False):
-                    decimal_places = merged_opts.get("decimal_places", 1)
-                    decimals = merged_opts.get("decimals", True)
-                    tickprefix = merged_opts.get("tickprefix", {}).get(axis) or ''
-                    ticksuffix = merged_opts.get("ticksuffix", {}).get(axis) or ''
-                    text_freq = merged_opts.get("text_freq", 1)
+                if merged_opts.show_text:
                     textposition = merged_opts.get("textposition", "top center")
 
                     # Build text values per row (or single value if bar)
                     if kind == "bar":
-                        text_val = f"{tickprefix}{clean_values(last_val, decimal_places=decimal_places, decimals=decimals)}{ticksuffix}"
-                        trace_args["text"] = [text_val]
+                        trace_args["text"] = [last_text]
                     else:
-                        trace_args["text"] = [
-                            f"{tickprefix}{clean_values(v, decimal_places=decimal_places, decimals=decimals)}{ticksuffix}"
-                            if i % text_freq == 0 else ""
-                            for i, v in enumerate(i_df[num_col])
-                        ]
+                        with self._span('labels'):
+                            trace_args["text"] = format_values(i_df[num_col], text_freq=merged_opts.text_freq, **number_format)
 
                     trace_args["textposition"] = validate_textposition(kind, textposition)
 
@@ -414,99 +899,140 @@ class ChartMaker:
                         "x": i_df.index,
                         "y": i_df[num_col],
                         "mode": merged_opts.get("mode", "lines"),
-                        "line": dict(color=color, width=merged_opts.get("line_width", 3))
+                        "line": dict(color=color, width=merged_opts.line_width)
                     })
                 if kind == 'area':
                     trace_args["stackgroup"] = 'one'
+                    if keep is not None:
+                        # downsampled groups no longer share x values, so interpolate rather than stack zeros
+                        trace_args["stackgaps"] = 'interpolate'
                 
-                fig.add_trace(trace_class(**trace_args), secondary_y=secondary)
-                self.series.append({"col": i_df[num_col], "name": name})
+                trace_class = resolve_trace_class(kind, len(i_df), merged_opts.get('render_backend', 'svg'),
+                                                  merged_opts.get('webgl_threshold', 10000), default=go.Bar)
+                with self._span('trace', points=len(i_df)):
+                    fig.add_trace(make_trace(trace_class, raw, **trace_args), secondary_y=secondary)
+                self.series.append({"col": full_col, "name": name, "label": i, "legend_label": f'{i}', "name_buffer": '',
+                                    "axis": axis, "kind": kind, "trace": len(fig.data) - 1, "stats": series_stats(full_col)})
         else:
             for axis in ['y1', 'y2']:
                 secondary = axis == 'y2'
-                for col in axes_data.get(axis, []):
-                    if col not in df.columns:
-                        continue
+                number_format = merged_opts.number_format(axis)
+                axis_cols = [col for col in axes_data.get(axis, []) if col in df.columns]
+                # Format the legend's last values for the whole axis in one batch
+                with self._span('labels'):
+                    last_texts = format_values([df[col].iloc[-1] for col in axis_cols], **number_format)
 
+                for col, last_text in zip(axis_cols, last_texts):
                     color = self.get_next_color()
                     kind = chart_type.get(axis, "line").lower()
-                    trace_class = trace_map.get(kind, go.Scatter)
 
-                    name = f"{col.replace('_', ' ').upper()} ({merged_opts.get('tickprefix', {}).get(axis) or ''}{clean_values(df[col].iloc[-1], decimals=merged_opts.get('decimals', True), decimal_places=merged_opts.get('decimal_places', 1))}{merged_opts.get('ticksuffix', {}).get(axis) or ''}){space_buffer}"
+                    name = f"{col.replace('_', ' ').upper()} ({last_text}){space_buffer}"
 
-                    text_bool = merged_opts.get('show_text', False)
-                    text_freq = merged_opts.get('text_freq', None)
-                    tickprefix = merged_opts.get("tickprefix", {}).get(axis) or ''
-                    ticksuffix = merged_opts.get("ticksuffix", {}).get(axis) or ''
+                    text_bool = merged_opts.show_text
+                    text_freq = merged_opts.text_freq
                     textposition = validate_textposition(kind, merged_opts.get("textposition"))
 
-                    if text_bool and text_freq and col in df.columns:
-                        text_values = [
-                            f"{tickprefix}{clean_values(val, decimal_places=merged_opts.get('decimal_places', 1), decimals=merged_opts.get('decimals', True))}{ticksuffix}"
-                            if i % text_freq == 0 else ""
-                            for i, val in enumerate(df[col])
-                        ]
+                    plot_index, plot_values = df.index, df[col]
+                    keep = self._points_to_keep(plot_index, plot_values, kind, axis, col, merged_opts)
+                    if keep is not None:
+                        plot_index, plot_values = plot_index[keep], plot_values.iloc[keep]
+
+                    if text_bool and text_freq:
+                        with self._span('labels'):
+                            text_values = format_values(plot_values, text_freq=text_freq, **number_format)
                     else:
                         text_values = None
 
                     if orientation == 'h':
                         if kind in ['line', 'area', 'scatter']:
                             trace_args = {
-                                "x": df[col],
-                                "y": df.index,
+                                "x": plot_values,
+                                "y": plot_index,
                                 "name": name,
                                 "mode": "lines+text" if text_values else merged_opts.get("mode", "lines"),
-                                "line": dict(color=color, width=merged_opts.get("line_width", 3)),
+                                "line": dict(color=color, width=merged_opts.line_width),
                                 "text": text_values,
                                 "textposition": textposition if text_values else None,
-                                "showlegend": merged_opts.get("show_legend", False)
+                                "showlegend": merged_opts.show_legend
                             }
                             if kind == 'area':
                                 trace_args["stackgroup"] = 'one'
+                                if keep is not None:
+                                    trace_args["stackgaps"] = 'interpolate'
                         elif kind == 'bar':
                             trace_args = {
-                                "x": df[col],
-                                "y": df.index,
+                                "x": plot_values,
+                                "y": plot_index,
                                 "name": name,
                                 "orientation": "h",
                                 "marker": dict(color=color),
                                 "text": text_values,
                                 "textposition": textposition if text_values else None,
-                                "showlegend": merged_opts.get("show_legend", False)
+                                "showlegend": merged_opts.show_legend
                             }
                     else:
                         if kind in ['line', 'area', 'scatter']:
                             trace_args = {
-                                "x": df.index,
-                                "y": df[col],
+                                "x": plot_index,
+                                "y": plot_values,
                                 "name": name,
                                 "mode": "lines+text" if text_values else merged_opts.get("mode", "lines"),
-                                "line": dict(color=color, width=merged_opts.get("line_width", 3)),
+                                "line": dict(color=color, width=merged_opts.line_width),
                                 "text": text_values,
                                 "textposition": textposition if text_values else None,
-                                "showlegend": merged_opts.get("show_legend", False)
+                                "showlegend": merged_opts.show_legend
                             }
                             if kind == 'area':
                                 trace_args["stackgroup"] = 'one'
+                                if keep is not None:
+                                    trace_args["stackgaps"] = 'interpolate'
                         elif kind == 'bar':
                             trace_args = {
-                                "x": df.index,
-                                "y": df[col],
+                                "x": plot_index,
+                                "y": plot_values,
                                 "name": name,
                                 "orientation": "v",
                                 "marker": dict(color=color),
                                 "text": text_values,
                                 "textposition": textposition if text_values else None,
-                                "showlegend": merged_opts.get("show_legend", False)
+                                "showlegend": merged_opts.show_legend
                             }
                     if orientation == "h" and secondary:
                         trace_args["xaxis"] = "x2"
                         trace_args["yaxis"] = "y"
 
-                    fig.add_trace(trace_class(**trace_args), secondary_y=secondary)
-                    self.series.append({"col": df[col], "name": name})
+                    trace_class = resolve_trace_class(kind, len(plot_values), merged_opts.get('render_backend', 'svg'),
+                                                      merged_opts.get('webgl_threshold', 10000))
+                    with self._span('trace', points=len(plot_values)):
+                        fig.add_trace(make_trace(trace_class, raw, **trace_args), secondary_y=secondary)
+                    self.series.append({"col": df[col], "name": name, "label": col, "legend_label": col.replace('_', ' ').upper(),
+                                        "name_buffer": space_buffer, "axis": axis, "kind": kind, "trace": len(fig.data) - 1,
+                                        "stats": series_stats(df[col])})
                     plotted_cols.append(col)
 
+        with self._span('layout'):
+            self._style_axes(fig, df, axes_data, chart_type, merged_opts, partition)
+
+        ticks = None
+        if pd.api.types.is_datetime64_any_dtype(df.index):
+            with self._span('ticks'):
+                ticks = self._tick_state(df.index)
+                self._apply_ticks(fig, df.index, merged_opts, spacing=ticks["spacing"])
+
+        self.fig = fig
+        # What append() needs to extend these traces later
+        self._append_ctx = {
+            "series_start": series_start,
+            "groupby_col": groupby_col if partition is not None else None,
+            "num_col": num_col,
+            "orientation": orientation,
+            "along_index": partition is None or kind != 'bar' or is_datetime64_any_dtype(df.index),
+            "ticks": ticks,
+        }
+
+    def _style_axes(self, fig, df, axes_data, chart_type, merged_opts, partition):
+        """Layout, legend and axis titles/colors/ticks of a line, bar or area chart."""
+        orientation = merged_opts.orientation
         # Layout config
         fig.update_layout(
             xaxis_title=merged_opts.get('axes_titles').get('x', ''),
@@ -520,14 +1046,14 @@ class ChartMaker:
                 bordercolor=merged_opts.get('legend_background').get('bordercolor'),
                 borderwidth=merged_opts.get('legend_background').get('borderwidth'),
                 traceorder=merged_opts.get('legend_background').get('traceorder'),
-                font=dict(size=merged_opts["font_size"]["legend"], family=merged_opts["font_family"], color=merged_opts['font_color'])
+                font=dict(size=merged_opts.font_size["legend"], family=merged_opts.font_family, color=merged_opts.font_color)
             ),
             template='plotly_white',
             hovermode='x unified',
             width=merged_opts.get('dimensions').get('width'),
             height=merged_opts.get('dimensions').get('height'),
             margin=merged_opts["margin"],
-            font=dict(color=merged_opts["font_color"], size=merged_opts["font_size"]["axes"], family=merged_opts["font_family"]),
+            font=dict(color=merged_opts.font_color, size=merged_opts.font_size["axes"], family=merged_opts.font_family),
             autosize=merged_opts["autosize"],
             barmode=merged_opts['barmode'],
         )
@@ -543,15 +1069,14 @@ class ChartMaker:
             y1_title_text = merged_opts.get('axes_titles').get('y1', '')
             y2_title_text = merged_opts.get('axes_titles').get('y2', '')
 
-        if not axes_data.get('y2'):
-            merged_opts['auto_color'] = False
+        auto_color = merged_opts.get('auto_color') and axes_data.get('y2')
 
-        y1_color = self.colors[0] if merged_opts.get('auto_color') else 'black'
-        y2_color = self.colors[1] if merged_opts.get('auto_color') else 'black'
+        y1_color = self.colors[0] if auto_color else 'black'
+        y2_color = self.colors[1] if auto_color else 'black'
 
         # determine if we should hide the “value” axis when we're only showing text on bars
         hide_vals = (
-            merged_opts.get("show_text", False)
+            merged_opts.show_text
             and all(chart_type.get(ax, "").lower() == "bar" for ax in chart_type)
         )
 
@@ -578,13 +1103,13 @@ class ChartMaker:
                 tickprefix=merged_opts.get("tickprefix", {}).get("y1", ""),
                 ticksuffix=merged_opts.get("ticksuffix", {}).get("y1", ""),
                 tickformat=merged_opts.get("tickformat", {}).get("x", ""),
-                tickfont=dict(color=merged_opts["font_color"])
+                tickfont=dict(color=merged_opts.font_color)
             )
             # leave y‐axis (categories) visible, label it with the x‐axis title
             fig.update_yaxes(
                 title_text=merged_opts.get('axes_titles').get('x', ''),
-                color=merged_opts["font_color"],
-                tickfont=dict(color=merged_opts["font_color"])
+                color=merged_opts.font_color,
+                tickfont=dict(color=merged_opts.font_color)
             )
         else:
             # ─── vertical: hide y1‐axis if hiding values ───
@@ -596,7 +1121,7 @@ class ChartMaker:
                 tickprefix=merged_opts.get("tickprefix", {}).get("y1", ""),
                 ticksuffix=merged_opts.get("ticksuffix", {}).get("y1", ""),
                 tickformat=merged_opts.get("tickformat", {}).get("y1", ""),
-                tickfont=dict(color=merged_opts["font_color"])
+                tickfont=dict(color=merged_opts.font_color)
             )
             # y2 (if used) remains visible
             fig.update_yaxes(
@@ -606,12 +1131,12 @@ class ChartMaker:
                 tickprefix=merged_opts.get("tickprefix", {}).get("y2", ""),
                 ticksuffix=merged_opts.get("ticksuffix", {}).get("y2", ""),
                 tickformat=merged_opts.get("tickformat", {}).get("y2", ""),
-                tickfont=dict(color=merged_opts["font_color"])
+                tickfont=dict(color=merged_opts.font_color)
             )
             # always leave x‐axis visible
             fig.update_xaxes(
                 title_text=merged_opts.get('axes_titles').get('x', ''),
-                tickfont=dict(color=merged_opts["font_color"]),
+                tickfont=dict(color=merged_opts.font_color),
                 tickformat=merged_opts.get("tickformat", {}).get("x", "")
             )
 
@@ -619,9 +1144,9 @@ class ChartMaker:
         try:
             if any(chart_type.get(axis, "") == "bar" for axis in chart_type):
                 textposition = merged_opts.get("textposition", "")
-                if merged_opts.get("show_text", False) and validate_textposition("bar", textposition) == "outside":
-                    if groupby_col and num_col:
-                        series = df.groupby(groupby_col)[num_col].max()
+                if merged_opts.show_text and validate_textposition("bar", textposition) == "outside":
+                    if partition is not None:
+                        series = partition['max']
                     else:
                         series = pd.concat([
                             df[col] for axis in ['y1', 'y2']
@@ -652,23 +1177,172 @@ class ChartMaker:
         except Exception as e:
             print(f"Warning: could not apply axis buffer: {e}")
 
-        if pd.api.types.is_datetime64_any_dtype(df.index):
-            unique_days = df.index.to_series().diff().dt.days.dropna().mode().iloc[0]
-            
-            if unique_days >= 7:
-                # Only apply custom ticks if your index is monthly/weekly/etc
-                fig.update_xaxes(
-                    tickmode="array",
-                    tickvals=list(df.index)
-                )
-            else:
-                # Let Plotly decide for dense series
-                fig.update_xaxes(tickmode="auto")
+    @staticmethod
+    def _tick_state(index):
+        # What append() re-plans ticks from instead of the whole index: the spacing, the bounds
+        # and, while there are few of them, the distinct dates
+        spacing = infer_spacing(index)
+        start, end = index.min(), index.max()
+        dates = None
+        if spacing is not None and (end - start) / spacing <= _TICK_DATES:
+            dates = index.unique().sort_values()
+            dates = dates if len(dates) <= _TICK_DATES else None
+        return {"spacing": spacing, "start": start, "end": end, "dates": dates}
+
+    def _apply_ticks(self, fig, index, merged_opts, spacing=None):
+        # Weekly-or-coarser series get a capped set of calendar-aligned ticks; denser ones are left to Plotly
+        tickvals = plan_ticks(index, width=merged_opts.get("dimensions", {}).get("width", 730),
+                              max_ticks=merged_opts.get("max_ticks"), spacing=spacing)
+        if tickvals is not None:
+            fig.update_xaxes(tickmode="array", tickvals=tickvals)
+        else:
+            fig.update_xaxes(tickmode="auto", tickvals=None)
 
-        self.fig = fig
+    @_timed('append')
+    def append(self, new_rows):
+        """
+        Extends the traces of the last build with new rows (same columns as the built frame)
+        instead of rebuilding the chart. Rows whose index value (and group, for grouped charts)
+        is already plotted are skipped, as are all but the last of repeated ones in new_rows.
+        The rows are kept as a chunk rather than concatenated onto the stored frame, only the
+        new rows are formatted and written into buffers that back the traces, ticks are
+        re-planned from a summary of the index, and traces built with max_points stay within it,
+        so an update costs time proportional to the new rows. Legend last values are updated too.
+        Rows for groups the chart doesn't plot raise a ValueError. Returns the rows actually added.
+        """
+        ctx = self._append_ctx
+        if self._reloaders and self.df is None:
+            raise ValueError("append needs the built data; build without options={'lean': True}.")
+        if self.fig is None or not self._df_chunks or ctx is None:
+            raise ValueError("append needs a line/bar/area chart built with build() first.")
+        if not ctx["along_index"]:
+            raise ValueError("append only supports charts plotted along the DataFrame index.")
+        if isinstance(self.fig, DictFigure):
+            raise ValueError("append isn't supported for raw figures; build without options={'raw': True}.")
+
+        opts = self.merged_opts
+        built = self._df_chunks[0]
+        if frame_kind(new_rows) is not None:
+            new_rows = to_frame(new_rows, list(built.columns), index_col=built.index.name or opts.get('index_col'))
+        if opts.get('normalize') == True:
+            new_rows = normalize_to_percent(df=new_rows, num_col=ctx["num_col"], dtype=opts.get('normalize_dtype'))
+        new_rows = new_rows.sort_index(kind='stable')
+
+        # Dedupe on index values (and groups), against only the part of the history that overlaps the new rows
+        group = ctx["groupby_col"]
+        def keys(frame):
+            return pd.MultiIndex.from_arrays([frame.index, frame[group]]) if group else frame.index
+        new_rows = new_rows[~keys(new_rows).duplicated(keep='last')]
+        if new_rows.empty:
+            return new_rows
+        tail = self._df_tail(new_rows.index[0])
+        added = new_rows[~keys(new_rows).isin(keys(tail))]
+        if added.empty:
+            return added
+        if "last" not in ctx:
+            ctx["last"] = max(chunk.index.max() for chunk in self._df_chunks if len(chunk))
+        if added.index[0] < ctx["last"]:
+            raise ValueError("append only adds rows after the current end of the index; call build to insert history.")
+
+        partition = None
+        if group:
+            partition = partition_groups(added, group, ctx["num_col"])
+            plotted = {s["label"] for s in self.series[ctx["series_start"]:]}
+            new_groups = [label for label in partition['positions'] if label not in plotted]
+            if new_groups:
+                raise ValueError(f"append can't add traces for new groups ({', '.join(map(str, new_groups))}); "
+                                 f"call build to draw them.")
+
+        ctx["last"] = added.index[-1]
+        self._df_chunks.append(added)
+
+        fig = self.fig
+        method = opts.get('downsample_method', 'lttb')
+        with fig.batch_update():
+            for s in self.series[ctx["series_start"]:]:
+                if partition is not None:
+                    if s["label"] not in partition['positions']:
+                        continue
+                    new_vals = added[ctx["num_col"]].iloc[partition['positions'][s["label"]]]
+                else:
+                    if s["label"] not in added.columns:
+                        continue
+                    new_vals = added[s["label"]]
+
+                number_format = opts.number_format(s["axis"])
+                s.setdefault("tail", []).append(new_vals)
+                s.pop("lookup", None)
+                s["stats"] = merge_stats(s["stats"], series_stats(new_vals))
+
+                trace = fig.data[s["trace"]]
+                index_key, value_key = ('y', 'x') if ctx["orientation"] == 'h' else ('x', 'y')
+                points = s.get("points")
+                if points is None:
+                    # First append to this trace: its points are copied once into buffers with room to
+                    # grow (trace_values decodes the typed arrays of figures restored from the cache)
+                    index, values = trace_values(trace, index_key), trace_values(trace, value_key)
+                    text = list(trace.text) if trace.text is not None and len(trace.text) == len(values) else None
+                    points = s["points"] = {"index": index, "values": values, "text": text, "size": len(values)}
+                size = points["size"]
+                new_index, new_values = new_vals.index.to_numpy(), new_vals.to_numpy()
+                points["index"] = extend_buffer(points["index"], size, new_index)
+                points["values"] = extend_buffer(points["values"], size, new_values)
+                if points["text"] is not None:
+                    points["text"].extend(format_values(new_values, text_freq=opts.text_freq, offset=size, **number_format))
+                size = points["size"] = size + len(new_values)
+                index, values, text = points["index"][:size], points["values"][:size], points["text"]
+
+                # Keep max_points: once the trace outgrows it, its points are thinned (not the history)
+                max_points = self._max_points(s["kind"], s["axis"], s["label"], opts)
+                raw_tail = s.get("raw_tail", 0) + len(new_values)
+                if max_points and size > max_points:
+                    with self._span('downsample', points=size):
+                        keep = compact_points(index, values, raw_tail, s["stats"]["n"], max_points, method=method)
+                    index, values = index[keep], values[keep]
+                    text = [text[i] for i in keep] if text is not None else None
+                    s["points"] = {"index": index, "values": values, "text": text, "size": len(keep)}
+                    raw_tail = 0
+                    self.dropped_points[s["label"]] = s["stats"]["n"] - len(keep)
+                    if s["kind"] == 'area':
+                        trace.stackgaps = 'interpolate'
+                s["raw_tail"] = raw_tail
+
+                # Assigning through plotly validates (copies and compares) the whole array on every
+                # append; the buffers hold arrays it has already accepted, so the trace takes views of them
+                trace._props[index_key] = index
+                trace._props[value_key] = values
+                if text is not None:
+                    trace._props['text'] = text
+
+                last_text = format_values(new_values[-1:], **number_format)[0]
+                s["name"] = trace.name = f'{s["legend_label"]} ({last_text}){s["name_buffer"]}'
+
+            ticks = ctx.get("ticks")
+            if ticks is not None and is_datetime64_any_dtype(added.index):
+                ticks["start"], ticks["end"] = min(ticks["start"], added.index[0]), max(ticks["end"], added.index[-1])
+                if ticks["dates"] is not None:
+                    dates = ticks["dates"].union(added.index.unique())
+                    ticks["dates"] = dates if len(dates) <= _TICK_DATES else None
+                index = ticks["dates"] if ticks["dates"] is not None else pd.DatetimeIndex([ticks["start"], ticks["end"]])
+                self._apply_ticks(fig, index, opts, spacing=ticks["spacing"])
+
+        return added
+
+    def _df_tail(self, start):
+        # Stored rows from index value start on, cut from the trailing chunks while they're sorted
+        rows = []
+        for chunk in reversed(self._df_chunks):
+            if not chunk.index.is_monotonic_increasing:
+                return self.df
+            pos = chunk.index.searchsorted(start, side='left')
+            rows.append(chunk.iloc[pos:])
+            if pos > 0:
+                break
+        return pd.concat(rows[::-1]) if len(rows) > 1 else rows[0]
 
     def add_title(self,title=None,subtitle=None, x=0.25, y=0.9):
         # Add a title and subtitle
+        self._record_call('add_title', title=title, subtitle=subtitle, x=x, y=y)
         if not hasattr(self, 'title_position') or title_position is None:
             title_position = {'x': None, 'y': None}
 
@@ -693,64 +1367,96 @@ class ChartMaker:
                 'font': {
                 'color': 'black',  # Set the title color here
                 'size': 27,  # You can also adjust the font size
-                'family': self.merged_opts['font_family']}
+                'family': self.merged_opts.font_family}
             },
         )
     
-    def add_annotations(self, max_annotation=True, custom_annotations=None, annotation_placement=dict(x=0.5,y=0.5)):
-        if self.df is None or self.fig is None:
-            return  # Cannot annotate without a figure and data
-        
+    def _point_label(self, idx, val, axis, datetime_tick):
+        opts = self.merged_opts
+        date_text = idx.strftime(opts.get("datetime_format", "%b. %d, %Y")) if datetime_tick else idx
+        return f'{date_text}:<br>{opts.prefix(axis)}{clean_values(val, decimal_places=opts.decimal_places, decimals=opts.decimals)}{opts.suffix(axis)}'
+
+    def _series_col(self, series):
+        # A lean build drops the series' column; its trace still has the plotted points, and
+        # downsampled series load the column again
+        if series.get("tail"):
+            # rows added by append, joined on first use
+            series["col"] = pd.concat([series["col"], *series["tail"]])
+            series["tail"] = []
+        if series["col"] is not None:
+            return series["col"]
+        if series.get("reload") is not None:
+            # max_points left some of the column's points out of the trace
+            try:
+                col = series["reload"]()
+            except ValueError:
+                # the caller has released the data; only return_df needs all of it, lookups make
+                # do with the plotted points from now on
+                series["reload"] = col = None
+            if col is not None:
+                return col
+        trace = self.fig.data[series["trace"]]
+        x, y = trace_values(trace, 'x'), trace_values(trace, 'y')
+        if self.merged_opts.orientation == 'h':
+            x, y = y, x
+        # figures read back from the cache hold dates as ISO strings
+        return pd.Series(y, index=pd.DatetimeIndex(x) if self._datetime_index else pd.Index(x))
+
+    def _lookup_table(self, series):
+        # Sorted index and numeric values of the series, built on the first lookup after build
+        # or append and kept with its stats
+        table = series.get("lookup")
+        if table is None:
+            table = lookup_table(self._series_col(series), series["stats"]["sorted"])
+            if series.get("reload") is None:
+                series["lookup"] = table  # not for lean builds, which don't keep the data
+        return table
+
+    def _values_at(self, keys, series=None):
+        """
+        For each key, picks the series (default: all plotted) with the highest value there.
+        Returns (positions in series, values, found); position -1 where no series has a value.
+        """
+        lookups = [lookup_values(None, keys, table=self._lookup_table(s)) for s in (series or self.series)]
+        values = np.vstack([v for v, _ in lookups])
+        found = np.vstack([f for _, f in lookups]).any(axis=0)
+        has_value = ~np.isnan(values).all(axis=0)
+        best = np.where(has_value, np.argmax(np.where(np.isnan(values), -np.inf, values), axis=0), -1)
+        picked = np.where(has_value, values[np.maximum(best, 0), np.arange(values.shape[1])], np.nan)
+        return best, picked, found
+
+    @_timed('add_annotations', count='annotations')
+    def add_annotations(self, max_annotation=True, custom_annotations=None, annotation_placement=dict(x=0.5,y=0.5), series=None):
+        """
+        Annotates the first, last and (with max_annotation) highest point of each plotted series, using
+        the stats recorded by build. series: labels (columns or groups) to annotate, default all.
+        custom_annotations: {index value: text}, placed on the highest series at that index value.
+        Returns the number of annotations added.
+        """
+        if self.fig is None:
+            return 0  # Cannot annotate without a figure
+        self._record_call('add_annotations', max_annotation=max_annotation, custom_annotations=custom_annotations,
+                          annotation_placement=annotation_placement, series=series)
+
         opts = self.merged_opts
         fig = self.fig
-        df = self.df
 
-        font_color = opts.get("font_color", "black")
-        font_family = opts.get("font_family", "Cardo")
-        text_font_size = opts.get("font_size", {}).get("textfont", 12)
-        datetime_format = opts.get("datetime_format", "%b. %d, %Y")
-        decimal_places = opts.get("decimal_places", 1)
-        decimals = opts.get("decimals", True)
-        tickprefix = opts.get("tickprefix", {}).get("y1") or ''
-        ticksuffix = opts.get("ticksuffix", {}).get("y1") or ''
+        font_color = opts.font_color
+        font_family = opts.font_family
+        text_font_size = opts.font_size.get("textfont", 12)
+        decimal_places = opts.decimal_places
+        decimals = opts.decimals
         annotations = opts.get("annotations", True)
         max_annotation_bool = opts.get("max_annotation", max_annotation)
 
-        # Determine which column was plotted
-        y1_cols = self.merged_opts.get("axes_titles", {}).get("y1", [])
-        y2_cols = self.merged_opts.get("axes_titles", {}).get("y2", [])
-        plotted_cols = self.series
-
-        if len(plotted_cols) != 1:
-            return  # Only annotate if exactly one series was plotted
-
-        y1_col = plotted_cols[0]["col"].name
-
-        # Determine if index is datetime
-        datetime_tick = pd.api.types.is_datetime64_any_dtype(df.index)
-
-        df = df.sort_index()  # Ensure consistent order
-
-        first_idx = df.index[0]
-        first_val = df.loc[first_idx, y1_col]
-
-        last_idx = df.index[-1]
-        last_val = df.loc[last_idx, y1_col]
-
-        first_text = f'{first_idx.strftime(datetime_format) if datetime_tick else first_idx}:<br>{tickprefix}{clean_values(first_val, decimal_places=decimal_places, decimals=decimals)}{ticksuffix}'
-        last_text = f'{last_idx.strftime(datetime_format) if datetime_tick else last_idx}:<br>{tickprefix}{clean_values(last_val, decimal_places=decimal_places, decimals=decimals)}{ticksuffix}'
-
-        if isinstance(fig.data[0], go.Pie):
-            total = sum(fig.data[0].values)
-            annotation_prefix = opts.get("tickprefix", {}).get("y1", "")
-            annotation_suffix = opts.get("ticksuffix", {}).get("y1", "")
-            
-            total_text = f'{annotation_prefix}{clean_values(total, decimals=decimals, decimal_places=decimal_places)}{annotation_suffix}'
+        if len(fig.data) and trace_prop(fig.data[0], 'type') == 'pie':
+            total = sum(trace_prop(fig.data[0], 'values'))
+            total_text = f'{opts.prefix("y1")}{clean_values(total, decimals=decimals, decimal_places=decimal_places)}{opts.suffix("y1")}'
 
             pie_annotation = dict(
                 text=f"Total: {total_text}",
                 x=annotation_placement['x'],
-                y=annotation_placement['x'],
+                y=annotation_placement['y'],
                 font=dict(
                     size=text_font_size,
                     family=font_family,
@@ -762,170 +1468,179 @@ class ChartMaker:
                 align='center'
             )
             fig.update_layout(annotations=[pie_annotation])
+            return 1
 
-        orientation = self.merged_opts.get("orientation", "v")
+        plotted = [s for s in self.series if series is None or s["label"] in series]
+        if not plotted:
+            return 0
 
-        if annotations:
+        # Determine if index is datetime
+        datetime_tick = self._datetime_index
+        orientation = opts.orientation
+        font = dict(size=text_font_size, family=font_family, color=font_color)
 
-            # For the last point
-            fig.add_annotation(dict(
-                x=last_val if orientation == 'h' else last_idx,
-                y=last_idx if orientation == 'h' else last_val,
-                text=last_text,
-                showarrow=True,
-                arrowhead=2,
-                arrowsize=1.5,
-                arrowwidth=1.5,
-                ax=10,
-                ay=-50,
-                font=dict(size=text_font_size, family=font_family, color=font_color),
-                xref='x',
-                yref='y',
-                arrowcolor='black'
-            ))
+        new_annotations = []
 
-            # For the first point
-            fig.add_annotation(dict(
-                x=first_val if orientation == 'h' else first_idx,
-                y=first_idx if orientation == 'h' else first_val,
-                text=first_text,
+        def point(idx, val, text, ax, axis):
+            new_annotations.append(dict(
+                x=val if orientation == 'h' else idx,
+                y=idx if orientation == 'h' else val,
+                text=text,
                 showarrow=True,
                 arrowhead=2,
                 arrowsize=1.5,
                 arrowwidth=1.5,
-                ax=10,
+                ax=ax,
                 ay=-50,
-                font=dict(size=text_font_size, family=font_family, color=font_color),
+                font=font,
                 xref='x',
-                yref='y',
+                yref='y2' if axis == 'y2' and orientation != 'h' else 'y',
                 arrowcolor='black'
             ))
 
-        if max_annotation_bool:
-            max_val = df[y1_col].max()
-            max_idx = df[df[y1_col] == max_val].index[0]
-            max_text = f'{max_idx.strftime(datetime_format) if datetime_tick else max_idx}:<br>{tickprefix}{clean_values(max_val, decimal_places=decimal_places, decimals=decimals)}{ticksuffix} (ATH)'
-
-            if max_idx not in [first_idx, last_idx]:
-                fig.add_annotation(dict(
-                    x=max_val if orientation == 'h' else max_idx,
-                    y=max_idx if orientation == 'h' else max_val,
-                    text=max_text,
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1.5,
-                    arrowwidth=1.5,
-                    ax=-10,
-                    ay=-50,
-                    font=dict(size=text_font_size, family=font_family, color=font_color),
-                    xref='x',
-                    yref='y',
-                    arrowcolor='black'
-                ))
+        for s in plotted:
+            stats = s["stats"]
+            if not stats["n"]:
+                continue
+            axis = s["axis"]
+            # With several series, say which one each label belongs to
+            label = f'{s["legend_label"]}<br>' if len(self.series) > 1 else ''
+
+            if annotations:
+                point(stats["last_idx"], stats["last_val"],
+                      label + self._point_label(stats["last_idx"], stats["last_val"], axis, datetime_tick), 10, axis)
+                point(stats["first_idx"], stats["first_val"],
+                      label + self._point_label(stats["first_idx"], stats["first_val"], axis, datetime_tick), 10, axis)
+
+            if max_annotation_bool and stats["max_idx"] is not None and stats["max_idx"] not in [stats["first_idx"], stats["last_idx"]]:
+                point(stats["max_idx"], stats["max_val"],
+                      label + self._point_label(stats["max_idx"], stats["max_val"], axis, datetime_tick) + ' (ATH)', -10, axis)
 
         # Custom annotations
-        if custom_annotations is not None and isinstance(custom_annotations, dict):
-            for date, label in custom_annotations.items():
-                if date in df.index:
-                    y_val = df.loc[date, y1_col]
-                    fig.add_annotation(dict(
-                        x=y_val if orientation == 'h' else date,
-                        y=date if orientation == 'h' else y_val,
-                        text=label,
-                        showarrow=True,
-                        arrowhead=2,
-                        arrowsize=1.5,
-                        arrowwidth=1.5,
-                        ax=-10,
-                        ay=-50,
-                        font=dict(size=text_font_size, family=font_family, color=font_color),
-                        xref='x',
-                        yref='y',
-                        arrowcolor='black'
-                    ))
+        if custom_annotations is not None and isinstance(custom_annotations, dict) and custom_annotations:
+            with self._span('lookup'):
+                best, values, found = self._values_at(list(custom_annotations), plotted)
+            for (date, label), pos, y_val, hit in zip(custom_annotations.items(), best, values, found):
+                if hit and pos >= 0:
+                    point(date, y_val, label, -10, plotted[pos]["axis"])
+
+        if new_annotations:
+            with self._span('layout'):
+                extend_layout(fig, 'annotations', new_annotations)
+        return len(new_annotations)
 
     def add_dashed_line(self, date, annotation_text=None):
-        if self.df is None or self.fig is None:
+        return self.add_dashed_lines([(date, annotation_text)])
+
+    @_timed('add_dashed_lines', count='lines')
+    def add_dashed_lines(self, events, text_col='text', date_col=None):
+        """
+        Adds a dashed line and annotation for each event in one layout update; meant for timeseries data.
+        events: dates, (date, annotation_text) pairs, a {date: annotation_text} dict, or a DataFrame
+        with the dates in date_col (default: its index) and the annotation text in text_col.
+        Events without text are labelled with the series that has the max value at that date.
+        Returns the number of lines added.
+        """
+        if self.fig is None:
             print("Error: DataFrame or figure not initialized.")
-            return
+            return 0
 
         opts = self.merged_opts
-        df = self.df
         fig = self.fig
 
-        font_family = opts.get("font_family", "Cardo")
-        font_color = opts.get("font_color", "black")
-        text_font_size = opts.get("font_size", {}).get("textfont", 12)
+        font_family = opts.font_family
+        font_color = opts.font_color
+        text_font_size = opts.font_size.get("textfont", 12)
         datetime_format = opts.get("datetime_format", "%b. %d, %Y")
         line_color = opts.get("dashed_line_color", "black")
         line_width = opts.get("dashed_line_width", 3)
-        line_factor = opts.get("line_factor",1.5)
-        cols_to_plot = [s["col"].name for s in self.series] if self.series else df.columns.tolist()
-
-        if pd.api.types.is_datetime64_any_dtype(df.index):
-            date = pd.to_datetime(date)
-
-        if date not in df.index:
-            print(f"Error: {date} is not in the DataFrame index.")
-            return
-
-        if len(cols_to_plot) == 1:
-            col = cols_to_plot[0]
-        else:
-            col = df.loc[date, cols_to_plot].idxmax()
-
-        y_value = df.loc[date, col]
-
-        if pd.isna(y_value):
-            print(f"Warning: Missing value at {date} for {col}.")
-            return
-
-        orientation = self.merged_opts.get("orientation", "v")
-
-        if annotation_text is None:
-            annotation_text = f"{col}: {clean_values(y_value)}"
-
-        if orientation == 'h':
-            fig.add_shape(
-                type="line",
-                x0=0,
-                y0=date,
-                x1=y_value * line_factor,  # <<< extend the line
-                y1=date,
-                line=dict(color=line_color, width=line_width, dash="dot"),
-            )
-            fig.add_annotation(
-                x=y_value * line_factor,  # <<< move annotation slightly out too
-                y=date,
-                text=f"{annotation_text}<br>{pd.to_datetime(date).strftime(datetime_format)}",
-                showarrow=False,
-                xanchor='left',
-                yanchor='middle',
-                font=dict(size=text_font_size, family=font_family, color=font_color)
-            )
+        line_factor = opts.get("line_factor", opts.get("dashed_line_factor", 1.5))
+        if not self.series:
+            print("Error: add_dashed_line needs a line/bar/area chart.")
+            return 0
+
+        if isinstance(events, pd.DataFrame):
+            dates = events[date_col] if date_col is not None else events.index
+            texts = events[text_col] if text_col in events.columns else [None] * len(events)
+        elif isinstance(events, dict):
+            dates, texts = list(events.keys()), list(events.values())
         else:
-            fig.add_shape(
-                type="line",
-                x0=date,
-                y0=0,
-                x1=date,
-                y1=y_value * line_factor,  # <<< extend the line vertically
-                line=dict(color=line_color, width=line_width, dash="dot"),
-            )
-            fig.add_annotation(
-                x=date,
-                y=y_value * line_factor,  # <<< move annotation slightly out too
-                text=f"{annotation_text}<br>{pd.to_datetime(date).strftime(datetime_format)}",
-                showarrow=False,
-                xanchor='center',
-                yanchor='bottom',
-                font=dict(size=text_font_size, family=font_family, color=font_color)
-            )
-
-
-
-
-
-
+            events = [event if isinstance(event, (tuple, list)) else (event, None) for event in events]
+            dates, texts = [event[0] for event in events], [event[1] for event in events]
+
+        datetime_tick = self._datetime_index
+        dates = pd.Index(pd.to_datetime(dates) if datetime_tick else dates)
+        texts = [None if text is None or (not isinstance(text, str) and pd.isna(text)) else text for text in texts]
+        if not len(dates):
+            return 0
+        self._record_call('add_dashed_lines', events=list(zip(dates, texts)))
+
+        # Highest plotted series at each date, looked up with one searchsorted per series
+        with self._span('lookup'):
+            best, values, found = self._values_at(dates)
+        for date in dates[~found]:
+            print(f"Error: {date} is not in the DataFrame index.")
+        for date in dates[found & (best < 0)]:
+            print(f"Warning: Missing value at {date}.")
+
+        keep = np.flatnonzero(found & (best >= 0))
+        if not len(keep):
+            return 0
+
+        orientation = opts.orientation
+        with self._span('labels'):
+            date_texts = dates[keep].strftime(datetime_format) if datetime_tick else dates[keep].astype(str)
+            value_texts = format_values(values[keep])
+        font = dict(size=text_font_size, family=font_family, color=font_color)
+
+        shapes, annotations = [], []
+        for i, date_text, value_text in zip(keep, date_texts, value_texts):
+            date, y_value = dates[i], values[i]
+            annotation_text = texts[i]
+            if annotation_text is None:
+                annotation_text = f'{self.series[best[i]]["label"]}: {value_text}'
+            text = f"{annotation_text}<br>{date_text}"
+
+            if orientation == 'h':
+                shapes.append(dict(
+                    type="line",
+                    x0=0,
+                    y0=date,
+                    x1=y_value * line_factor,  # <<< extend the line
+                    y1=date,
+                    line=dict(color=line_color, width=line_width, dash="dot"),
+                ))
+                annotations.append(dict(
+                    x=y_value * line_factor,  # <<< move annotation slightly out too
+                    y=date,
+                    text=text,
+                    showarrow=False,
+                    xanchor='left',
+                    yanchor='middle',
+                    font=font
+                ))
+            else:
+                shapes.append(dict(
+                    type="line",
+                    x0=date,
+                    y0=0,
+                    x1=date,
+                    y1=y_value * line_factor,  # <<< extend the line vertically
+                    line=dict(color=line_color, width=line_width, dash="dot"),
+                ))
+                annotations.append(dict(
+                    x=date,
+                    y=y_value * line_factor,  # <<< move annotation slightly out too
+                    text=text,
+                    showarrow=False,
+                    xanchor='center',
+                    yanchor='bottom',
+                    font=font
+                ))
 
-            
+        # One assignment for all events instead of an add_shape/add_annotation pair each.
+        # (update_layout with the existing shapes re-walks every one of them, so it isn't used here)
+        with self._span('layout'):
+            extend_layout(fig, 'shapes', shapes)
+            extend_layout(fig, 'annotations', annotations)
+        return len(keep)
@@ -0,0 +1,399 @@
+import base64
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import plotly.io as pio
+from plotly.utils import PlotlyJSONEncoder
+
+# plotly.js typed array codes
+_TYPED_ARRAYS = {'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2', 'int32': 'i4',
+                 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8'}
+# keys whose arrays plotly.js doesn't accept as typed arrays
+_SKIP_KEYS = {'range', 'domain', 'geojson', 'layer', 'layers', 'template'}
+
+
+def _typed_array(values, float32=False):
+    arr = np.asarray(values)
+    if arr.dtype.kind not in 'iuf' or arr.size < 2:
+        return values
+    if arr.dtype.kind in 'iu' and arr.dtype.itemsize == 8:
+        # plotly.js has no 64-bit ints: use the smallest int type that fits, else float64
+        lo, hi = arr.min(), arr.max()
+        arr = next((arr.astype(t) for t in (np.int8, np.int16, np.int32)
+                    if np.iinfo(t).min <= lo and hi <= np.iinfo(t).max), None)
+        if arr is None:
+            arr = np.asarray(values, dtype=np.float64)
+    elif arr.dtype.kind == 'f':
+        arr = arr.astype(np.float32 if float32 or arr.dtype.itemsize <= 4 else np.float64, copy=False)
+    if str(arr.dtype) not in _TYPED_ARRAYS:
+        return values
+    spec = {'dtype': _TYPED_ARRAYS[str(arr.dtype)], 'bdata': base64.b64encode(np.ascontiguousarray(arr)).decode('ascii')}
+    if arr.ndim > 1:
+        spec['shape'] = ', '.join(map(str, arr.shape))
+    return spec
+
+
+def _is_iso_datetime(value):
+    # '2024-01-01T00:00:00' or '2024-01-01T00:00:00.000000', as plotly serializes dates
+    return isinstance(value, str) and len(value) in (19, 26) and value[4:5] == '-' and value[10:11] == 'T'
+
+
+def _compact_dates(arr):
+    # Shortest ISO form that keeps every value: dates only for midnight-aligned data, else seconds
+    if arr.dtype.kind == 'M':
+        for unit in ('D', 's'):
+            rounded = arr.astype(f'datetime64[{unit}]')
+            if (rounded == arr)[~np.isnat(arr)].all():
+                return np.datetime_as_string(rounded, unit=unit).tolist()
+        return arr
+    if arr.dtype.kind == 'U' and arr.size and _is_iso_datetime(arr.flat[0]):
+        if (np.char.endswith(arr, 'T00:00:00') | np.char.endswith(arr, 'T00:00:00.000000')).all():
+            return arr.astype('U10').tolist()
+        if np.char.endswith(arr, '.000000').all():
+            return arr.astype('U19').tolist()
+    return arr
+
+
+def encode_arrays(obj, float32=False):
+    """
+    Copy of a figure dict with its numeric arrays as base64 typed arrays ({'dtype', 'bdata'}),
+    which plotly.js decodes without parsing JSON numbers. float32 halves float payloads at the
+    cost of precision (about 7 significant digits). Date arrays are written in their shortest
+    ISO form (e.g. '2024-01-01' for daily data); text arrays are left as they are.
+    """
+    if isinstance(obj, dict):
+        if float32 and obj.get('dtype') == 'f8' and 'bdata' in obj:
+            # already encoded by graph_objects
+            arr = np.frombuffer(base64.b64decode(obj['bdata']), dtype=np.float64).astype(np.float32)
+            return dict(obj, dtype='f4', bdata=base64.b64encode(arr).decode('ascii'))
+        return {k: v if k in _SKIP_KEYS else encode_arrays(v, float32) for k, v in obj.items()}
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in 'MU':
+            return _compact_dates(obj)
+        return _typed_array(obj, float32)
+    if isinstance(obj, (list, tuple)) and obj:
+        first = obj[0]
+        if isinstance(first, (int, float, np.number)) and not isinstance(first, bool):
+            return _typed_array(obj, float32)
+        if _is_iso_datetime(first):
+            dates = _compact_dates(np.asarray(obj, dtype=str))
+            return obj if isinstance(dates, np.ndarray) else dates
+        if isinstance(first, (dict, list, tuple, np.ndarray)):
+            return [encode_arrays(v, float32) for v in obj]
+    return obj
+
+
+def minify_html(html):
+    """Drops indentation and blank lines; line breaks are kept so inline scripts stay valid."""
+    return '\n'.join(line for line in (line.strip() for line in html.splitlines()) if line)
+
+
+_plotlyjs = {}  # size and banner of the installed plotly.min.js
+
+
+def _plotlyjs_signature():
+    if not _plotlyjs:
+        from plotly.offline import get_plotlyjs
+        data = get_plotlyjs().encode('utf-8')
+        _plotlyjs.update(size=len(data), head=data[:256])
+    return _plotlyjs['size'], _plotlyjs['head']
+
+
+def _is_current(path):
+    # Same size and the same banner (which carries the plotly.js version) as the installed bundle
+    size, head = _plotlyjs_signature()
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        with open(path, 'rb') as f:
+            return f.read(len(head)) == head
+    except OSError:
+        return False
+
+
+def _write_plotlyjs(directory):
+    # One plotly.min.js per output directory, shared by every chart written there; rewritten
+    # when it was left by a different plotly version
+    path = os.path.join(directory, 'plotly.min.js')
+    if not _is_current(path):
+        from plotly.offline import get_plotlyjs
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp, path)
+    return path
+
+
+def write_html(fig, file_path, include_plotlyjs='directory', binary=True, float32=False, minify=False,
+               full_html=True, **kwargs):
+    """
+    Writes a compact HTML file for a figure (go.Figure, DictFigure or figure dict).
+
+    include_plotlyjs: 'directory' (default) references one plotly.min.js written next to the
+    file, 'cdn' loads it from the CDN, a path ending in .js references that file, and True
+    inlines the full bundle as fig.write_html does.
+    binary: encode numeric arrays as base64 typed arrays (see encode_arrays); float32 shrinks
+    them further. minify: strip indentation and blank lines. Other kwargs go to plotly.io.to_html.
+
+    Returns the number of bytes written.
+    """
+    fig_dict = fig if isinstance(fig, dict) else fig.to_plotly_json()
+    if binary:
+        fig_dict = encode_arrays(fig_dict, float32)
+
+    html = pio.to_html(fig_dict, include_plotlyjs=include_plotlyjs, full_html=full_html, validate=False, **kwargs)
+    if minify:
+        html = minify_html(html)
+
+    if full_html and include_plotlyjs == 'directory':
+        _write_plotlyjs(os.path.dirname(os.path.abspath(file_path)))
+
+    data = html.encode('utf-8')
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+_BUNDLE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; }}
+.ce-grid {{ display: grid; grid-template-columns: repeat({columns}, minmax(0, 1fr)); gap: {gap}px; }}
+.ce-chart {{ overflow: hidden; }}
+</style>
+<script>window.PlotlyConfig = {{MathJaxConfig: 'local'}};</script>
+{plotlyjs}
+</head>
+<body>
+{header}
+{body}
+<script type="application/json" id="ce-templates">{templates}</script>
+<script>
+(function () {{
+  var config = {config};
+  var lazy = {lazy}, purge = {purge};
+  var templates = JSON.parse(document.getElementById('ce-templates').textContent);
+  function spec(el) {{ return JSON.parse(document.getElementById(el.id + '-data').textContent); }}
+  function draw(el) {{
+    if (el.dataset.drawn) return;
+    var fig = spec(el);
+    if (el.dataset.template) fig.layout.template = templates[el.dataset.template];
+    el.dataset.drawn = '1';
+    Plotly.newPlot(el, fig.data, fig.layout, config);
+  }}
+  function drop(el) {{
+    if (!el.dataset.drawn) return;
+    Plotly.purge(el);
+    delete el.dataset.drawn;
+  }}
+  var charts = document.querySelectorAll('.ce-chart');
+  if (!lazy || !('IntersectionObserver' in window)) {{ charts.forEach(draw); return; }}
+  // Draw charts as they come near the viewport (and optionally free them once far away)
+  var observer = new IntersectionObserver(function (entries) {{
+    entries.forEach(function (e) {{
+      if (e.isIntersecting) draw(e.target);
+      else if (purge) drop(e.target);
+    }});
+  }}, {{rootMargin: '{margin}px 0px'}});
+  charts.forEach(function (el) {{ observer.observe(el); }});
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def _bundle_items(charts):
+    # ChartMakers, figures, or (caption, chart) pairs -> [(caption, figure dict)]
+    items = []
+    for chart in charts:
+        caption = None
+        if isinstance(chart, (tuple, list)):
+            caption, chart = chart
+        if hasattr(chart, 'return_fig'):  # ChartMaker
+            chart = chart.return_fig()
+        items.append((caption, chart if isinstance(chart, dict) else chart.to_plotly_json()))
+    return items
+
+
+def write_html_bundle(charts, file_path, title='Charts', columns=2, sections=None, include_plotlyjs='cdn',
+                      lazy=True, purge_offscreen=False, responsive=True, binary=True, float32=False,
+                      minify=False, gap=16, lazy_margin=400):
+    """
+    Writes many charts into one HTML page with a single plotly.js include.
+
+    charts: ChartMaker instances, figures (go.Figure/DictFigure/dicts) or (caption, chart) pairs.
+    sections: instead of charts, a dict (or list of pairs) of {section heading: charts}; each
+    section gets its own grid. columns: charts per grid row.
+    include_plotlyjs: 'cdn' (default), 'directory' (one plotly.min.js next to the file), a path
+    ending in .js, or True to inline the bundle once.
+    lazy: draw each chart only when it scrolls within lazy_margin px of the viewport, so page
+    load stays flat as charts are added; purge_offscreen also frees charts that scroll away.
+    responsive: drop each figure's fixed width so it fills its grid cell.
+    binary / float32 / minify: as in write_html.
+
+    Returns the number of bytes written.
+    """
+    import html as html_lib
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if sections is None:
+        sections = [(None, charts)]
+    elif isinstance(sections, dict):
+        sections = list(sections.items())
+
+    body = []
+    templates = {}  # template JSON -> key; charts usually share one, so it's written once
+    n = 0
+    for heading, section_charts in sections:
+        if heading:
+            body.append(f'<h2>{html_lib.escape(str(heading))}</h2>')
+        body.append('<div class="ce-grid">')
+        for caption, fig in _bundle_items(section_charts):
+            fig = dict(fig, layout=dict(fig.get('layout') or {}))
+            if responsive:
+                fig['layout'].pop('width', None)
+                fig['layout']['autosize'] = True
+            height = fig['layout'].get('height') or 450
+            template_attr = ''
+            template = fig['layout'].pop('template', None)
+            if template is not None:
+                template_json = json.dumps(template, cls=PlotlyJSONEncoder, separators=(',', ':'))
+                key = templates.setdefault(template_json, str(len(templates)))
+                template_attr = f' data-template="{key}"'
+            if binary:
+                fig = encode_arrays(fig, float32)
+            # </script> inside the JSON would end the data tag early
+            fig_json = pio.to_json(fig, validate=False).replace('</', '<\\/')
+            chart_id = f'ce-chart-{n}'
+            n += 1
+            body.append('<figure style="margin: 0">')
+            body.append(f'<div class="ce-chart" id="{chart_id}"{template_attr} style="height: {int(height)}px"></div>')
+            body.append(f'<script type="application/json" id="{chart_id}-data">{fig_json}</script>')
+            if caption:
+                body.append(f'<figcaption>{html_lib.escape(str(caption))}</figcaption>')
+            body.append('</figure>')
+        body.append('</div>')
+
+    if include_plotlyjs == 'directory':
+        _write_plotlyjs(os.path.dirname(os.path.abspath(file_path)))
+        plotlyjs = '<script charset="utf-8" src="plotly.min.js"></script>'
+    elif include_plotlyjs == 'cdn':
+        plotlyjs = f'<script charset="utf-8" src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+    elif isinstance(include_plotlyjs, str) and include_plotlyjs.endswith('.js'):
+        plotlyjs = f'<script charset="utf-8" src="{html_lib.escape(include_plotlyjs)}"></script>'
+    elif include_plotlyjs:
+        plotlyjs = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    else:
+        plotlyjs = ''
+
+    page = _BUNDLE_TEMPLATE.format(
+        templates='{' + ','.join(f'"{key}":{template_json}' for template_json, key in templates.items()).replace('</', '<\\/') + '}',
+        title=html_lib.escape(str(title)), header=f'<h1>{html_lib.escape(str(title))}</h1>' if title else '',
+        columns=max(1, int(columns)), gap=int(gap), plotlyjs=plotlyjs, body='\n'.join(body),
+        config=json.dumps({'responsive': bool(responsive)}), lazy=json.dumps(bool(lazy)),
+        purge=json.dumps(bool(purge_offscreen)), margin=int(lazy_margin),
+    )
+    if minify:
+        page = minify_html(page)
+
+    data = page.encode('utf-8')
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def _render_job(fig_json, file_path, filetype, engine=None, html_options=None):
+    """Worker: writes one figure and returns (seconds, bytes written, error)."""
+    start = time.perf_counter()
+    try:
+        fig = json.loads(fig_json)
+        if filetype != 'html':
+            kwargs = {"engine": engine} if engine else {}
+            pio.write_image(fig, file_path, format=filetype, validate=False, **kwargs)
+        elif html_options is not None:
+            write_html(fig, file_path, **html_options)
+        else:
+            pio.write_html(fig, file_path, validate=False)
+        return time.perf_counter() - start, os.path.getsize(file_path), None
+    except Exception as e:
+        return time.perf_counter() - start, 0, f"{type(e).__name__}: {e}"
+
+
+def _normalize_job(job):
+    # Accepts a ChartMaker, a (fig, path[, filetype]) tuple or a dict with fig/path/filetype
+    if isinstance(job, dict):
+        fig, file_path, filetype = job.get('fig'), job.get('path'), job.get('filetype')
+    elif isinstance(job, (tuple, list)):
+        fig, file_path, filetype = (tuple(job) + (None,))[:3]
+    else:
+        fig, file_path, filetype = job, None, None
+
+    if hasattr(fig, 'return_fig'):  # ChartMaker
+        chart = fig
+        fig = chart.return_fig()
+        if file_path is None:
+            filetype = filetype or 'png'
+            file_path = chart._file_path(filetype=filetype)
+
+    if file_path is None:
+        raise ValueError("Every export job needs a file path (only ChartMaker jobs can derive one).")
+    if filetype is None:
+        filetype = os.path.splitext(file_path)[1].lstrip('.') or 'png'
+    return fig, file_path, filetype
+
+
+def export_figures(jobs, max_workers=None, engine=None, html_options=None):
+    """
+    Renders many figures in parallel on a process pool.
+
+    jobs: ChartMaker instances, (fig_or_chartmaker, path[, filetype]) tuples, or dicts with
+    'fig', 'path' and 'filetype' keys. ChartMaker jobs default to their save_fig path as png.
+    max_workers: pool size (defaults to the number of CPUs; 1 renders in this process).
+    engine: image engine passed to plotly's write_image (plotly's default when None).
+    html_options: kwargs for write_html (e.g. {} for the compact defaults); None writes html
+    jobs with plotly's write_html as save_fig does.
+
+    Returns one dict per job, in input order, with path, filetype, seconds, bytes and error
+    (None on success). A failing job does not stop the others.
+    """
+    results = []
+    pending = []
+    for job in jobs:
+        try:
+            fig, file_path, filetype = _normalize_job(job)
+            fig_json = fig if isinstance(fig, str) else pio.to_json(fig, validate=False)
+            pending.append((len(results), fig_json, file_path, filetype))
+        except Exception as e:
+            results.append({"path": None, "filetype": None, "seconds": 0.0, "bytes": 0,
+                            "error": f"{type(e).__name__}: {e}"})
+            continue
+        results.append({"path": file_path, "filetype": filetype})
+
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1 or len(pending) <= 1:
+        for i, fig_json, file_path, filetype in pending:
+            seconds, size, error = _render_job(fig_json, file_path, filetype, engine, html_options)
+            results[i].update(seconds=seconds, bytes=size, error=error)
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        futures = {
+            i: pool.submit(_render_job, fig_json, file_path, filetype, engine, html_options)
+            for i, fig_json, file_path, filetype in pending
+        }
+        for i, future in futures.items():
+            try:
+                seconds, size, error = future.result()
+            except Exception as e:  # e.g. a worker process died
+                seconds, size, error = 0.0, 0, f"{type(e).__name__}: {e}"
+            results[i].update(seconds=seconds, bytes=size, error=error)
+
+    return results
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+
+def frame_kind(df):
+    """'arrow' for a pyarrow.Table, 'polars' for a polars.DataFrame, None for anything else."""
+    module = type(df).__module__.split('.')[0]
+    if module == 'pyarrow' and hasattr(df, 'column_names'):
+        return 'arrow'
+    if module == 'polars' and hasattr(df, 'get_column'):
+        return 'polars'
+    return None
+
+
+def _str_dtype():
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)  # pandas' default 'str' dtype
+    except TypeError:
+        return pd.StringDtype('pyarrow')  # pandas < 2.3
+
+
+def _arrow_column(col):
+    """
+    One pyarrow column as (array, copied). Single-chunk numeric and naive timestamp columns
+    without nulls come back as read-only NumPy views of the Arrow buffers; string columns are
+    wrapped as pyarrow-backed pandas strings. Anything else goes through to_pandas().
+    """
+    import pyarrow as pa
+    import pyarrow.types as pat
+
+    kind = col.type
+    if pat.is_string(kind) or pat.is_large_string(kind):
+        try:
+            return pd.arrays.ArrowStringArray(col, dtype=_str_dtype()), False
+        except (TypeError, ValueError):
+            pass
+    elif col.num_chunks == 1 and col.null_count == 0 and (
+            pat.is_integer(kind) or pat.is_floating(kind)
+            or (pat.is_timestamp(kind) and kind.tz is None) or pat.is_duration(kind)):
+        try:
+            return col.chunk(0).to_numpy(zero_copy_only=True), False
+        except pa.ArrowInvalid:
+            pass
+    return col.to_pandas().array, True
+
+
+def _polars_column(s):
+    """One polars column as (array, copied); see _arrow_column."""
+    dtype = s.dtype
+    if (dtype.is_numeric() or dtype.is_temporal()) and getattr(dtype, 'time_zone', None) is None:
+        try:
+            return s.to_numpy(allow_copy=False), False
+        except RuntimeError:
+            pass
+    import pyarrow as pa
+    values, _ = _arrow_column(pa.chunked_array([s.to_arrow()]))
+    return values, True
+
+
+def _pandas_index_column(table):
+    # pa.Table.from_pandas stores the name of the column that held the index in its metadata
+    meta = (table.schema.metadata or {}).get(b'pandas')
+    if not meta:
+        return None
+    index_columns = json.loads(meta).get('index_columns') or []
+    if len(index_columns) == 1 and isinstance(index_columns[0], str):
+        return index_columns[0]
+    return None
+
+
+def referenced_columns(axes_data=None, groupby_col=None, num_col=None, index_col=None):
+    """Column names build reads from axes_data, groupby_col, num_col and index_col, in order."""
+    cols = []
+    axes_data = axes_data or {}
+    for key in ['x', 'y1', 'y2']:
+        value = axes_data.get(key)
+        cols.extend(value if isinstance(value, (list, tuple)) else [value])
+    cols.extend([groupby_col, num_col, index_col])
+    return list(dict.fromkeys(c for c in cols if isinstance(c, str)))
+
+
+def to_frame(df, columns=None, index_col=None, x_col=None):
+    """
+    Turns a pyarrow.Table or polars.DataFrame into the pandas DataFrame build works on, without
+    calling to_pandas() on the whole table. Only columns (default: all) are brought over and,
+    where the dtype allows, each is a NumPy view of the source's memory rather than a copy.
+    The index is index_col, else the column pa.Table.from_pandas stored the index in, else
+    x_col, as set_index would do. Columns that had to be copied are printed.
+    pandas DataFrames are returned unchanged.
+    """
+    kind = frame_kind(df)
+    if kind is None:
+        return df
+
+    names = df.column_names if kind == 'arrow' else df.columns
+    if index_col is None and kind == 'arrow':
+        index_col = _pandas_index_column(df)
+    if index_col is None and x_col in names:
+        index_col = x_col
+    if columns is None:
+        print(f'no columns referenced, converting every column of the {kind} input')
+        columns = list(names)
+    wanted = [c for c in dict.fromkeys(list(columns) + ([index_col] if index_col else [])) if c in names]
+
+    arrays, copied = {}, []
+    for name in wanted:
+        if kind == 'arrow':
+            values, was_copied = _arrow_column(df.column(name))
+        else:
+            values, was_copied = _polars_column(df.get_column(name))
+        arrays[name] = values
+        if was_copied:
+            copied.append(name)
+
+    if copied:
+        print(f'copied {len(copied)} of {len(wanted)} {kind} column(s): {", ".join(copied)}')
+
+    index = None
+    if index_col in arrays:
+        index = pd.Index(arrays.pop(index_col), copy=False)
+        index.name = None if index_col.startswith('__index_level_') else index_col
+    return pd.DataFrame(arrays, index=index, copy=False)
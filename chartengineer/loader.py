@@ -0,0 +1,185 @@
+import glob
+import hashlib
+import json
+import os
+import re
+
+import pandas as pd
+
+# Bump when the parsing below changes, so sidecars written by older versions are ignored
+_LOADER_VERSION = 1
+
+# Exports often end with a stray byte-order mark on its own line
+NA_VALUES = ['\ufeff', 'null', 'NULL', 'None', '']
+
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?$')
+_DATE_NAMES = ['date', 'day', 'dt', 'time', 'timestamp', 'block_date', 'month', 'week']
+
+
+def infer_schema(file_path, nrows=10000):
+    """
+    Reads the first nrows of a CSV once and returns its schema as {column: dtype name}, with
+    ISO date columns as 'datetime64[ns]'. Pass it to load_csv(schema=...) to skip inference.
+    """
+    data_rows = _data_rows(file_path)
+    nrows = min(nrows, data_rows) if data_rows is not None else nrows
+    sample = pd.read_csv(file_path, nrows=nrows, na_values=NA_VALUES).dropna(how='all')
+    schema = {}
+    for col in sample.columns:
+        if _is_date_column(sample[col]):
+            schema[col] = 'datetime64[ns]'
+        elif pd.api.types.is_integer_dtype(sample[col]):
+            schema[col] = 'int64'
+        elif pd.api.types.is_numeric_dtype(sample[col]):
+            schema[col] = 'float64'
+        elif pd.api.types.is_bool_dtype(sample[col]):
+            schema[col] = 'bool'
+        else:
+            schema[col] = 'str'
+    return schema
+
+
+def _is_date_column(values):
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    if pd.api.types.is_numeric_dtype(values):
+        return False
+    sample = values.dropna().head(100).astype(str)
+    return len(sample) > 0 and all(_ISO_DATE.match(v) for v in sample)
+
+
+def _find_date_col(df, schema):
+    dates = [col for col, dtype in schema.items() if str(dtype).startswith('datetime')]
+    if dates:
+        return dates[0]
+    candidates = [c for c in df.columns if str(c).lower() in _DATE_NAMES] + list(df.columns)
+    for col in candidates:
+        if _is_date_column(df[col]):
+            return col
+    return None
+
+
+def _data_rows(file_path):
+    """
+    Number of data rows when the file ends in lines holding nothing but a byte-order mark or
+    whitespace (None otherwise), so they can be left out rather than parsed as a row of NaNs
+    that would turn integer columns into floats.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 64))
+        tail = f.read()
+    lines = tail.split(b'\n')
+    junk = 0
+    for line in reversed(lines[1:]):
+        if line.replace(b'\xef\xbb\xbf', b'').strip():
+            break
+        junk += 1 if line else 0
+    if not junk:
+        return None
+    with open(file_path, 'rb') as f:
+        newlines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+    # header line + data lines + the junk lines (the last one may have no newline)
+    return newlines + (0 if tail.endswith(b'\n') else 1) - 1 - junk
+
+
+def parse_dates(values):
+    """ISO 8601 strings (with or without time, fraction or 'Z') to naive UTC datetimes."""
+    parsed = pd.to_datetime(values, format='ISO8601', utc=True)
+    return parsed.dt.tz_convert(None) if isinstance(parsed, pd.Series) else parsed.tz_convert(None)
+
+
+def read_csv(file_path, schema=None, date_col=None, sort=True):
+    """
+    Parses a CSV into a DataFrame indexed by its date column (DatetimeIndex, naive UTC).
+    schema: {column: dtype}; date columns may be given as 'datetime64[ns]'. Without one,
+    pandas infers the dtypes. date_col: the column to index on; by default the first column
+    typed as a datetime in the schema, else the first one that holds ISO dates.
+    Pass date_col=False to keep a RangeIndex. Rows that are entirely empty are dropped.
+    """
+    schema = dict(schema or {})
+    dtypes = {col: dtype for col, dtype in schema.items() if not str(dtype).startswith('datetime')}
+    df = pd.read_csv(file_path, dtype=dtypes or None, na_values=NA_VALUES,
+                     nrows=_data_rows(file_path)).dropna(how='all')
+
+    if date_col is None:
+        date_col = _find_date_col(df, schema)
+    if date_col:
+        if date_col not in df.columns:
+            raise ValueError(f"date_col '{date_col}' is not a column of {file_path}.")
+        df = df.set_index(pd.DatetimeIndex(parse_dates(df[date_col]), name=date_col)).drop(columns=date_col)
+        if sort and not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind='stable')
+    return df
+
+
+def _sidecar_key(file_path, schema, date_col, sort, fmt):
+    stat = os.stat(file_path)
+    params = [_LOADER_VERSION, os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size,
+              {str(k): str(v) for k, v in (schema or {}).items()}, date_col, sort, fmt]
+    return hashlib.sha256(json.dumps(params).encode()).hexdigest()[:16]
+
+
+def load_csv(file_path, schema=None, date_col=None, sort=True, cache_dir=None, fmt='feather', as_arrow=False):
+    """
+    read_csv with a columnar sidecar cache. The first load parses the CSV and writes the
+    result next to it (cache_dir, default a .chartengineer folder beside the file) as
+    uncompressed Feather, or Parquet with fmt='parquet'. Later loads read the sidecar
+    instead, memory-mapped for Feather, until the CSV's mtime or size changes (or schema,
+    date_col or sort do). cache_dir=False disables the sidecar.
+
+    as_arrow returns the pyarrow.Table instead of a DataFrame. For Feather its columns stay
+    memory-mapped, and ChartMaker.build takes it as is (see frames.to_frame).
+    Sidecars need pyarrow; without it the CSV is parsed on every call.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        pa = None
+
+    if cache_dir is False or pa is None:
+        if pa is None and cache_dir is not False:
+            print('pyarrow is not installed, parsing the CSV without a sidecar cache')
+        df = read_csv(file_path, schema=schema, date_col=date_col, sort=sort)
+        return pa.Table.from_pandas(df) if as_arrow and pa is not None else df
+
+    if fmt not in ['feather', 'parquet']:
+        raise ValueError(f"fmt must be 'feather' or 'parquet', got '{fmt}'.")
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(file_path)), '.chartengineer')
+    # the path hash keeps same-named CSVs from different folders apart in a shared cache_dir
+    path_hash = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:8]
+    stem = f'{os.path.basename(file_path)}.{path_hash}'
+    sidecar = os.path.join(cache_dir, f'{stem}.{_sidecar_key(file_path, schema, date_col, sort, fmt)}.{fmt}')
+
+    if os.path.exists(sidecar):
+        if fmt == 'feather':
+            table = feather.read_table(sidecar, memory_map=True)
+        else:
+            import pyarrow.parquet as pq
+            table = pq.read_table(sidecar, memory_map=True)
+        if as_arrow:
+            return table
+        # Converting copies every column out of the sidecar; split_blocks skips consolidating
+        # them into 2D blocks (a second copy) and self_destruct frees each Arrow column once
+        # converted, so peak memory stays near one copy of the data
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    df = read_csv(file_path, schema=schema, date_col=date_col, sort=sort)
+    table = pa.Table.from_pandas(df)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f'{sidecar}.{os.getpid()}.tmp'
+        if fmt == 'feather':
+            feather.write_feather(table, tmp, compression='uncompressed')
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp)
+        os.replace(tmp, sidecar)
+        # sidecars of older versions of the same file are stale now
+        for old in glob.glob(os.path.join(glob.escape(cache_dir), f'{glob.escape(stem)}.*.{fmt}')):
+            if old != sidecar:
+                os.remove(old)
+    except OSError as e:
+        print(f'Could not write the sidecar cache {sidecar}: {e}')
+    return table if as_arrow else df
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_SIZE = 256
+
+
+def freeze_options(value):
+    """Hashable snapshot of an options dict, used as the compile cache key."""
+    if isinstance(value, Mapping):
+        return tuple([(k, freeze_options(v)) for k, v in value.items()])
+    if isinstance(value, (list, tuple)):
+        return tuple([freeze_options(v) for v in value])
+    hash(value)
+    return value
+
+
+class FrozenDict(dict):
+    """dict that can't be modified, so compiled options can be shared between builds."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Resolved options are read-only; pass overrides to build instead.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def _check_max_points(max_points):
+    # max_points is an int or {axis or series label: int}; downsampling needs first, last and one more point
+    values = max_points.values() if isinstance(max_points, Mapping) else [max_points]
+    for value in values:
+        if value and value < 3:
+            raise ValueError(f"max_points must be at least 3, got {value}.")
+
+
+class ResolvedOptions(Mapping):
+    """
+    Read-only merge of a ChartMaker's default options and the options passed to build.
+
+    Lookups go to the overrides first and fall back to the defaults; nothing is deep copied.
+    Dict-valued options are merged one level deep (e.g. tickprefix={'y1': '$'} keeps the
+    default y2 entry). The values that build and the annotation methods read over and over
+    are precomputed as attributes: decimals, decimal_places, text_freq, font_family,
+    font_color, font_size, orientation, show_text, show_legend and line_width, plus
+    prefix(axis) / suffix(axis) / number_format(axis) for the tick prefix and suffix.
+    """
+
+    def __init__(self, defaults, overrides=None, known=None):
+        overrides = overrides or {}
+        unknown = sorted(set(overrides) - set(known if known is not None else defaults))
+        if unknown:
+            raise ValueError(f"Unknown option(s): {', '.join(map(str, unknown))}.")
+
+        _check_max_points(overrides.get('max_points', defaults.get('max_points')))
+
+        self._defaults = defaults
+        self._overrides = overrides
+        self._known = known
+        self._values = {**defaults, **overrides}
+        for key, val in self._values.items():
+            if isinstance(val, Mapping):
+                default = defaults.get(key)
+                if key in overrides and isinstance(default, Mapping):
+                    # if both default and override are dicts, the override updates the default dict
+                    val = {**default, **val}
+                self._values[key] = FrozenDict(val)
+
+        self.decimals = self._values.get("decimals", True)
+        self.decimal_places = int(self._values.get("decimal_places", 1))
+        self.text_freq = self._values.get("text_freq", 1)
+        self.font_family = self._values.get("font_family", "Cardo")
+        self.font_color = self._values.get("font_color", "black")
+        self.font_size = self._values.get("font_size", {})
+        self.orientation = self._values.get("orientation", "v")
+        self.show_text = bool(self._values.get("show_text", False))
+        self.show_legend = self._values.get("show_legend", False)
+        self.line_width = self._values.get("line_width", 3)
+        self._prefix = {axis: (self.get("tickprefix", {}).get(axis) or '') for axis in ['y1', 'y2']}
+        self._suffix = {axis: (self.get("ticksuffix", {}).get(axis) or '') for axis in ['y1', 'y2']}
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __reduce__(self):
+        return (ResolvedOptions, (self._defaults, self._overrides, self._known))
+
+    def prefix(self, axis):
+        return self._prefix.get(axis, '')
+
+    def suffix(self, axis):
+        return self._suffix.get(axis, '')
+
+    def number_format(self, axis):
+        """Keyword arguments for format_values on the given axis."""
+        return dict(decimals=self.decimals, decimal_places=self.decimal_places,
+                    prefix=self.prefix(axis), suffix=self.suffix(axis))
+
+    def to_dict(self):
+        return {key: dict(val) if isinstance(val, Mapping) else val for key, val in self._values.items()}
+
+
+def resolve_options(defaults, overrides=None, known=None, defaults_key=None):
+    """
+    Returns the ResolvedOptions for (defaults, overrides), compiling it only the first time
+    a given pair is seen. Raises ValueError for override keys outside known (or defaults).
+    defaults_key is freeze_options(defaults) when the caller already has it.
+    """
+    try:
+        if defaults_key is None:
+            defaults_key = freeze_options(defaults)
+        key = (defaults_key, freeze_options(overrides or {}), frozenset(known) if known is not None else None)
+    except TypeError:
+        return ResolvedOptions(defaults, overrides, known)  # unhashable values, don't cache
+
+    with _cache_lock:
+        resolved = _cache.get(key)
+        if resolved is not None:
+            _cache.move_to_end(key)
+            return resolved
+
+    resolved = ResolvedOptions(defaults, overrides, known)
+    with _cache_lock:
+        _cache[key] = resolved
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return resolved
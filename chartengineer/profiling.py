@@ -0,0 +1,151 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+_current = ContextVar('chartengineer_profiler', default=None)
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'counts', 'start', 'path')
+
+    def __init__(self, profiler, name, counts):
+        self.profiler = profiler
+        self.name = name
+        self.counts = counts
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.path = f'{stack[-1]}/{self.name}' if stack else self.name
+        stack.append(self.path)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = perf_counter()
+        self.profiler._stack().pop()
+        record = {'name': self.path, 'start_s': self.start - self.profiler.origin, 'duration_s': end - self.start}
+        record.update(self.counts)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.profiler._record(record)
+        return False
+
+    def count(self, **counts):
+        """Attaches counts (e.g. traces=3, points=10000, bytes=52000) to the span."""
+        self.counts.update(counts)
+
+
+class _NullSpan:
+    """What spans are when profiling is off: a shared object whose methods do nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def count(self, **counts):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Records named, nested spans with wall times and counts. Pass one to ChartMaker(profiler=...)
+    or activate it for a block with profile(); build, append, add_annotations, add_dashed_lines,
+    to_bytes and save_fig then record a span per phase, named by its path: e.g. 'build/options',
+    'build/convert', 'build/figure/group', 'build/figure/trace', 'build/figure/layout',
+    'append/downsample', 'add_dashed_lines/lookup', 'save_fig/render'. callback(span) is called
+    with each span's dict as it finishes.
+    A span costs a couple of perf_counter calls and a list append, so it can stay on in
+    production; keep_spans=False keeps only the per-phase totals for long-running processes.
+    """
+
+    def __init__(self, callback=None, keep_spans=True):
+        self.callback = callback
+        self.keep_spans = keep_spans
+        self.origin = perf_counter()
+        self.spans = []
+        self._phases = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, record):
+        with self._lock:
+            if self.keep_spans:
+                self.spans.append(record)
+            phase = self._phases.get(record['name'])
+            if phase is None:
+                phase = self._phases[record['name']] = {'calls': 0, 'total_s': 0.0}
+            phase['calls'] += 1
+            phase['total_s'] += record['duration_s']
+            for key, value in record.items():
+                if key not in ('name', 'start_s', 'duration_s', 'error') and isinstance(value, (int, float)):
+                    phase[key] = phase.get(key, 0) + value
+        if self.callback is not None:
+            self.callback(record)
+
+    def span(self, name, **counts):
+        """Context manager timing one phase, nested under the span currently open in this thread."""
+        return _Span(self, name, counts)
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self._phases = {}
+            self.origin = perf_counter()
+
+    def report(self):
+        """
+        {'total_s': time in top-level spans, 'phases': {name: {'calls', 'total_s', 'share', counts...}},
+        'spans': [{'name', 'start_s', 'duration_s', counts...}, ...]} with phases slowest first.
+        """
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in self._phases.items()}
+            spans = list(self.spans)
+        total = sum(phase['total_s'] for name, phase in phases.items() if '/' not in name)
+        for phase in phases.values():
+            phase['share'] = phase['total_s'] / total if total else 0.0
+        phases = dict(sorted(phases.items(), key=lambda item: -item[1]['total_s']))
+        return {'total_s': total, 'phases': phases, 'spans': spans}
+
+    def summary(self, limit=20):
+        """The report's phases as a printable table."""
+        lines = [f"{'phase':32} {'calls':>6} {'total ms':>10} {'share':>6}"]
+        for name, phase in list(self.report()['phases'].items())[:limit]:
+            lines.append(f"{name:32} {phase['calls']:>6} {phase['total_s'] * 1000:>10.2f} {phase['share']:>6.0%}")
+        return '\n'.join(lines)
+
+
+def current_profiler():
+    """The Profiler activated with profile() in this context, or None."""
+    return _current.get()
+
+
+@contextmanager
+def profile(profiler=None, callback=None):
+    """
+    Activates a Profiler (a new one unless given) for every ChartMaker used inside the block,
+    in this thread or task:
+
+        with profile() as prof:
+            cm.build(...)
+            cm.save_fig(...)
+        prof.report()
+    """
+    profiler = profiler or Profiler(callback=callback)
+    token = _current.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current.reset(token)
@@ -0,0 +1,235 @@
+import base64
+import functools
+import re
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Property names that really contain an underscore, so update_layout(plot_bgcolor=...) isn't split
+_UNDERSCORE_PROPS = {'plot_bgcolor', 'paper_bgcolor', 'error_x', 'error_y'}
+# Properties that hold other properties, the only ones a magic underscore may descend into
+_COMPOUND_PROPS = {'title', 'font', 'legend', 'margin', 'hoverlabel', 'modebar', 'grid', 'uniformtext',
+                   'coloraxis', 'colorbar', 'marker', 'line', 'textfont', 'insidetextfont', 'outsidetextfont',
+                   'tickfont', 'legendgrouptitle', 'rangeslider', 'rangeselector', 'error_x', 'error_y',
+                   'domain', 'pad', 'selected', 'unselected', 'gradient', 'pattern', 'connector'}
+_AXIS = re.compile(r'[xy]axis\d*')
+
+_templates = {}
+
+
+def _template(name):
+    """Expanded JSON of a named plotly template, built once per process."""
+    if name not in _templates:
+        import plotly.io as pio
+        _templates[name] = pio.templates[name].to_plotly_json()
+    return _templates[name]
+
+
+def _default_template():
+    import plotly.io as pio
+    return pio.templates.default
+
+
+def _plain(value):
+    # pandas objects become arrays and plotly objects become dicts, as graph_objects would do
+    if isinstance(value, (pd.Series, pd.Index)):
+        return value.to_numpy()
+    if hasattr(value, 'to_plotly_json'):
+        return value.to_plotly_json()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], dict):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _merge(target, key, value):
+    value = _plain(value)
+    if value is None:
+        target.pop(key, None)
+    elif key == 'title' and isinstance(value, str):
+        _merge(target, key, {'text': value})
+    elif key == 'template' and isinstance(value, str):
+        target[key] = _template(value)
+    elif isinstance(value, dict) and isinstance(target.get(key), dict) and key != 'template':
+        for k, v in value.items():
+            _merge(target[key], k, v)
+    else:
+        target[key] = value
+
+
+@functools.lru_cache(maxsize=256)
+def _path(key):
+    """
+    Property path of a magic-underscore key: xaxis_title_text is ('xaxis', 'title', 'text').
+    Raises ValueError when a part before an underscore isn't a compound property, as
+    graph_objects would, rather than writing a misspelled key as a bogus nested path.
+    """
+    path = []
+    while key not in _UNDERSCORE_PROPS and '_' in key:
+        head = next((p for p in _UNDERSCORE_PROPS if key.startswith(p + '_')), key.split('_', 1)[0])
+        if head not in _COMPOUND_PROPS and not _AXIS.fullmatch(head):
+            raise ValueError(f"Invalid property '{key}': '{head}' has no sub-properties.")
+        path.append(head)
+        key = key[len(head) + 1:]
+    return (*path, key)
+
+
+def _update(target, dict1=None, **kwargs):
+    for key, value in {**(dict1 or {}), **kwargs}.items():
+        # magic underscores: xaxis_title_text=... updates layout['xaxis']['title']['text']
+        path = _path(key)
+        node = target
+        for part in path[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        _merge(node, path[-1], value)
+
+
+def make_trace(trace_class, raw=False, **kwargs):
+    """trace_class(**kwargs), or the same trace as a plain dict when raw is set."""
+    if not raw:
+        return trace_class(**kwargs)
+    trace = {'type': getattr(trace_class, '_path_str', trace_class.__name__.lower())}
+    _update(trace, kwargs)
+    return trace
+
+
+class DictFigure(dict):
+    """
+    Figure as a plain {'data': [...], 'layout': {...}} dict, for raw builds (options={'raw': True}).
+
+    Supports the part of the go.Figure API that ChartMaker.build uses (add_trace, update_layout,
+    update_xaxes, update_yaxes with secondary_y, magic underscores) without graph_objects
+    validation. plotly.io functions take it as is with validate=False; call validate() to check
+    it once against the plotly schema.
+    """
+
+    def __init__(self, data=None, layout=None):
+        super().__init__(data=[], layout={'template': _template(_default_template())})
+        for trace in data or []:
+            self.add_trace(trace)
+        if layout:
+            self.update_layout(layout)
+
+    @classmethod
+    def secondary_y(cls):
+        """Same layout as make_subplots(specs=[[{"secondary_y": True}]])."""
+        fig = cls()
+        fig.layout.update({
+            'xaxis': {'anchor': 'y', 'domain': [0.0, 0.94]},
+            'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0]},
+            'yaxis2': {'anchor': 'x', 'overlaying': 'y', 'side': 'right'},
+        })
+        fig._subplots = True
+        return fig
+
+    _subplots = False
+
+    @classmethod
+    def from_dict(cls, fig_dict):
+        """A DictFigure holding fig_dict as it is, e.g. a figure read back from JSON."""
+        fig = cls.__new__(cls)
+        dict.__init__(fig, data=fig_dict.get('data', []), layout=fig_dict.get('layout', {}))
+        fig._subplots = 'yaxis2' in fig['layout']
+        return fig
+
+    @property
+    def data(self):
+        return self['data']
+
+    @property
+    def layout(self):
+        return self['layout']
+
+    def add_trace(self, trace, secondary_y=None):
+        trace = dict(_plain(trace))
+        if self._subplots and secondary_y is not None:
+            trace.update(xaxis='x', yaxis='y2' if secondary_y else 'y')
+        self['data'].append(trace)
+        return self
+
+    def update_layout(self, dict1=None, overwrite=False, **kwargs):
+        _update(self['layout'], dict1, **kwargs)
+        return self
+
+    def _axes(self, prefix):
+        names = [k for k in self['layout'] if k == prefix or (k.startswith(prefix) and k[len(prefix):].isdigit())]
+        return names or [prefix]
+
+    def _update_axes(self, names, patch, kwargs):
+        for name in names:
+            _update(self['layout'].setdefault(name, {}), patch, **kwargs)
+        return self
+
+    def update_xaxes(self, patch=None, **kwargs):
+        return self._update_axes(self._axes('xaxis'), patch, kwargs)
+
+    def update_yaxes(self, patch=None, secondary_y=None, **kwargs):
+        names = self._axes('yaxis') if secondary_y is None else ['yaxis2' if secondary_y else 'yaxis']
+        return self._update_axes(names, patch, kwargs)
+
+    def own_arrays(self):
+        """Copies trace arrays that are views of other memory (e.g. a DataFrame's), so they don't keep it alive."""
+        copies = {}  # traces sharing an x array (the DataFrame index) share its copy too
+        for trace in self['data']:
+            for key, value in trace.items():
+                if isinstance(value, np.ndarray) and value.base is not None:
+                    view = (value.__array_interface__['data'][0], value.shape, value.strides, value.dtype.str)
+                    if view not in copies:
+                        copies[view] = value.copy()
+                    trace[key] = copies[view]
+        return self
+
+    @contextmanager
+    def batch_update(self):
+        yield self
+
+    def to_plotly_json(self):
+        return self
+
+    to_dict = to_plotly_json
+
+    def to_json(self, **kwargs):
+        import plotly.io as pio
+        return pio.to_json(self, validate=False, **kwargs)
+
+    def validate(self):
+        """Checks the figure against the plotly schema once; raises ValueError if it's invalid."""
+        import plotly.graph_objects as go
+        go.Figure(self)
+        return self
+
+    def write_html(self, file, **kwargs):
+        import plotly.io as pio
+        return pio.write_html(self, file, validate=False, **kwargs)
+
+    def write_image(self, file, **kwargs):
+        import plotly.io as pio
+        return pio.write_image(self, file, validate=False, **kwargs)
+
+
+def trace_prop(trace, name):
+    """trace.<name> for a graph_objects trace, trace[name] for a raw trace dict."""
+    return trace.get(name) if isinstance(trace, dict) else getattr(trace, name)
+
+
+def trace_values(trace, name):
+    """trace_prop as an array, decoding plotly's base64 typed arrays ({'dtype', 'bdata'}) if needed."""
+    value = trace_prop(trace, name)
+    if isinstance(value, dict) and 'bdata' in value:
+        data = np.frombuffer(base64.b64decode(value['bdata']), dtype=np.dtype(value['dtype']))
+        if value.get('shape'):
+            data = data.reshape([int(n) for n in str(value['shape']).split(',')])
+        return data
+    return np.asarray(value)
+
+
+def extend_layout(fig, key, items):
+    """Appends items to fig.layout[key] (e.g. 'shapes', 'annotations') in one assignment."""
+    if isinstance(fig, DictFigure):
+        fig.layout[key] = list(fig.layout.get(key) or []) + [_plain(item) for item in items]
+    else:
+        fig.layout[key] += tuple(items)
@@ -0,0 +1,153 @@
+import dataclasses
+import functools
+import os
+import weakref
+from collections.abc import Mapping
+from typing import Any
+
+import pandas as pd
+
+from chartengineer.options import FrozenDict
+
+
+def freeze(value):
+    """Read-only copy of an options-like value: dicts become FrozenDicts and lists tuples."""
+    if isinstance(value, Mapping):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Mutable copy of a frozen value, in the dict/list shapes build expects."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# The ChartMaker methods a spec can record, replayed in order after build
+CALLS = ['add_title', 'add_annotations', 'add_dashed_lines']
+
+
+def _events(events, text_col='text', date_col=None):
+    # dates, (date, text) pairs, {date: text} or a DataFrame (as add_dashed_lines takes it) as ((date, text), ...)
+    if events is None:
+        return ()
+    if isinstance(events, pd.DataFrame):
+        dates = events[date_col] if date_col is not None else events.index
+        texts = events[text_col] if text_col in events.columns else [None] * len(events)
+        return tuple(zip(dates, texts))
+    if isinstance(events, Mapping):
+        return tuple(events.items())
+    return tuple(tuple(e) if isinstance(e, (tuple, list)) else (e, None) for e in events)
+
+
+def _calls(calls):
+    # (method name, kwargs) pairs as ((name, FrozenDict), ...); events become (date, text) pairs
+    frozen = []
+    for name, kwargs in calls:
+        if name not in CALLS:
+            raise ValueError(f"Unknown spec call '{name}', expected one of {CALLS}.")
+        kwargs = dict(kwargs)
+        if name == 'add_dashed_lines':
+            kwargs = {'events': _events(kwargs.get('events'), kwargs.get('text_col', 'text'), kwargs.get('date_col'))}
+        frozen.append((name, freeze(kwargs)))
+    return tuple(frozen)
+
+
+def data_source(data):
+    """data as build takes it; a CSV path becomes a function that reads it with load_csv."""
+    if isinstance(data, (str, os.PathLike)):
+        from chartengineer.loader import load_csv
+        return functools.partial(load_csv, data)
+    return data
+
+
+def weak_source(data):
+    """
+    A function returning data for as long as something else holds it, so a spec can refer
+    to a frame without keeping it alive (ChartMaker.to_spec after a lean build).
+    """
+    try:
+        ref = weakref.ref(data)
+    except TypeError:
+        return data
+
+    def source():
+        value = ref()
+        if value is None:
+            raise ValueError("The data of this lean build has been released; pass build a function that "
+                             "loads it (e.g. df=lambda: load_csv(path)) to render its spec again.")
+        return value
+    return source
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class ChartSpec:
+    """
+    Everything needed to draw one chart, as an immutable value: render(spec) turns it into a
+    figure without touching any shared state, so specs can be rendered concurrently from a
+    thread pool, or pickled to a process pool.
+
+    data: a DataFrame, pyarrow.Table or polars.DataFrame, a CSV path (read with load_csv when
+    rendered), or a function returning the data. Paths and module-level functions keep specs
+    small when they are sent to other processes.
+    title, chart_type, axes_data, options, groupby_col, num_col: as for ChartMaker.build.
+    calls: the add_title, add_annotations and add_dashed_lines calls made after build, in
+    order, as (method name, {keyword arguments}) pairs. with_title / with_annotations /
+    with_events append one.
+    default_options: the ChartMaker defaults to build with (DEFAULT_OPTIONS when None).
+    colors / color_offset: the palette (default: utils.colors()) and the position in it the
+    first series takes.
+
+    Dict and list fields are frozen on construction; use dataclasses.replace (or the with_
+    methods) to derive a changed spec.
+    """
+    data: Any
+    title: str = None
+    chart_type: Any = dataclasses.field(default_factory=lambda: {"y1": "line", "y2": "line"})
+    axes_data: Mapping = None
+    options: Mapping = None
+    groupby_col: str = None
+    num_col: str = None
+    calls: tuple = ()
+    default_options: Mapping = None
+    colors: tuple = None
+    color_offset: int = 0
+
+    def __post_init__(self):
+        for name in ['chart_type', 'axes_data', 'options', 'default_options', 'colors']:
+            object.__setattr__(self, name, freeze(getattr(self, name)))
+        object.__setattr__(self, 'calls', _calls(self.calls))
+
+    def with_call(self, name, **kwargs):
+        """A copy of the spec with one more call of the ChartMaker method name."""
+        return dataclasses.replace(self, calls=self.calls + ((name, kwargs),))
+
+    def with_title(self, **kwargs):
+        """A copy of the spec with one more add_title call."""
+        return self.with_call('add_title', **kwargs)
+
+    def with_annotations(self, **kwargs):
+        """A copy of the spec with one more add_annotations call."""
+        return self.with_call('add_annotations', **kwargs)
+
+    def with_events(self, events, text_col='text', date_col=None):
+        """A copy of the spec with one more add_dashed_lines call."""
+        return self.with_call('add_dashed_lines', events=events, text_col=text_col, date_col=date_col)
+
+    def source(self):
+        """data as build takes it; a CSV path becomes a function that reads it with load_csv."""
+        return data_source(self.data)
+
+
+def render(spec, cache=None, profiler=None):
+    """
+    Draws spec and returns the figure (a go.Figure, or a DictFigure with options={'raw': True}).
+    Each call builds on its own ChartMaker, so concurrent calls share nothing mutable.
+    """
+    from chartengineer.core import ChartMaker
+    return ChartMaker.from_spec(spec, cache=cache, profiler=profiler).fig
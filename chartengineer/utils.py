@@ -1,13 +1,17 @@
 import pandas as pd
-import matplotlib.cm as cm
-from matplotlib.colors import to_hex
-import colorcet as cc
-import plotly.colors as pc
+import numpy as np
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
 import random
 
+from chartengineer.palette import PALETTE
+
+# (threshold, suffix with decimals, suffix without decimals), largest first
+_MAGNITUDES = [(1e12, 'T', 't'), (1e9, 'B', 'b'), (1e6, 'M', 'm'), (1e3, 'K', 'k')]
+
 def clean_values(x, decimals=True, decimal_places=1):
     if isinstance(x, pd.Series):
-        return x.apply(clean_values, decimals=decimals, decimal_places=decimal_places)
+        return pd.Series(format_values(x, decimals=decimals, decimal_places=decimal_places),
+                         index=x.index, name=x.name)
     
     if x == 0:
         return '0'
@@ -55,7 +59,427 @@ def clean_values(x, decimals=True, decimal_places=1):
         else:
             return f'{x:.0f}'  # Handle smaller numbers
 
-def colors(shuffle=False):
+def format_values(values, decimals=True, decimal_places=1, prefix='', suffix='', text_freq=1, offset=0):
+    """
+    Array version of clean_values: buckets the whole input by magnitude with NumPy
+    and formats each bucket in one pass. Returns a list of strings; when text_freq > 1
+    only every text_freq-th value gets a label and the rest are ''. offset is the position
+    of the first value in a longer series, so appended chunks keep the same label spacing.
+    """
+    arr = np.asarray(values, dtype=float).ravel()
+    out = np.full(arr.size, '', dtype=object)
+
+    step = text_freq if text_freq and text_freq > 1 else 1
+    picked = np.arange(-offset % step, arr.size, step)
+    x = arr[picked]
+    mag = np.abs(x)
+    places = decimal_places if decimals else 0
+
+    # prefix/suffix are baked into each bucket's format string, so every label is a single % op
+    head = (prefix or '').replace('%', '%%')
+    tail = (suffix or '').replace('%', '%%')
+
+    text = np.empty(x.size, dtype=object)
+    todo = np.ones(x.size, dtype=bool)
+
+    def fill(mask, fmt, scaled):
+        mask = mask & todo
+        if mask.any():
+            text[mask] = list(map((head + fmt + tail).__mod__, scaled[mask].tolist()))
+            todo[mask] = False
+
+    zero = x == 0
+    text[zero] = f'{prefix or ""}0{suffix or ""}'
+    todo[zero] = False
+    fill(mag < 1, '%.2f', x)  # keep small values with two decimal points
+    for threshold, unit, short_unit in _MAGNITUDES:
+        fill(mag >= threshold, f'%.{places}f' + (unit if decimals else short_unit), x / threshold)
+    fill(todo, f'%.{places}f', x)  # hundreds, ones and nan are shown as is
+
+    out[picked] = text
+    return out.tolist()
+
+def partition_groups(df, groupby_col, num_col):
+    """
+    Splits df by groupby_col in a single pass (factorize + stable sort) instead of one
+    boolean scan per category. Returns a dict with the groups' keys (sorted like groupby),
+    each group's row positions in original order, and the per-group sum/last/max of num_col.
+    """
+    codes, keys = pd.factorize(df[groupby_col], sort=True)
+    values = df[num_col].to_numpy(dtype=float)
+
+    order = np.argsort(codes, kind='stable')
+    order = order[np.searchsorted(codes[order], 0):]  # rows with a missing key are dropped, as in groupby
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(sorted_codes, minlength=len(keys)))])
+    starts = bounds[:-1]
+
+    missing = np.isnan(sorted_values)
+    if len(order):
+        sums = np.bincount(sorted_codes, weights=np.where(missing, 0, sorted_values), minlength=len(keys))
+        maxes = np.fmax.reduceat(sorted_values, starts)
+        # last non-null value per group, like groupby().last()
+        last_pos = np.maximum.reduceat(np.where(missing, -1, np.arange(len(order))), starts)
+        lasts = np.where(last_pos >= 0, sorted_values[last_pos], np.nan)
+    else:
+        sums = maxes = lasts = np.empty(0)
+
+    keys = pd.Index(keys, name=groupby_col)
+    return {
+        'keys': keys,
+        'positions': dict(zip(keys, np.split(order, bounds[1:-1]))),
+        'sum': pd.Series(sums, index=keys, name=num_col),
+        'last': pd.Series(lasts, index=keys, name=num_col),
+        'max': pd.Series(maxes, index=keys, name=num_col),
+    }
+
+def _lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: first and last points plus one point per bucket,
+    # chosen to maximise the triangle with the previous pick and the next bucket's mean
+    n = len(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+def _minmax(y, n_out):
+    # min and max of every equally sized bucket
+    n_buckets = n_out // 2
+    if n_buckets < 1:
+        return np.empty(0, dtype=np.int64)
+    size = -(-len(y) // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:len(y)] = y
+    padded = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = np.concatenate([offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1),
+                            offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)])
+    return picks[picks < len(y)]
+
+def downsample(x, y, max_points, method='lttb'):
+    """
+    Picks which points of a line/area series to plot when it has more than max_points.
+    method is 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax' (min and max per bucket).
+    The first and last points are always kept, and so are the global max and min when
+    max_points leaves room for them, so annotations land on plotted values. NaN values are
+    never picked. Returns at most max_points sorted row positions, or None if nothing needs
+    dropping. max_points must be at least 3.
+    """
+    if max_points and max_points < 3:
+        raise ValueError(f"max_points must be at least 3, got {max_points}.")
+    if method not in ['lttb', 'minmax']:
+        raise ValueError(f"Unknown downsample method '{method}'. Use 'lttb' or 'minmax'.")
+    n = len(y)
+    if not max_points or n <= max_points:
+        return None
+
+    y = np.asarray(y, dtype=float)
+    x = pd.Index(x)
+    if is_datetime64_any_dtype(x):
+        x = x.asi8.astype(float)
+    elif is_numeric_dtype(x):
+        x = x.to_numpy(dtype=float)
+    else:
+        x = np.arange(n, dtype=float)
+
+    required = [0, n - 1]
+    if not np.isnan(y).all():
+        required += [int(np.nanargmax(y)), int(np.nanargmin(y))]
+    required = np.array(list(dict.fromkeys(required))[:max_points], dtype=np.int64)
+    room = max_points - len(required)
+
+    valid = np.flatnonzero(~np.isnan(y))
+    if method == 'lttb':
+        # first and last of the valid points are picked too, so ask for two more
+        picks = valid[_lttb(x[valid], y[valid], room + 2)] if len(valid) > room + 2 else valid
+    else:
+        picks = _minmax(y, room)
+        picks = picks[~np.isnan(y[picks])]  # buckets that are all NaN
+
+    extra = np.setdiff1d(picks, required)
+    if len(extra) > room:
+        extra = extra[np.linspace(0, len(extra) - 1, room).astype(int)] if room else extra[:0]
+    return np.unique(np.concatenate([required, extra]).astype(np.int64))
+
+def _thin(x, y, n_out, method):
+    # downsample to n_out points, also for n_out below downsample's minimum of 3
+    if len(y) <= n_out:
+        return np.arange(len(y))
+    if n_out >= 3:
+        return downsample(x, y, n_out, method=method)
+    return np.unique(np.linspace(0, len(y) - 1, n_out).round().astype(np.int64))
+
+def compact_points(x, y, tail, rows, max_points, method='lttb'):
+    """
+    Positions to keep when a downsampled trace has grown past max_points through appends.
+    x, y: the plotted points, standing for rows source rows; the last tail of them are
+    appended rows that haven't been downsampled yet. The earlier points and the tail share
+    three quarters of max_points in proportion to the rows each stands for, so the points
+    per row stay even along the trace and the next max_points // 4 appended rows fit without
+    compacting again. Only the plotted points are read, never the full history.
+    """
+    n = len(y)
+    head = n - tail
+    target = max(3, max_points - max_points // 4)
+    tail_budget = min(tail, max(1, round(target * tail / max(rows, 1))))
+    head_budget = min(head, target - tail_budget)
+    tail_budget = min(tail, target - head_budget)
+    x, y = np.asarray(x), np.asarray(y, dtype=float)
+    return np.concatenate([_thin(x[:head], y[:head], head_budget, method),
+                           head + _thin(x[head:], y[head:], tail_budget, method)])
+
+
+def extend_buffer(buffer, size, values):
+    """
+    Writes values after the first size items of buffer, reallocating it (at twice the new
+    size, in a dtype that holds both) only when it's full, so appending k values costs O(k)
+    amortized. Returns the buffer, which may be a new array; its first size + len(values)
+    items are the data.
+    """
+    values = np.asarray(values)
+    end = size + len(values)
+    dtype = np.result_type(buffer.dtype, values.dtype)
+    if end > len(buffer) or dtype != buffer.dtype:
+        grown = np.empty(max(2 * end, 16), dtype=dtype)
+        grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:end] = values
+    return buffer
+
+def _grid_axis(values, max_bins=None):
+    """
+    Maps one heatmap axis to grid positions. Returns (codes, labels); codes is -1 for missing values.
+    Numeric and datetime axes are sorted and, past max_bins distinct values, cut into max_bins
+    equal-width bins labelled by their start. Other axes keep their order of appearance.
+    """
+    values = pd.Index(values)
+    is_dt = is_datetime64_any_dtype(values)
+    if not (is_dt or is_numeric_dtype(values)):
+        codes, labels = pd.factorize(values, sort=False)
+        return codes, labels
+
+    codes, labels = pd.factorize(values, sort=True)
+    if not max_bins or len(labels) <= max_bins:
+        return codes, labels
+
+    nums = values.asi8 if is_dt else values.to_numpy(dtype=float)
+    nums = nums.astype(float)
+    valid = codes >= 0
+    lo, hi = np.nanmin(nums[valid]), np.nanmax(nums[valid])
+    width = (hi - lo) / max_bins or 1.0
+    codes = np.where(valid, np.clip(((nums - lo) // width), 0, max_bins - 1), -1).astype(np.int64)
+    starts = lo + width * np.arange(max_bins)
+    if is_dt:
+        labels = pd.to_datetime(starts.astype(np.int64), unit=values.unit, utc=values.tz is not None)
+        labels = labels.tz_convert(values.tz) if values.tz is not None else labels
+    else:
+        labels = pd.Index(starts)
+    return codes, labels
+
+def pivot_heatmap(x, y, z, agg='last', max_bins=None):
+    """
+    Pivots long heatmap data (one row per x/y/z point) into a dense z matrix.
+    agg: how points landing in the same cell are combined: 'sum', 'mean' or 'last'
+    ('last' matches what Plotly does with duplicate cells).
+    max_bins: int, or dict with 'x'/'y' keys, capping the grid size of numeric/datetime axes.
+    Returns (z_matrix, x_labels, y_labels); z_matrix has shape (len(y_labels), len(x_labels)),
+    with NaN for empty cells.
+    """
+    if agg not in ('sum', 'mean', 'last'):
+        raise ValueError(f"Unknown heatmap aggregation '{agg}'. Use 'sum', 'mean' or 'last'.")
+    if not isinstance(max_bins, dict):
+        max_bins = {'x': max_bins, 'y': max_bins}
+
+    x_codes, x_labels = _grid_axis(x, max_bins.get('x'))
+    y_codes, y_labels = _grid_axis(y, max_bins.get('y'))
+    z = pd.to_numeric(pd.Series(z), errors='coerce').to_numpy(dtype=float)
+
+    nx, ny = len(x_labels), len(y_labels)
+    keep = (x_codes >= 0) & (y_codes >= 0) & ~np.isnan(z)
+    cells = y_codes[keep] * nx + x_codes[keep]
+    z = z[keep]
+
+    if agg == 'last':
+        grid = np.full(nx * ny, np.nan)
+        # position of the last point in each cell
+        uniq, first_rev = np.unique(cells[::-1], return_index=True)
+        grid[uniq] = z[len(z) - 1 - first_rev]
+    else:
+        counts = np.bincount(cells, minlength=nx * ny)
+        grid = np.bincount(cells, weights=z, minlength=nx * ny)
+        if agg == 'mean':
+            np.divide(grid, counts, out=grid, where=counts > 0)
+        grid[counts == 0] = np.nan
+
+    return grid.reshape(ny, nx), x_labels, y_labels
+
+# Calendar-aligned tick steps, smallest first: (pandas frequency, years per step, approx days per step)
+_TICK_STEPS = [
+    ('W-MON', None, 7), ('2W-MON', None, 14), ('MS', None, 30.4), ('2MS', None, 60.9),
+    ('QS', None, 91.3), ('6MS', None, 182.6), ('YS', 1, 365.25), ('YS', 2, 730.5),
+    ('YS', 5, 1826.3), ('YS', 10, 3652.5), ('YS', 25, 9131.3), ('YS', 50, 18262.5), ('YS', 100, 36525.0),
+]
+
+def infer_spacing(index, sample=2000):
+    """
+    Typical gap between consecutive datetime index values, as a pd.Timedelta (None if it can't tell).
+    Uses the index's own freq when set, else pd.infer_freq / the median gap over the first
+    `sample` values of a sorted index, so it stays cheap on long indexes.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.freq is not None:
+        try:
+            return pd.Timedelta(index.freq)
+        except ValueError:  # non-fixed frequency, e.g. month starts
+            pass
+
+    head = index[:sample].unique() if index.is_monotonic_increasing else []
+    if len(head) < 3:  # unsorted, or long frames where the head repeats a few dates
+        head = index.unique().sort_values()[:sample]
+    if len(head) < 2:
+        return None
+    if len(head) >= 3:
+        try:
+            freq = pd.infer_freq(head)
+            if freq is not None:
+                return pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+        except ValueError:
+            pass
+    return pd.Timedelta(int(np.median(np.diff(head.asi8))), unit=head.unit)
+
+def plan_ticks(index, width=730, max_ticks=None, px_per_tick=65, min_spacing_days=7, spacing=None):
+    """
+    Picks x-axis ticks for a datetime index. Returns a datetime64 array of tick values, or None
+    to leave ticks to Plotly (dense series spaced under min_spacing_days, or non-datetime indexes).
+    Every point gets a tick while that fits in max_ticks (default: one per px_per_tick pixels of
+    width); past that, ticks are evenly spaced on calendar boundaries (weeks, month/quarter/year starts).
+    spacing: the index's infer_spacing, when the caller already has it.
+    """
+    if not is_datetime64_any_dtype(index) or len(index) == 0:
+        return None
+    index = pd.DatetimeIndex(index)
+
+    if spacing is None:
+        spacing = infer_spacing(index)
+    if spacing is None or spacing < pd.Timedelta(days=min_spacing_days):
+        return None
+
+    max_ticks = max(2, int(max_ticks or width // px_per_tick))
+    start, end = index.min(), index.max()
+    span_days = (end - start) / pd.Timedelta(days=1)
+
+    if span_days / (spacing / pd.Timedelta(days=1)) < max_ticks:
+        points = index.unique()
+        if len(points) <= max_ticks:
+            return points.sort_values().to_numpy()
+
+    for freq, years, days in _TICK_STEPS:
+        if days >= spacing / pd.Timedelta(days=1) and span_days / days < max_ticks:
+            break
+    if years is None:
+        ticks = pd.date_range(start.normalize(), end, freq=freq)
+    else:
+        first = pd.Timestamp(year=-(-start.year // years) * years, month=1, day=1, tz=start.tz)
+        if first < start:
+            first = first.replace(year=first.year + years)
+        ticks = pd.date_range(first, end, freq=f'{years}{freq}' if years > 1 else freq)
+    return ticks.to_numpy() if len(ticks) else None
+
+def series_stats(col):
+    """
+    Summary of one plotted series, recorded by build so the annotation methods don't rescan
+    the data: first/last point by index order, max/min (earliest on ties) as index label and
+    value, the number of points and whether the index is sorted.
+    """
+    index = col.index
+    values = pd.to_numeric(col, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    is_sorted = bool(index.is_monotonic_increasing)
+    stats = {"n": len(values), "sorted": is_sorted,
+             "first_idx": None, "first_val": np.nan, "last_idx": None, "last_val": np.nan,
+             "max_idx": None, "max_val": np.nan, "min_idx": None, "min_val": np.nan}
+    if not len(values):
+        return stats
+
+    first, last = (0, len(values) - 1) if is_sorted else (index.argmin(), index.argmax())
+    stats.update(first_idx=index[first], first_val=values[first], last_idx=index[last], last_val=values[last])
+
+    if not np.isnan(values).all():
+        for name, pos in (("max", np.nanargmax(values)), ("min", np.nanargmin(values))):
+            if not is_sorted:
+                ties = np.flatnonzero(values == values[pos])
+                pos = ties[index[ties].argmin()]
+            stats[f"{name}_idx"], stats[f"{name}_val"] = index[pos], values[pos]
+    return stats
+
+def merge_stats(old, new):
+    """Stats for old's series with new's rows appended after it (see ChartMaker.append)."""
+    if not old["n"]:
+        return new
+    if not new["n"]:
+        return old
+    merged = dict(old, n=old["n"] + new["n"], sorted=old["sorted"] and new["sorted"] and new["first_idx"] >= old["last_idx"],
+                  last_idx=new["last_idx"], last_val=new["last_val"])
+    if new["max_idx"] is not None and (old["max_idx"] is None or new["max_val"] > old["max_val"]):
+        merged.update(max_idx=new["max_idx"], max_val=new["max_val"])
+    if new["min_idx"] is not None and (old["min_idx"] is None or new["min_val"] < old["min_val"]):
+        merged.update(min_idx=new["min_idx"], min_val=new["min_val"])
+    return merged
+
+def lookup_table(col, is_sorted=None):
+    """
+    The (index, float values) of col sorted by index, for lookup_values. Callers that look up
+    the same column repeatedly build this once and pass it as table.
+    """
+    index = col.index
+    values = pd.to_numeric(col, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if is_sorted is None:
+        is_sorted = index.is_monotonic_increasing
+    if not is_sorted:
+        order = index.argsort(kind='stable')
+        index, values = index[order], values[order]
+    return index, values
+
+def lookup_values(col, keys, is_sorted=None, table=None):
+    """
+    Values of col at each of keys via searchsorted on its index (sorted once if needed).
+    table is lookup_table(col) when the caller already has it, in which case col isn't read.
+    Returns (values, found): float array with NaN where missing, and a bool array of which keys exist.
+    """
+    index, values = table if table is not None else lookup_table(col, is_sorted)
+    keys = pd.Index(keys)
+    if is_datetime64_any_dtype(index) and not is_datetime64_any_dtype(keys):
+        keys = pd.to_datetime(keys)
+
+    out = np.full(len(keys), np.nan)
+    if not len(index):
+        return out, np.zeros(len(keys), dtype=bool)
+    pos = index.searchsorted(keys)
+    clipped = np.minimum(pos, len(index) - 1)
+    found = (pos < len(index)) & (index[clipped] == keys)
+    out[found] = values[clipped[found]]
+    return out, np.asarray(found)
+
+def build_palette():
+    """
+    Rebuilds the combined palette from the source libraries. ChartMaker uses the precomputed
+    PALETTE in chartengineer/palette.py instead, so matplotlib and colorcet are only
+    imported here, when regenerating it.
+    """
+    import matplotlib.cm as cm
+    from matplotlib.colors import to_hex
+    import colorcet as cc
+    import plotly.colors as pc
+
     # Existing Plotly palettes
     color_palette = pc.qualitative.Plotly[::-1]
     distinct_palette = pc.qualitative.Dark24 + pc.qualitative.Set3
@@ -68,74 +492,89 @@ def colors(shuffle=False):
     colorcet_colors = cc.palette['glasbey_dark'] + cc.palette['glasbey_light']
 
     # Combine all palettes
-    lib_colors = distinct_palette + color_palette + matplotlib_colors + colorcet_colors
+    return distinct_palette + color_palette + matplotlib_colors + colorcet_colors
+
+def colors(shuffle=False):
+    lib_colors = list(PALETTE)
 
     if shuffle:
         random.shuffle(lib_colors)
     
     return lib_colors
 
-def to_percentage(df, sum_col, index_col, percent=True):
-
-    df_copy = df.copy()
-
-    df_copy = df_copy.groupby(index_col)[sum_col].sum().reset_index()
+def fold_other(values, top_n=None, min_share=None, other_label='Other'):
+    """
+    Folds the tail of a descending-sorted Series into a single other_label entry (added last):
+    everything after the top_n largest values and/or every value below min_share of the
+    total (a fraction, e.g. 0.01 for 1%).
+    """
+    keep = np.ones(len(values), dtype=bool)
+    if top_n is not None:
+        keep[top_n:] = False
+    if min_share is not None:
+        keep &= (values / values.sum()).to_numpy() >= min_share
+    if keep.all():
+        return values
+
+    kept = values[keep]
+    other = values[~keep].sum()
+    if other_label in kept.index:
+        kept = kept.copy()
+        kept[other_label] += other
+        return kept
+    return pd.concat([kept, pd.Series([other], index=[other_label], name=values.name)]).rename_axis(values.index.name)
+
+def to_percentage(df, sum_col, index_col, percent=True, top_n=None, min_share=None, other_label='Other'):
+
+    grouped = df.groupby(index_col)[sum_col].sum().sort_values(ascending=False)
+    grouped = fold_other(grouped, top_n=top_n, min_share=min_share, other_label=other_label)
 
     # Calculate total usd_revenue
     total = df[sum_col].sum()
 
+    df_copy = grouped.to_frame(sum_col)
+
     if percent:
 
         # Add a new column for percentage
-        df_copy['percentage'] = (df_copy[sum_col] / total) * 100
-        df_copy['legend_label'] = df_copy.apply(lambda x: f"{x[index_col]} ({x['percentage']:.1f}%)", axis=1)
-        df_copy.set_index('legend_label', inplace=True)
-    else:
-        df_copy.set_index(index_col, inplace=True)
-        print(f'df_copy: {df_copy}')
-    
-    df_copy.sort_values(by=sum_col, ascending=False, inplace=True)
-    df_copy.drop_duplicates(inplace=True)
+        percentage = grouped.to_numpy() / total * 100
+        df_copy.insert(0, grouped.index.name or 'index', grouped.index)
+        df_copy['percentage'] = percentage
+        df_copy.index = grouped.index.astype(str) + ' (' + np.char.mod('%.1f', percentage) + '%)'
+        df_copy.index.name = 'legend_label'
 
     return df_copy, total
 
-def normalize_to_percent(df,num_col=None):
-    print(f'num_col: {num_col}')
+def normalize_to_percent(df, num_col=None, inplace=False, dtype=None):
+    """
+    Converts values to percentages of a total in a single vectorized division.
+    Wide frames (num_col=None): every numeric column as a % of its row total.
+    Long frames: num_col as a % of the total of all rows sharing the same index value.
+    Rows whose total is 0 get 0 rather than NaN/inf. inplace writes the result back into df;
+    dtype (e.g. 'float32') sets the precision of the output.
+    """
+    dtype = np.dtype(dtype or float)
 
     if num_col == None:
-    
-        df_copy = df.copy()
-
-        df_copy['total'] = df_copy.sum(axis=1)
-        # Exclude the 'total_transactions' column from the percentage calculation
-        chains_columns = df_copy.columns.difference(['total'])
-
-        for col in chains_columns:
-            df_copy[f'{col}_percentage'] = (df_copy[col] / df_copy['total']) * 100
-
-        # Drop the 'total_transactions' column if you don't need it
-        df_copy = df_copy.drop(columns=['total'])
-
-        percent_cols = [col for col in df_copy.columns if '_percentage' in col]
-        df_copy = df_copy[percent_cols]
-
-        df_copy.columns = df_copy.columns.str.replace('_percentage', '', regex=False)
-
-        print(f'percent_cols:{df_copy.columns}')
+        cols = df.select_dtypes('number').columns
+        values = df[cols].to_numpy(dtype=dtype, copy=True)
+        totals = np.nansum(values, axis=1, keepdims=True)
     else:
-        df_copy = df.copy()
-        total = df_copy.groupby(df_copy.index)[num_col].sum()
-        total = total.to_frame(f'total_{num_col}')
-        df_copy = df_copy.merge(total, left_index=True, right_index=True, how='inner')
-        # Calculate percentage of daily active users for each app
-        df_copy['percentage'] = (df_copy[num_col] / df_copy[f'total_{num_col}']) * 100
+        cols = [num_col]
+        values = df[num_col].to_numpy(dtype=dtype, copy=True)
+        totals = df.groupby(level=0)[num_col].transform('sum').to_numpy(dtype=dtype)
 
-        # Drop the total_active_users column if no longer needed
-        df_copy = df_copy.drop(columns=[f'total_{num_col}'])
-        df_copy.drop(columns=num_col,inplace=True)
+    zero = totals == 0
+    np.divide(values, totals, out=values, where=~zero)
+    values *= 100
+    values[np.broadcast_to(zero, values.shape)] = 0
 
-        df_copy.rename(columns={"percentage":num_col},inplace=True)
-
-    df_copy.drop_duplicates(inplace=True)
-
-    return df_copy
\ No newline at end of file
+    if num_col == None:
+        if inplace:
+            df[cols] = values
+            return df
+        return pd.DataFrame(values, index=df.index, columns=cols, copy=False)
+
+    df_copy = df if inplace else df.copy()
+    df_copy[num_col] = values
+    return df_copy
@@ -9,11 +9,16 @@ setup(
         "numpy",
         "dotenv",
         "plotly",
-        "matplotlib",
-        "colorcet",
         "nbformat>=4.2.0",
         "kaleido==0.1.0.post1"
     ],
+    extras_require={
+        # only needed to regenerate chartengineer/palette.py with utils.build_palette()
+        "palette": ["matplotlib", "colorcet"],
+        # pyarrow.Table / polars.DataFrame inputs to ChartMaker.build
+        "arrow": ["pyarrow"],
+        "polars": ["polars", "pyarrow"],
+    },
     author="Brandyn Hamilton",
     author_email="brandynham1120@gmail.com",
     description="Plotly and Pandas wrapper for quick and modern chart building.",
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker, ChartSpec, configure_async, render_async
+from chartengineer.aio import offload
+
+
+@pytest.fixture(autouse=True)
+def default_limits():
+    yield
+    configure_async(max_builds=os.cpu_count() or 1, max_renders=min(4, os.cpu_count() or 1))
+
+
+def _frame():
+    index = pd.date_range('2024-01-01', periods=100, freq='D')
+    return pd.DataFrame({'a': np.arange(100.0)}, index=index)
+
+
+class _Tracker:
+    def __init__(self):
+        self.running = self.peak = 0
+        self.lock = threading.Lock()
+
+    def work(self, seconds):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(seconds)
+        with self.lock:
+            self.running -= 1
+        return seconds
+
+
+def test_offload_respects_the_limit():
+    configure_async(max_renders=2)
+    tracker = _Tracker()
+
+    async def main():
+        return await asyncio.gather(*[offload(tracker.work, 0.02) for _ in range(8)])
+
+    assert asyncio.run(main()) == [0.02] * 8
+    assert tracker.peak == 2
+
+
+def test_timed_out_work_keeps_its_slot_until_it_ends():
+    configure_async(max_renders=1)
+    tracker = _Tracker()
+
+    async def main():
+        with pytest.raises(TimeoutError):
+            await offload(tracker.work, 0.3, timeout=0.05)
+        start = time.perf_counter()
+        await offload(tracker.work, 0)
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) > 0.15
+    assert tracker.peak == 1
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError, match='at least 1'):
+        configure_async(max_builds=0)
+    with pytest.raises(ValueError, match='kind must be one of'):
+        asyncio.run(offload(print, kind='export'))
+
+
+def test_build_async_matches_build():
+    df = _frame()
+    cm = ChartMaker()
+    asyncio.run(cm.build_async(df, 't', axes_data={'y1': ['a']}))
+    full = ChartMaker()
+    full.build(df, 't', axes_data={'y1': ['a']})
+    assert cm.fig.to_json() == full.fig.to_json()
+    assert len(cm.series) == 1 and len(cm.return_df()) == 100
+
+
+def test_build_async_timeout_leaves_chartmaker_unchanged():
+    def slow():
+        time.sleep(0.3)
+        return _frame()
+
+    cm = ChartMaker()
+    with pytest.raises(TimeoutError):
+        asyncio.run(cm.build_async(slow, 't', axes_data={'y1': ['a']}, timeout=0.05))
+    assert cm.fig is None and cm.series == [] and cm.df is None
+
+
+def test_render_async_and_to_bytes_async():
+    spec = ChartSpec(_frame(), 't', axes_data={'y1': ['a']}).with_annotations()
+
+    async def main():
+        fig = await render_async(spec)
+        cm = ChartMaker()
+        await cm.build_async(_frame(), 't', axes_data={'y1': ['a']})
+        return fig, await cm.to_bytes_async('json', timeout=10)
+
+    fig, data = asyncio.run(main())
+    assert len(fig.data) == 1 and data.startswith(b'{')
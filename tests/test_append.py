@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker
+from chartengineer.utils import extend_buffer
+
+
+def _rows(start, n, freq='min', name=None, seed=0):
+    index = pd.date_range(start, periods=n, freq=freq, name=name)
+    return pd.DataFrame({'a': np.random.default_rng(seed).random(n)}, index=index)
+
+
+def _next(df, freq='min'):
+    return df.index[-1] + pd.Timedelta(1, unit=freq)
+
+
+def test_append_extends_traces_and_data():
+    df = _rows('2024-01-01', 100)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    added = cm.append(_rows(_next(df), 5, seed=1))
+    assert len(added) == 5
+    assert len(cm.fig.data[0].x) == 105
+    assert len(cm.return_df()) == 105
+    assert cm.series[0]['stats']['n'] == 105
+
+
+def test_append_keeps_rows_as_chunks():
+    df = _rows('2024-01-01', 100)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    last = df
+    for seed in range(3):
+        last = _rows(_next(last), 5, seed=seed)
+        cm.append(last)
+    assert len(cm._df_chunks) == 4
+    assert len(cm.df) == 115 and len(cm._df_chunks) == 1
+
+
+def test_append_stays_within_max_points():
+    df = _rows('2024-01-01', 10000)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'max_points': 1000})
+    last = df
+    for seed in range(100):
+        last = _rows(_next(last), 10, seed=seed)
+        cm.append(last)
+        assert len(cm.fig.data[0].x) <= 1000
+    assert cm.series[0]['stats']['n'] == 11000
+    assert cm.dropped_points['a'] == 11000 - len(cm.fig.data[0].x)
+    # the newest point is always plotted
+    assert pd.Timestamp(cm.fig.data[0].x[-1]) == last.index[-1]
+
+
+def test_append_dedupes_on_index_values_whatever_their_name():
+    df = _rows('2024-01-01', 10, name='date')
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    new = _rows(df.index[-2], 4, name='timestamp', seed=1)
+    added = cm.append(new)
+    assert list(added.index) == list(new.index[2:])
+    assert len(cm.fig.data[0].x) == 12
+
+
+def test_append_keeps_last_of_repeated_new_rows():
+    df = _rows('2024-01-01', 10)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    when = _next(df)
+    added = cm.append(pd.DataFrame({'a': [1.0, 2.0]}, index=[when, when]))
+    assert added['a'].tolist() == [2.0]
+
+
+def test_append_dedupes_grouped_rows_per_group():
+    index = pd.date_range('2024-01-07', periods=5, freq='W').repeat(2)
+    df = pd.DataFrame({'g': ['x', 'y'] * 5, 'v': np.arange(10.0)}, index=index)
+    cm = ChartMaker()
+    cm.build(df, 't', groupby_col='g', num_col='v', chart_type={'y1': 'line'})
+    last = index[-1]
+    new = pd.DataFrame({'g': ['x', 'y', 'y'], 'v': [100.0, 5.0, 6.0]},
+                       index=[last, last, last + pd.Timedelta(days=7)])
+    added = cm.append(new)
+    assert len(added) == 1 and added['g'].tolist() == ['y']
+    assert sorted(len(trace.x) for trace in cm.fig.data) == [5, 6]
+
+
+def test_append_rejects_history():
+    df = _rows('2024-01-01', 10)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    with pytest.raises(ValueError, match='after the current end'):
+        cm.append(_rows('2023-12-31', 2))
+
+
+def test_append_replans_weekly_ticks():
+    df = _rows('2024-01-07', 8, freq='W')
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    cm.append(_rows(df.index[-1] + pd.Timedelta(weeks=1), 2, freq='W', seed=1))
+    ticks = pd.DatetimeIndex(cm.fig.layout.xaxis.tickvals)
+    assert ticks.max() == df.index[-1] + pd.Timedelta(weeks=2)
+
+
+def test_append_writes_into_buffers_instead_of_copying_the_trace():
+    df = _rows('2024-01-01', 100)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'show_text': True})
+    last = df
+    for seed in range(20):
+        last = _rows(_next(last), 5, seed=seed)
+        cm.append(last)
+    points = cm.series[0]['points']
+    assert points['size'] == 200 and len(points['values']) > 200
+    assert np.shares_memory(cm.fig.data[0].y, points['values'])
+    assert list(cm.fig.data[0].y[-5:]) == list(last['a'])
+    assert len(cm.fig.data[0].text) == 200
+
+
+def test_append_rejects_new_groups():
+    index = pd.date_range('2024-01-07', periods=5, freq='W').repeat(2)
+    df = pd.DataFrame({'g': ['x', 'y'] * 5, 'v': np.arange(10.0)}, index=index)
+    cm = ChartMaker()
+    cm.build(df, 't', groupby_col='g', num_col='v', chart_type={'y1': 'line'})
+    when = index[-1] + pd.Timedelta(days=7)
+    with pytest.raises(ValueError, match=r'new groups \(z\)'):
+        cm.append(pd.DataFrame({'g': ['x', 'z'], 'v': [1.0, 2.0]}, index=[when, when]))
+    assert len(cm.return_df()) == 10 and len(cm.fig.data[0].x) == 5
+    assert len(cm.append(pd.DataFrame({'g': ['x'], 'v': [1.0]}, index=[when]))) == 1
+
+
+def test_extend_buffer_grows_only_when_full():
+    buffer = extend_buffer(np.arange(3), 3, [3, 4])
+    assert len(buffer) == 16 and buffer[:5].tolist() == [0, 1, 2, 3, 4]
+    assert extend_buffer(buffer, 5, [5]) is buffer
+    widened = extend_buffer(buffer, 6, [6.5])
+    assert widened.dtype == float and widened[:7].tolist() == [0, 1, 2, 3, 4, 5, 6.5]
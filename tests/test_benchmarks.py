@@ -0,0 +1,29 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def bench():
+    spec = importlib.util.spec_from_file_location('bench_charts', os.path.join(ROOT, 'benchmarks', 'bench_charts.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_parse_size(bench):
+    assert [bench.parse_size(s) for s in ['500', '1k', '2.5M']] == [500, 1000, 2500000]
+
+
+def test_cases_run(bench):
+    # one case per code path; tracemalloc makes each take about half a second even on small frames
+    cases = ['line', 'line_grouped_loaded_lean', 'pie', 'heatmap', 'add_dashed_lines_100', 'save_html_compact']
+    assert set(cases) <= set(bench.CASES)
+    results = bench.run_cases([500], cases=set(cases), repeat=1, include_data=False)
+    errors = {row['case']: row['error'] for row in results if 'error' in row}
+    assert not errors
+    assert [row['case'] for row in results] == cases
+    assert all(row['wall_s'] > 0 and row['output_bytes'] > 0 for row in results)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from chartengineer import ChartMaker
+from chartengineer.core import resolve_trace_class
+
+
+def _frame(n):
+    index = pd.date_range('2024-01-01', periods=n, freq='min')
+    return pd.DataFrame({'a': np.arange(n, dtype=float), 'b': np.ones(n)}, index=index)
+
+
+@pytest.mark.parametrize('kind, n, backend, expected', [
+    ('line', 10, 'svg', go.Scatter),
+    ('line', 10, 'webgl', go.Scattergl),
+    ('line', 9999, 'auto', go.Scatter),
+    ('line', 10000, 'auto', go.Scattergl),
+    ('area', 10 ** 6, 'webgl', go.Scatter),
+    ('bar', 10 ** 6, 'webgl', go.Bar),
+])
+def test_resolve_trace_class(kind, n, backend, expected):
+    assert resolve_trace_class(kind, n, backend) is expected
+
+
+def test_resolve_trace_class_rejects_unknown_backend():
+    with pytest.raises(ValueError, match='render_backend'):
+        resolve_trace_class('line', 10, 'canvas')
+
+
+def test_auto_backend_switches_only_large_traces():
+    df = _frame(200)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a'], 'y2': ['b']}, chart_type={'y1': 'line', 'y2': 'area'},
+             options={'render_backend': 'auto', 'webgl_threshold': 100})
+    assert [trace.type for trace in cm.fig.data] == ['scattergl', 'scatter']
+
+
+@pytest.fixture
+def daily():
+    index = pd.date_range('2024-01-01', periods=30, freq='D')
+    return pd.DataFrame({'a': np.arange(30.0), 'b': np.arange(30.0)[::-1]}, index=index)
+
+
+@pytest.mark.parametrize('raw', [False, True])
+def test_add_dashed_lines_accepts_every_event_form(daily, raw):
+    events = [
+        [daily.index[1], (daily.index[2], 'two')],
+        {daily.index[1]: 'one', daily.index[2]: None},
+        pd.DataFrame({'text': ['one', 'two']}, index=daily.index[1:3]),
+        pd.DataFrame({'when': daily.index[1:3], 'label': ['one', 'two']}),
+    ]
+    for i, evts in enumerate(events):
+        cm = ChartMaker()
+        cm.build(daily, 't', axes_data={'y1': ['a', 'b']}, options={'raw': raw})
+        kwargs = dict(date_col='when', text_col='label') if i == 3 else {}
+        assert cm.add_dashed_lines(evts, **kwargs) == 2
+        assert len(cm.fig.to_plotly_json()['layout']['shapes']) == 2
+
+
+def test_add_dashed_lines_labels_the_highest_series(daily, capsys):
+    cm = ChartMaker()
+    cm.build(daily, 't', axes_data={'y1': ['a', 'b']})
+    assert cm.add_dashed_lines([daily.index[0], daily.index[-1], '2025-01-01']) == 2
+    texts = [annotation.text for annotation in cm.fig.layout.annotations]
+    assert texts[0].startswith('b: 29') and texts[1].startswith('a: 29')
+    assert 'not in the DataFrame index' in capsys.readouterr().out
+    # each line ends at line_factor times the value it marks
+    assert cm.fig.layout.shapes[0].y1 == pytest.approx(29 * 1.5)
+
+
+def test_a_second_build_only_annotates_its_own_series(daily):
+    cm = ChartMaker()
+    cm.build(daily.assign(a=daily['a'] * 20), 'one', axes_data={'y1': ['a']})
+    cm.build(daily, 'two', axes_data={'y1': ['b']})
+    cm.add_annotations(custom_annotations={daily.index[5]: 'note'})
+    assert cm.add_dashed_lines([daily.index[0]]) == 1
+    texts = [annotation.text for annotation in cm.fig.layout.annotations]
+    assert [s['label'] for s in cm.series] == ['b']
+    assert texts and not any('A' in text or text.startswith('a:') for text in texts)
+    assert texts[-1].startswith('b: 29') and cm.fig.layout.shapes[0].y1 == pytest.approx(29 * 1.5)
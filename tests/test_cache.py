@@ -0,0 +1,93 @@
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartCache, ChartMaker, DiskCache, MemoryCache
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2024-01-01', periods=300, freq='D')
+    return pd.DataFrame({'a': rng.random(300).cumsum(), 'b': rng.random(300)}, index=index)
+
+
+@pytest.fixture
+def long_df():
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2024-01-01', periods=150, freq='D').repeat(2)
+    return pd.DataFrame({'group': np.tile(['x', 'y'], 150), 'value': rng.random(300)}, index=index)
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_bytes=10)
+    cache.set('a', b'12345')
+    cache.set('b', b'12345')
+    assert cache.get('a') == b'12345'
+    cache.set('c', b'12345')
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['bytes'] == 10
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.set('a', b'12345')
+    assert cache.get('a') == b'12345'
+    assert cache.get('missing') is None
+    cache.set('b', b'123456')
+    assert cache.stats()['bytes'] <= 10
+
+
+@pytest.mark.parametrize('raw', [False, True])
+@pytest.mark.parametrize('grouped', [False, True])
+def test_figure_cache_hit_restores_build(tmp_path, df, long_df, raw, grouped):
+    cache = ChartCache(directory=str(tmp_path))
+    if grouped:
+        args = dict(df=long_df, groupby_col='group', num_col='value', chart_type={'y1': 'line'})
+    else:
+        args = dict(df=df, axes_data={'y1': ['a'], 'y2': ['b']})
+    options = {'raw': raw, 'max_points': 100}
+
+    first = ChartMaker(cache=cache)
+    first.build(title='t', options=options, **args)
+    second = ChartMaker(cache=cache)
+    second.build(title='t', options=options, **args)
+
+    assert cache.stats()['figures']['hits'] == 1
+    assert json.loads(first.fig.to_json()) == json.loads(second.fig.to_json())
+    assert first.dropped_points == second.dropped_points
+    assert [s['stats'] for s in first.series] == [s['stats'] for s in second.series]
+    assert first.add_dashed_line('2024-03-01') == second.add_dashed_line('2024-03-01') == 1
+
+
+def test_figure_cache_entries_are_json_without_data(df):
+    cache = ChartCache()
+    ChartMaker(cache=cache).build(df, 't', axes_data={'y1': ['a']})
+    (entry,) = cache.figures._items.values()
+    state = json.loads(entry)
+    assert set(state['series'][0]) >= {'label', 'trace', 'axis'}
+    assert 'col' not in state['series'][0] and 'stats' not in state['series'][0]
+
+
+def test_unreadable_figure_entry_is_rebuilt(df):
+    cache = ChartCache()
+    ChartMaker(cache=cache).build(df, 't', axes_data={'y1': ['a']})
+    key = next(iter(cache.figures._items))
+    cache.figures.set(key, pickle.dumps({'fig': None}))
+    cm = ChartMaker(cache=cache)
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    assert len(cm.fig.data) == 1
+
+
+def test_restored_figure_can_be_appended(df):
+    cache = ChartCache()
+    ChartMaker(cache=cache).build(df, 't', axes_data={'y1': ['a']})
+    cm = ChartMaker(cache=cache)
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    new_rows = pd.DataFrame({'a': [1.0], 'b': [2.0]}, index=[df.index[-1] + pd.Timedelta(days=1)])
+    cm.append(new_rows)
+    assert len(cm.fig.data[0].x) == len(df) + 1
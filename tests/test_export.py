@@ -0,0 +1,97 @@
+import base64
+import os
+
+import numpy as np
+import pandas as pd
+
+from chartengineer import ChartMaker
+from chartengineer.export import encode_arrays, write_html, write_html_bundle
+
+
+def _fig():
+    df = pd.DataFrame({'a': np.arange(10.0)}, index=pd.date_range('2024-01-01', periods=10))
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    return cm.fig
+
+
+def test_write_html_shares_plotlyjs(tmp_path):
+    fig = _fig()
+    write_html(fig, str(tmp_path / 'a.html'))
+    js = tmp_path / 'plotly.min.js'
+    mtime = js.stat().st_mtime_ns
+    write_html(fig, str(tmp_path / 'b.html'))
+    assert js.stat().st_mtime_ns == mtime
+    assert 'src="plotly.min.js"' in (tmp_path / 'b.html').read_text()
+
+
+def test_write_html_replaces_stale_plotlyjs(tmp_path):
+    from plotly.offline import get_plotlyjs
+    js = tmp_path / 'plotly.min.js'
+    current = get_plotlyjs()
+    # same size, older version banner
+    js.write_text(current.replace('plotly.js v', 'plotly.js w', 1), encoding='utf-8')
+    write_html(_fig(), str(tmp_path / 'a.html'))
+    assert js.read_text(encoding='utf-8') == current
+
+    js.write_text('old', encoding='utf-8')
+    write_html(_fig(), str(tmp_path / 'b.html'))
+    assert os.path.getsize(js) == len(current.encode('utf-8'))
+
+
+def test_export_figures_in_parallel_keeps_job_order(tmp_path):
+    from chartengineer.export import export_figures
+    fig = _fig()
+    jobs = [(fig, str(tmp_path / f'{i}.html')) for i in range(3)]
+    jobs.insert(1, {'fig': fig})  # no path
+    results = export_figures(jobs, max_workers=2, html_options={})
+    assert [r['error'] is None for r in results] == [True, False, True, True]
+    assert 'file path' in results[1]['error']
+    assert [r['path'] for r in results[2:]] == [str(tmp_path / '1.html'), str(tmp_path / '2.html')]
+    assert all(r['bytes'] == os.path.getsize(r['path']) for r in results if r['error'] is None)
+
+
+def _decode(spec):
+    return np.frombuffer(base64.b64decode(spec['bdata']), dtype={'i1': np.int8, 'f4': np.float32, 'f8': np.float64}[spec['dtype']])
+
+
+def test_encode_arrays_types():
+    out = encode_arrays({'x': np.arange(5, dtype=np.int64), 'y': [0.5, 1.5, 2.5], 'text': ['a', 'b'],
+                         'd': np.array(['2024-01-01', '2024-01-02'], dtype='datetime64[ns]')})
+    assert out['x']['dtype'] == 'i1' and _decode(out['x']).tolist() == [0, 1, 2, 3, 4]
+    assert out['y']['dtype'] == 'f8' and _decode(out['y']).tolist() == [0.5, 1.5, 2.5]
+    assert out['text'] == ['a', 'b']
+    assert out['d'] == ['2024-01-01', '2024-01-02']
+
+
+def test_encode_arrays_float32():
+    out = encode_arrays({'y': np.array([0.1, 0.2])}, float32=True)
+    assert out['y']['dtype'] == 'f4' and np.allclose(_decode(out['y']), [0.1, 0.2])
+
+
+def test_write_html_compact_is_smaller(tmp_path):
+    df = pd.DataFrame({'a': np.random.default_rng(0).random(5000)},
+                      index=pd.date_range('2024-01-01', periods=5000, freq='D'))
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    compact = write_html(cm.fig, str(tmp_path / 'a.html'), minify=True)
+    plain = write_html(cm.fig, str(tmp_path / 'b.html'), binary=False)
+    assert compact < plain
+
+
+def test_html_bundle_shares_plotlyjs_and_template(tmp_path):
+    figs = [_fig() for _ in range(2)]
+    path = tmp_path / 'bundle.html'
+    write_html_bundle([('first </script>', figs[0]), figs[1]], str(path), include_plotlyjs='directory')
+    page = path.read_text()
+    assert page.count('src="plotly.min.js"') == 1 and (tmp_path / 'plotly.min.js').exists()
+    assert page.count('data-template="0"') == 2 and 'data-template="1"' not in page
+    assert 'first &lt;/script&gt;' in page
+
+
+def test_html_bundle_sections(tmp_path):
+    path = tmp_path / 'bundle.html'
+    write_html_bundle(None, str(path), sections={'Volume': [_fig()], 'Fees': [_fig(), _fig()]})
+    page = path.read_text()
+    assert '<h2>Volume</h2>' in page and '<h2>Fees</h2>' in page
+    assert page.count('class="ce-chart"') == 3 and page.count('cdn.plot.ly') == 1
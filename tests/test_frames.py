@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker
+from chartengineer.frames import frame_kind, referenced_columns, to_frame
+
+pa = pytest.importorskip('pyarrow')
+
+
+def _frame():
+    index = pd.date_range('2024-01-01', periods=100, freq='D', name='date')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'a': rng.random(100), 'b': np.arange(100), 'c': ['x', 'y'] * 50}, index=index)
+
+
+def test_referenced_columns():
+    assert referenced_columns({'x': 'date', 'y1': ['a', 'b'], 'y2': ['a']}, 'c', 'b') == ['date', 'a', 'b', 'c']
+
+
+def test_to_frame_from_arrow_is_zero_copy():
+    df = _frame()
+    table = pa.Table.from_pandas(df)
+    out = to_frame(table, ['a', 'c'])
+    assert frame_kind(table) == 'arrow' and frame_kind(df) is None
+    assert list(out.columns) == ['a', 'c'] and out.index.name == 'date'
+    pd.testing.assert_series_equal(out['a'], df['a'], check_freq=False)
+    assert not out['a'].to_numpy().flags.writeable  # a view of the Arrow buffer
+
+
+def test_to_frame_copies_columns_with_nulls(capsys):
+    table = pa.table({'x': pa.array([1.0, None, 3.0]), 'y': pa.array([1, 2, 3])})
+    out = to_frame(table, ['x', 'y'])
+    assert np.isnan(out['x'].iloc[1]) and out['y'].tolist() == [1, 2, 3]
+    assert 'copied 1 of 2 arrow column(s): x' in capsys.readouterr().out
+
+
+def test_build_from_arrow_matches_pandas():
+    df = _frame()
+    figs = []
+    for data in [df, pa.Table.from_pandas(df)]:
+        cm = ChartMaker()
+        cm.build(data, 't', axes_data={'y1': ['a'], 'y2': ['b']})
+        figs.append(json.loads(cm.fig.to_json()))
+    assert figs[0] == figs[1]
+
+
+def test_build_from_polars_with_x_column():
+    pl = pytest.importorskip('polars')
+    df = _frame()
+    frame = pl.from_pandas(df.reset_index())
+    cm = ChartMaker()
+    cm.build(frame, 't', axes_data={'x': 'date', 'y1': ['a']})
+    full = ChartMaker()
+    full.build(df, 't', axes_data={'y1': ['a']})
+    assert json.loads(cm.fig.to_json()) == json.loads(full.fig.to_json())
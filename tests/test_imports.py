@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_leaves_heavy_dependencies_unloaded():
+    # matplotlib/colorcet only rebuild the palette, kaleido renders images and asyncio backs the aio API
+    code = ("import sys, chartengineer; chartengineer.ChartMaker(); "
+            "print(sorted(m for m in ['matplotlib', 'colorcet', 'kaleido', 'asyncio', 'polars'] if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=ROOT)
+    assert out.stdout.strip() == '[]'
@@ -0,0 +1,89 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker
+
+
+def _frame(n=1000):
+    index = pd.date_range('2024-01-01', periods=n, freq='h')
+    return pd.DataFrame({'a': np.random.default_rng(0).random(n), 'b': np.arange(n, dtype=float)}, index=index)
+
+
+def test_lean_build_matches_full_build():
+    df = _frame()
+    figs = []
+    for lean in [False, True]:
+        cm = ChartMaker()
+        cm.build(df, 't', axes_data={'y1': ['a'], 'y2': ['b']}, options={'lean': lean})
+        cm.add_annotations(custom_annotations={df.index[10]: 'hi'})
+        cm.add_dashed_lines(list(df.index[::100]))
+        figs.append(cm.fig.to_json())
+    assert figs[0] == figs[1]
+    assert cm.df is None and all(s['col'] is None for s in cm.series)
+
+
+def test_lean_lookups_find_points_dropped_by_max_points():
+    df = _frame()
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'lean': True, 'max_points': 50})
+    plotted = set(pd.DatetimeIndex(cm.fig.data[0].x))
+    dropped = next(date for date in df.index if date not in plotted)
+    assert cm.add_dashed_line(dropped) == 1
+    assert 'lookup' not in cm.series[0]
+
+
+def test_lean_grouped_lookups_with_max_points():
+    index = pd.date_range('2024-01-01', periods=500, freq='D').repeat(2)
+    df = pd.DataFrame({'g': ['x', 'y'] * 500, 'v': np.arange(1000.0)}, index=index)
+    cm = ChartMaker()
+    cm.build(df, 't', groupby_col='g', num_col='v', chart_type={'y1': 'line'},
+             options={'lean': True, 'max_points': 20})
+    assert cm.add_dashed_line(index[301]) == 1
+
+
+def test_lean_return_df_reloads_converted_input():
+    pa = pytest.importorskip('pyarrow')
+    df = _frame()
+    table = pa.Table.from_pandas(df)
+    cm = ChartMaker()
+    cm.build(table, 't', axes_data={'y1': ['a']}, options={'lean': True})
+    gc.collect()
+    pd.testing.assert_series_equal(cm.return_df()['a'], df['a'], check_freq=False, check_names=False)
+
+
+def test_lean_return_df_reloads_normalized_frame():
+    df = _frame()
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a', 'b']}, options={'lean': True, 'normalize': True})
+    gc.collect()
+    full = ChartMaker()
+    full.build(df, 't', axes_data={'y1': ['a', 'b']}, options={'normalize': True})
+    pd.testing.assert_frame_equal(cm.return_df(), full.return_df())
+
+
+def test_lean_return_df_calls_source_again():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return _frame()
+
+    cm = ChartMaker()
+    cm.build(load, 't', axes_data={'y1': ['a']}, options={'lean': True})
+    assert len(cm.return_df()) == 1000 and len(calls) == 2
+
+
+def test_lean_lookups_fall_back_to_plotted_points_once_data_is_released():
+    df = _frame()
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'lean': True, 'max_points': 50})
+    plotted = pd.DatetimeIndex(cm.fig.data[0].x)
+    del df
+    gc.collect()
+    assert cm.add_dashed_line(plotted[10], 'event') == 1
+    assert cm.add_annotations(custom_annotations={plotted[20]: 'note'}) > 0
+    with pytest.raises(ValueError, match='released'):
+        cm.return_df()
@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+import pytest
+
+from chartengineer.loader import load_csv, read_csv
+
+pytest.importorskip('pyarrow')
+
+CSV = 'date,a,b\n2024-01-02,2,x\n2024-01-01,1,y\n2024-01-03,3,z\n'
+
+
+def _write(path, text=CSV):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def _sidecars(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+@pytest.mark.parametrize('fmt', ['feather', 'parquet'])
+def test_load_csv_matches_read_csv_from_sidecar(tmp_path, fmt):
+    path = _write(tmp_path / 'data.csv')
+    first = load_csv(path, fmt=fmt)
+    second = load_csv(path, fmt=fmt)
+    pd.testing.assert_frame_equal(first, read_csv(path))
+    pd.testing.assert_frame_equal(second, first)
+    assert len(_sidecars(tmp_path / '.chartengineer')) == 1
+
+
+def test_load_csv_replaces_stale_sidecar(tmp_path):
+    path = _write(tmp_path / 'data.csv')
+    load_csv(path)
+    before = _sidecars(tmp_path / '.chartengineer')
+    _write(tmp_path / 'data.csv', CSV + '2024-01-04,4,w\n')
+    assert len(load_csv(path)) == 4
+    after = _sidecars(tmp_path / '.chartengineer')
+    assert len(after) == 1 and after != before
+
+
+def test_same_named_csvs_share_cache_dir(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = _write(tmp_path / 'one' / 'data.csv')
+    second = _write(tmp_path / 'two' / 'data.csv', CSV.replace(',1,', ',10,'))
+    load_csv(first, cache_dir=cache_dir)
+    load_csv(second, cache_dir=cache_dir)
+    assert len(_sidecars(cache_dir)) == 2
+    assert load_csv(first, cache_dir=cache_dir)['a'].tolist() == [1, 2, 3]
+    assert load_csv(second, cache_dir=cache_dir)['a'].tolist() == [10, 2, 3]
+
+
+def test_load_csv_as_arrow(tmp_path):
+    path = _write(tmp_path / 'data.csv')
+    load_csv(path)
+    table = load_csv(path, as_arrow=True)
+    assert table.num_rows == 3 and 'a' in table.column_names
+
+
+def test_load_csv_without_sidecar(tmp_path):
+    path = _write(tmp_path / 'data.csv')
+    load_csv(path, cache_dir=False)
+    assert not os.path.exists(tmp_path / '.chartengineer')
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker
+from chartengineer.options import resolve_options
+
+
+@pytest.fixture
+def df():
+    index = pd.date_range('2024-01-01', periods=30, freq='D')
+    return pd.DataFrame({'a': np.arange(30.0)}, index=index)
+
+
+def test_resolve_options_compiles_each_pair_once():
+    defaults = {'font_size': {'axes': 12}, 'decimals': True}
+    first = resolve_options(defaults, {'decimals': False})
+    assert resolve_options(dict(defaults), {'decimals': False}) is first
+    assert first['decimals'] is False and first['font_size'] == {'axes': 12}
+
+
+def test_resolve_options_merges_dicts_one_level():
+    resolved = resolve_options({'tickprefix': {'y1': '$', 'y2': '%'}}, {'tickprefix': {'y1': '€'}})
+    assert resolved['tickprefix'] == {'y1': '€', 'y2': '%'}
+    assert resolved.prefix('y2') == '%'
+
+
+def test_resolve_options_rejects_unknown_keys():
+    with pytest.raises(ValueError, match='Unknown option'):
+        resolve_options({'decimals': True}, {'decimal': False})
+
+
+def test_build_rejects_unknown_options(df):
+    with pytest.raises(ValueError, match='Unknown option'):
+        ChartMaker().build(df, 't', axes_data={'y1': ['a']}, options={'fontsize': 10})
+
+
+def test_default_options_changed_in_place_apply_to_next_build(df):
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    cm.default_options['font_family'] = 'Courier'
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    assert cm.fig.layout.font.family == 'Courier'
+
+
+def test_default_options_new_key_in_place_is_known(df):
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    cm.default_options['my_option'] = 1
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'my_option': 2})
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker
+from chartengineer.profiling import Profiler, current_profiler, profile
+
+
+def _frame():
+    index = pd.date_range('2024-01-01', periods=100, freq='D')
+    return pd.DataFrame({'a': np.arange(100.0)}, index=index)
+
+
+def test_build_records_nested_phases_with_counts():
+    prof = Profiler()
+    cm = ChartMaker(profiler=prof)
+    cm.build(_frame(), 't', axes_data={'y1': ['a']})
+    cm.add_dashed_lines(['2024-02-01', '2024-03-01'])
+    phases = prof.report()['phases']
+    assert phases['build']['calls'] == 1 and phases['build']['rows'] == 100 and phases['build']['traces'] == 1
+    assert 'build/figure' in phases and phases['add_dashed_lines']['lines'] == 2
+    assert abs(sum(p['share'] for name, p in phases.items() if '/' not in name) - 1) < 1e-9
+
+
+def test_profile_block_activates_for_chartmakers_and_callback():
+    seen = []
+    with profile(callback=seen.append) as prof:
+        assert current_profiler() is prof
+        ChartMaker().build(_frame(), 't', axes_data={'y1': ['a']})
+    assert current_profiler() is None
+    assert seen[-1]['name'] == 'build'
+    assert 'build' in prof.summary()
+
+
+def test_span_records_errors():
+    prof = Profiler()
+    with pytest.raises(KeyError):
+        with prof.span('outer'):
+            with prof.span('inner', points=3):
+                raise KeyError('x')
+    assert [(s['name'], s.get('error')) for s in prof.spans] == [('outer/inner', 'KeyError'), ('outer', 'KeyError')]
+    assert prof.report()['phases']['outer/inner']['points'] == 3
+
+
+def test_keep_spans_false_keeps_totals_only():
+    prof = Profiler(keep_spans=False)
+    ChartMaker(profiler=prof).build(_frame(), 't', axes_data={'y1': ['a']})
+    report = prof.report()
+    assert report['spans'] == [] and report['phases']['build']['calls'] == 1
@@ -0,0 +1,53 @@
+import plotly.graph_objects as go
+import pytest
+
+from chartengineer.rawfig import DictFigure, make_trace
+
+
+def test_magic_underscores_follow_compound_properties():
+    fig = DictFigure()
+    fig.update_layout(xaxis_title_text='x', yaxis2_tickfont_size=10, plot_bgcolor='white',
+                      legend_title_font_color='red')
+    layout = fig.layout
+    assert layout['xaxis']['title'] == {'text': 'x'}
+    assert layout['yaxis2']['tickfont'] == {'size': 10}
+    assert layout['plot_bgcolor'] == 'white'
+    assert layout['legend']['title']['font'] == {'color': 'red'}
+
+
+def test_underscore_properties_nest_under_their_own_name():
+    trace = make_trace(go.Scatter, raw=True, x=[1], y=[2], error_y_thickness=2, marker_line_width=1)
+    assert trace['error_y'] == {'thickness': 2}
+    assert trace['marker'] == {'line': {'width': 1}}
+
+
+@pytest.mark.parametrize('key', ['hover_text', 'xaxis_showgrid_color', 'plot_bg_color'])
+def test_unknown_underscore_keys_raise(key):
+    with pytest.raises(ValueError, match='Invalid property'):
+        DictFigure().update_layout(**{key: 1})
+
+
+def test_raw_trace_matches_graph_objects():
+    kwargs = dict(x=[1, 2], y=[3, 4], name='a', line_width=2, marker_color='red')
+    assert make_trace(go.Scatter, raw=True, **kwargs) == go.Scatter(**kwargs).to_plotly_json()
+
+
+@pytest.mark.parametrize('chart_type', [{'y1': 'line', 'y2': 'bar'}, {'y1': 'area'}])
+def test_raw_build_matches_graph_objects_build(chart_type):
+    import json
+
+    import numpy as np
+    import pandas as pd
+
+    from chartengineer import ChartMaker
+    index = pd.date_range('2024-01-01', periods=50, freq='W')
+    df = pd.DataFrame({'a': np.arange(50.0), 'b': np.arange(50.0) ** 2}, index=index)
+    figs = []
+    for raw in [False, True]:
+        cm = ChartMaker()
+        cm.build(df, 't', axes_data={'y1': ['a'], 'y2': ['b']}, chart_type=chart_type, options={'raw': raw})
+        cm.add_annotations()
+        cm.add_dashed_line(index[10], 'event')
+        # through go.Figure, which fills in the same empty titles and template for both
+        figs.append(json.loads(go.Figure(cm.fig.to_plotly_json()).to_json()))
+    assert figs[0] == figs[1]
@@ -0,0 +1,95 @@
+import dataclasses
+import gc
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer import ChartMaker, ChartSpec, render
+from chartengineer.core import DEFAULT_OPTIONS
+
+
+def _frame():
+    index = pd.date_range('2024-01-01', periods=200, freq='D')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'a': rng.random(200).cumsum(), 'b': rng.random(200)}, index=index)
+
+
+def _json(fig):
+    return json.loads(fig.to_json())
+
+
+def test_render_matches_chartmaker_in_call_order():
+    df = _frame()
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a'], 'y2': ['b']}, options={'tickprefix': {'y1': '$'}})
+    cm.add_dashed_line('2024-03-01', 'first')
+    cm.add_annotations(custom_annotations={pd.Timestamp('2024-02-01'): 'note'})
+    cm.add_dashed_line('2024-04-01', 'second')
+    cm.add_title(subtitle='daily')
+    spec = cm.to_spec()
+    assert [name for name, _ in spec.calls] == ['add_dashed_lines', 'add_annotations', 'add_dashed_lines', 'add_title']
+    assert _json(render(spec)) == _json(cm.fig)
+
+
+def test_spec_is_frozen_and_replace_derives():
+    spec = ChartSpec(_frame(), 't', axes_data={'y1': ['a']}).with_annotations().with_events({'2024-02-01': 'x'})
+    with pytest.raises(TypeError):
+        spec.axes_data['y2'] = ['b']
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        spec.title = 'u'
+    other = dataclasses.replace(spec, title='u')
+    assert other.calls == spec.calls and ChartMaker.from_spec(other).title == 'u'
+
+
+def test_spec_rejects_unknown_calls():
+    with pytest.raises(ValueError, match='Unknown spec call'):
+        ChartSpec(_frame(), calls=[('save_fig', {})])
+
+
+def test_from_spec_does_not_share_default_options():
+    before = json.dumps(DEFAULT_OPTIONS, sort_keys=True, default=str)
+    cm = ChartMaker.from_spec(ChartSpec(_frame(), 't', axes_data={'y1': ['a']}))
+    cm.default_options['font_family'] = 'Courier'
+    assert json.dumps(DEFAULT_OPTIONS, sort_keys=True, default=str) == before
+
+
+def test_lean_spec_does_not_keep_the_frame():
+    df = _frame()
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'lean': True})
+    cm.add_annotations()
+    spec = cm.to_spec()
+    assert spec.data is not df
+    assert _json(render(spec)) == _json(cm.fig)
+    del df
+    gc.collect()
+    with pytest.raises(ValueError, match='released'):
+        render(spec)
+
+
+def test_render_from_threads():
+    specs = [ChartSpec(_frame, f't{i}', axes_data={'y1': ['a']}).with_annotations() for i in range(6)]
+    serial = [_json(render(spec)) for spec in specs]
+    with ThreadPoolExecutor(3) as pool:
+        assert [_json(fig) for fig in pool.map(render, specs)] == serial
+
+
+def test_spec_from_csv_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    _frame().rename_axis('date').to_csv(path)
+    fig = render(ChartSpec(str(path), 't', axes_data={'y1': ['a']}, options={'raw': True}))
+    assert len(fig.data) == 1
+
+
+def test_spec_keeps_the_plotted_frame_not_the_input():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.Table.from_pandas(_frame().rename_axis('date').reset_index())
+    cm = ChartMaker()
+    cm.build(table, 't', axes_data={'x': 'date', 'y1': ['a']}, options={'normalize': True})
+    cm.add_annotations()
+    spec = cm.to_spec()
+    assert spec.data is cm.df and spec.options['normalize'] is False
+    assert _json(render(spec)) == _json(cm.fig)
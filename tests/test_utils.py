@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chartengineer.utils import (clean_values, downsample, fold_other, format_values, infer_spacing, lookup_table,
+                                 lookup_values, merge_stats, normalize_to_percent, partition_groups, pivot_heatmap,
+                                 plan_ticks, series_stats, to_percentage)
+
+
+def _series(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.date_range('2020-01-01', periods=n, freq='D'), rng.random(n).cumsum()
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+@pytest.mark.parametrize('max_points', [3, 4, 5, 10, 100, 999])
+def test_downsample_caps_output_at_max_points(method, max_points):
+    x, y = _series()
+    keep = downsample(x, y, max_points, method=method)
+    assert len(keep) <= max_points
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert (np.diff(keep) > 0).all()
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_keeps_extremes(method):
+    x, y = _series()
+    keep = downsample(x, y, 50, method=method)
+    assert np.argmax(y) in keep and np.argmin(y) in keep
+
+
+@pytest.mark.parametrize('max_points', [1, 2])
+def test_downsample_rejects_tiny_max_points(max_points):
+    x, y = _series()
+    with pytest.raises(ValueError, match='at least 3'):
+        downsample(x, y, max_points)
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_skips_nan(method):
+    x, y = _series()
+    y[100:400] = np.nan
+    keep = downsample(x, y, 100, method=method)
+    assert not np.isnan(y[keep[1:-1]]).any()
+
+
+def test_downsample_leaves_short_series_alone():
+    x, y = _series(50)
+    assert downsample(x, y, 50) is None
+    assert downsample(x, y, None) is None
+
+
+def test_downsample_unknown_method():
+    x, y = _series()
+    with pytest.raises(ValueError, match='Unknown downsample method'):
+        downsample(x, y, 100, method='every_nth')
+
+
+def test_build_rejects_tiny_max_points():
+    from chartengineer import ChartMaker
+    x, y = _series(100)
+    df = pd.DataFrame({'a': y}, index=x)
+    with pytest.raises(ValueError, match='at least 3'):
+        ChartMaker().build(df, 't', axes_data={'y1': ['a']}, options={'max_points': {'y1': 2}})
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']}, options={'max_points': 10})
+    assert len(cm.fig.data[0].x) == 10
+
+
+def test_lookup_values_on_unsorted_index():
+    col = pd.Series([3.0, 1.0, 2.0], index=pd.to_datetime(['2024-01-03', '2024-01-01', '2024-01-02']))
+    values, found = lookup_values(col, ['2024-01-02', '2024-01-05', '2024-01-03'])
+    assert found.tolist() == [True, False, True]
+    assert values[0] == 2.0 and np.isnan(values[1]) and values[2] == 3.0
+
+
+def test_lookup_values_with_prebuilt_table():
+    col = pd.Series(['1', 'x', '3'], index=[10, 20, 30])
+    table = lookup_table(col)
+    values, found = lookup_values(None, [20, 30, 40], table=table)
+    assert found.tolist() == [True, True, False]
+    assert np.isnan(values[0]) and values[1] == 3.0
+
+
+def test_annotation_lookups_reuse_table_until_append():
+    from chartengineer import ChartMaker
+    x, y = _series(100)
+    df = pd.DataFrame({'a': y}, index=x)
+    cm = ChartMaker()
+    cm.build(df, 't', axes_data={'y1': ['a']})
+    cm.add_dashed_line(x[10])
+    table = cm.series[0]['lookup']
+    cm.add_dashed_line(x[20])
+    assert cm.series[0]['lookup'] is table
+    cm.append(pd.DataFrame({'a': [1.0]}, index=[x[-1] + pd.Timedelta(days=1)]))
+    assert 'lookup' not in cm.series[0]
+    assert cm.add_dashed_line(x[-1] + pd.Timedelta(days=1)) == 1
+
+
+_NUMBERS = [0, 0.5, -0.25, 7, 99.94, 150, -999, 1234, 56789, -2.5e6, 3e9, 4.56e12]
+
+
+@pytest.mark.parametrize('decimals', [True, False])
+@pytest.mark.parametrize('decimal_places', [0, 1, 2])
+def test_format_values_matches_clean_values(decimals, decimal_places):
+    expected = [clean_values(x, decimals=decimals, decimal_places=decimal_places) for x in _NUMBERS]
+    assert format_values(_NUMBERS, decimals=decimals, decimal_places=decimal_places) == expected
+
+
+def test_format_values_prefix_suffix_and_nan():
+    assert format_values([1500, 0, np.nan], prefix='$', suffix='%') == ['$1.5K%', '$0%', '$nan%']
+
+
+def test_format_values_text_freq_and_offset():
+    assert format_values([1, 2, 3, 4, 5], decimal_places=0, text_freq=2) == ['1', '', '3', '', '5']
+    # the chunk continues a series whose labels fell on positions 0, 2, 4, ...
+    assert format_values([6, 7, 8], decimal_places=0, text_freq=2, offset=5) == ['', '7', '']
+
+
+def test_clean_values_on_series_keeps_index():
+    out = clean_values(pd.Series([1e6, 2e3], index=['a', 'b'], name='v'))
+    assert out.tolist() == ['1.0M', '2.0K'] and list(out.index) == ['a', 'b'] and out.name == 'v'
+
+
+def test_partition_groups_matches_groupby():
+    df = pd.DataFrame({'g': ['b', 'a', None, 'b', 'c', 'a', 'b'],
+                       'v': [1.0, 2.0, 9.0, np.nan, 5.0, 4.0, 3.0]})
+    parts = partition_groups(df, 'g', 'v')
+    grouped = df.groupby('g')['v']
+    assert list(parts['keys']) == ['a', 'b', 'c']
+    pd.testing.assert_series_equal(parts['sum'], grouped.sum(), check_names=False)
+    pd.testing.assert_series_equal(parts['last'], grouped.last(), check_names=False)
+    pd.testing.assert_series_equal(parts['max'], grouped.max(), check_names=False)
+    assert {k: v.tolist() for k, v in parts['positions'].items()} == {'a': [1, 5], 'b': [0, 3, 6], 'c': [4]}
+
+
+def test_partition_groups_empty_frame():
+    parts = partition_groups(pd.DataFrame({'g': pd.Series([], dtype=object), 'v': []}), 'g', 'v')
+    assert len(parts['keys']) == 0 and parts['positions'] == {}
+
+
+def _shares():
+    return pd.Series([50.0, 30.0, 10.0, 6.0, 4.0], index=pd.Index(list('abcde'), name='k'), name='v')
+
+
+def test_fold_other_top_n():
+    out = fold_other(_shares(), top_n=2)
+    assert out.to_dict() == {'a': 50.0, 'b': 30.0, 'Other': 20.0}
+    assert out.index.name == 'k' and out.name == 'v'
+
+
+def test_fold_other_min_share_and_existing_label():
+    values = pd.Series([50.0, 30.0, 10.0, 6.0, 4.0], index=['a', 'Other', 'c', 'd', 'e'])
+    assert fold_other(values, min_share=0.08).to_dict() == {'a': 50.0, 'Other': 40.0, 'c': 10.0}
+
+
+def test_fold_other_leaves_values_alone_when_nothing_folds():
+    values = _shares()
+    assert fold_other(values, top_n=10, min_share=0.01) is values
+
+
+def test_to_percentage_with_other_bucket():
+    df = pd.DataFrame({'k': list('abcdea'), 'v': [40.0, 30.0, 10.0, 6.0, 4.0, 10.0]})
+    out, total = to_percentage(df, 'v', 'k', top_n=2)
+    assert total == 100.0
+    assert out['percentage'].tolist() == [50.0, 30.0, 20.0]
+    assert list(out.index) == ['a (50.0%)', 'b (30.0%)', 'Other (20.0%)']
+
+
+def test_pie_chart_folds_small_slices():
+    from chartengineer import ChartMaker
+    df = pd.DataFrame({'k': list('abcde'), 'v': [50.0, 30.0, 10.0, 6.0, 4.0]})
+    cm = ChartMaker()
+    cm.build(df, 't', groupby_col='k', num_col='v', chart_type='pie', options={'top_n': 3})
+    assert len(cm.fig.data[0].values) == 4
+
+
+def test_normalize_to_percent_wide():
+    df = pd.DataFrame({'a': [1.0, 0.0, np.nan], 'b': [3.0, 0.0, 2.0], 'label': ['x', 'y', 'z']})
+    out = normalize_to_percent(df)
+    assert out['a'].tolist()[:2] == [25.0, 0.0] and np.isnan(out['a'].iloc[2])
+    assert out['b'].tolist() == [75.0, 0.0, 100.0]
+    assert 'label' not in out.columns and df['a'].iloc[0] == 1.0
+
+
+def test_normalize_to_percent_long_and_inplace():
+    index = pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02'])
+    df = pd.DataFrame({'g': ['x', 'y', 'x'], 'v': [1.0, 3.0, 0.0]}, index=index)
+    out = normalize_to_percent(df, num_col='v', dtype='float32')
+    assert out['v'].tolist() == [25.0, 75.0, 0.0] and out['v'].dtype == np.float32
+    assert df['v'].tolist() == [1.0, 3.0, 0.0]
+    assert normalize_to_percent(df, num_col='v', inplace=True) is df and df['v'].tolist() == [25.0, 75.0, 0.0]
+
+
+@pytest.mark.parametrize('agg, expected', [('last', 5.0), ('sum', 6.0), ('mean', 3.0)])
+def test_pivot_heatmap_combines_repeated_cells(agg, expected):
+    z, xs, ys = pivot_heatmap(['b', 'a', 'b'], [2, 1, 2], [1.0, 2.0, 5.0], agg=agg)
+    assert list(xs) == ['b', 'a'] and list(ys) == [1, 2]
+    assert z.shape == (2, 2)
+    assert z[1, 0] == expected and z[0, 1] == 2.0
+    assert np.isnan(z[0, 0]) and np.isnan(z[1, 1])
+
+
+def test_pivot_heatmap_bins_numeric_and_datetime_axes():
+    x = pd.date_range('2024-01-01', periods=100, freq='D')
+    y = np.arange(100) % 10
+    z, xs, ys = pivot_heatmap(x, y, np.ones(100), agg='sum', max_bins={'x': 10})
+    assert z.shape == (10, 10) and len(xs) == 10 and xs[0] == x[0]
+    assert np.nansum(z) == 100
+
+
+def test_pivot_heatmap_unknown_agg():
+    with pytest.raises(ValueError, match='Unknown heatmap aggregation'):
+        pivot_heatmap([1], [1], [1], agg='max')
+
+
+def test_infer_spacing():
+    weekly = pd.date_range('2024-01-07', periods=50, freq='W')
+    assert infer_spacing(weekly) == pd.Timedelta(weeks=1)
+    assert infer_spacing(pd.DatetimeIndex(list(weekly[::-1]))) == pd.Timedelta(weeks=1)
+    assert infer_spacing(pd.DatetimeIndex(weekly).repeat(3)) == pd.Timedelta(weeks=1)
+    assert infer_spacing(weekly[:1]) is None
+
+
+def test_plan_ticks_leaves_dense_series_to_plotly():
+    assert plan_ticks(pd.date_range('2024-01-01', periods=500, freq='D')) is None
+    assert plan_ticks(pd.Index([1, 2, 3])) is None
+
+
+def test_plan_ticks_one_per_point_when_they_fit():
+    index = pd.date_range('2024-01-07', periods=8, freq='W')
+    assert (plan_ticks(index, width=730) == index.to_numpy()).all()
+
+
+@pytest.mark.parametrize('periods, freq', [(300, 'W'), (120, 'MS'), (60, 'QS'), (100, 'YS')])
+def test_plan_ticks_stays_within_max_ticks_on_calendar_boundaries(periods, freq):
+    index = pd.date_range('2000-01-01', periods=periods, freq=freq)
+    ticks = pd.DatetimeIndex(plan_ticks(index, max_ticks=10))
+    assert 2 <= len(ticks) <= 10
+    assert ticks.min() >= index[0].normalize() and ticks.max() <= index[-1]
+    assert (ticks.day == 1).all() or (ticks.dayofweek == 0).all()
+
+
+def test_series_stats_unsorted_ties_pick_earliest():
+    index = pd.to_datetime(['2024-01-03', '2024-01-01', '2024-01-02', '2024-01-04'])
+    stats = series_stats(pd.Series([5.0, 1.0, 5.0, np.nan], index=index))
+    assert stats['n'] == 4 and not stats['sorted']
+    assert stats['first_idx'] == index[1] and stats['last_idx'] == index[3] and np.isnan(stats['last_val'])
+    assert (stats['max_idx'], stats['max_val']) == (index[2], 5.0)
+    assert (stats['min_idx'], stats['min_val']) == (index[1], 1.0)
+
+
+def test_merge_stats_matches_stats_of_concatenation():
+    x, y = _series(100)
+    col = pd.Series(y, index=x)
+    merged = merge_stats(series_stats(col[:60]), series_stats(col[60:]))
+    assert merged == series_stats(col)
+    assert merge_stats(series_stats(col[:0]), series_stats(col)) == series_stats(col)